@@ -0,0 +1,42 @@
+"""
+Benchmark the prefix sum segmentation engine (fast_pelt / fast_binseg) against ruptures (pelt / binseg)
+on long daily / hourly count series.
+
+Usage:
+    python -m benchmarks.bench_native_segmentation --sizes 2000,10000,50000
+"""
+import argparse
+import time
+
+import numpy as np
+
+from mcp_conductor.detector.generic.changepoints import ChangePointDetector
+
+
+def timed(config: dict, signal: np.ndarray) -> tuple[float, list]:
+    started_at = time.perf_counter()
+    result = ChangePointDetector(config).detect(signal)
+    return time.perf_counter() - started_at, result['change_points']
+
+
+def run_app():
+    parser = argparse.ArgumentParser(description="Benchmark the prefix sum segmentation engine against ruptures")
+    parser.add_argument("--sizes", type=str, default="2000,10000,50000", help='comma separated series lengths')
+    parser.add_argument("--penalty", type=float, default=200.0)
+    parser.add_argument("--n_bkps", type=int, default=9)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(f"{'method':>8} {'size':>8} {'ruptures (s)':>13} {'native (s)':>11} {'speedup':>8}")
+    for size in [int(size) for size in args.sizes.split(",")]:
+        signal = np.concatenate([rng.poisson(lam, size // 10) for lam in rng.integers(10, 60, 10)]).astype(float)
+        for method in ('pelt', 'binseg'):
+            config = {'method': method, 'min_size': 3, 'penalty': args.penalty, 'n_bkps': args.n_bkps}
+            ruptures_time, expected = timed(config, signal)
+            native_time, result = timed({**config, 'method': f'fast_{method}'}, signal)
+            assert result == expected, f"result mismatch for {method} at size {size}"
+            print(f"{method:>8} {size:>8} {ruptures_time:>13.3f} {native_time:>11.3f} {ruptures_time / native_time:>7.1f}x")
+
+
+if __name__ == "__main__":
+    run_app()
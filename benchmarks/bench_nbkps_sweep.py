@@ -0,0 +1,43 @@
+"""
+Benchmark an interactive n_bkps sweep (1-10) on one signal, with and without reusing the fitted model.
+
+Usage:
+    python -m benchmarks.bench_nbkps_sweep --size 300
+"""
+import argparse
+import time
+
+import numpy as np
+
+from mcp_conductor.detector.generic.changepoints import ChangePointDetector
+
+
+def sweep(method: str, signal: np.ndarray, reuse: bool) -> tuple[float, list]:
+    results = []
+    detector = ChangePointDetector({'method': method, 'min_size': 3})
+    started_at = time.perf_counter()
+    for n_bkps in range(1, 11):
+        if not reuse:
+            detector = ChangePointDetector({'method': method, 'min_size': 3})
+        detector.set_params(n_bkps=n_bkps)
+        results.append(detector.detect(signal)['change_points'])
+    return time.perf_counter() - started_at, results
+
+
+def run_app():
+    parser = argparse.ArgumentParser(description="Benchmark n_bkps sweeps with fitted model reuse")
+    parser.add_argument("--size", type=int, default=300)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    signal = np.concatenate([rng.poisson(lam, args.size // 5) for lam in (27, 40, 20, 33, 27)]).astype(float)
+    print(f"{'method':>10} {'refit (s)':>10} {'reuse (s)':>10} {'speedup':>8}")
+    for method in ('bic', 'binseg', 'bottomup', 'window'):
+        refit_time, expected = sweep(method, signal, reuse=False)
+        reuse_time, result = sweep(method, signal, reuse=True)
+        assert result == expected, f"result mismatch for {method}"
+        print(f"{method:>10} {refit_time:>10.3f} {reuse_time:>10.3f} {refit_time / reuse_time:>7.1f}x")
+
+
+if __name__ == "__main__":
+    run_app()
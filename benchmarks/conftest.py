@@ -0,0 +1,63 @@
+"""
+Fixtures of the pytest-benchmark suite.
+
+Usage:
+    python -m pytest benchmarks --benchmark-autosave             # saves .benchmarks/<machine>/<n>_<commit>.json
+    python -m pytest benchmarks --benchmark-compare              # compares against the last saved run
+    python -m pytest benchmarks --bench_max_size 10000 --benchmark-json bench.json
+
+Run it on the commit before and after a detector change, ``pytest-benchmark compare`` lists both runs side by side.
+"""
+import os
+from unittest.mock import patch
+
+import pandas as pd
+import pytest
+
+from benchmarks.data import SIZES, make_date_ids, make_series
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--bench_max_size", type=int, default=max(SIZES), help="skip the benchmarks on longer series (default: 1e6)"
+    )
+
+
+def pytest_collection_modifyitems(config, items):
+    max_size = config.getoption("--bench_max_size")
+    skip = pytest.mark.skip(reason=f"series longer than --bench_max_size {max_size}")
+    for item in items:
+        size = getattr(item, "callspec", None) and item.callspec.params.get("size")
+        if size and size > max_size:
+            item.add_marker(skip)
+
+
+@pytest.fixture(scope="session")
+def sqlite_fixture(tmp_path_factory):
+    """Ten years of daily ship cnt for three pipes in a fresh sqlite file, with thresholds precomputed.
+
+    The process wide engine, series cache and threshold lookup point at the file for the whole session.
+    """
+    from mcp_conductor.entry.main_precompute_thresholds import precompute_thresholds
+    from mcp_conductor.storage import engine as engine_module
+    from mcp_conductor.storage.ingest import ingest_files
+    from mcp_conductor.storage.thresholds import ThresholdLookup
+
+    tmp_dir = tmp_path_factory.mktemp("sisi")
+    db_url = f"sqlite:///{tmp_dir / 'sisi.sqlite'}"
+    date_ids = make_date_ids(3653, start="2015-01-01")
+    csv_path = tmp_dir / "ship_cnt.csv"
+    pd.concat([
+        pd.DataFrame({"pipe_name": pipe_name, "date_id": date_ids, "ship_cnt": make_series(date_ids.shape[0], seed)})
+        for seed, pipe_name in enumerate(("曼德海峡", "马六甲海峡", "霍尔木兹海峡"))
+    ]).to_csv(csv_path, index=False)
+
+    with patch.dict(os.environ, {"SISI_DB_URL": db_url}), \
+            patch("mcp_conductor.storage.thresholds._THRESHOLD_LOOKUP", ThresholdLookup()):
+        engine_module.get_db_url.cache_clear()
+        engine = engine_module.get_engine()
+        ingest_files([csv_path], engine=engine)
+        precompute_thresholds(engine=engine)
+        yield engine
+        engine_module.dispose_engines()
+        engine_module.get_db_url.cache_clear()
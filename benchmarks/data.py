@@ -0,0 +1,25 @@
+"""Generated series of the benchmarks."""
+import numpy as np
+
+SIZES = [10 ** 2, 10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6]
+
+
+def make_series(size: int, seed: int = 0) -> np.ndarray:
+    """Daily ship cnt like series, Poisson counts with a level shift every ``size / 10`` days."""
+    rng = np.random.default_rng(seed)
+    levels = rng.integers(10, 60, 10)
+    return rng.poisson(np.repeat(levels, -(-size // 10))[:size]).astype(np.float64)
+
+
+def make_date_ids(size: int, start: str = "1900-01-01") -> np.ndarray:
+    """``size`` consecutive YYYYMMDD date_ids."""
+    days = np.datetime64(start) + np.arange(size)
+    years = days.astype("datetime64[Y]").astype(np.int64) + 1970
+    months = days.astype("datetime64[M]").astype(np.int64) % 12 + 1
+    dom = (days - days.astype("datetime64[M]")).astype(np.int64) + 1
+    return years * 10000 + months * 100 + dom
+
+
+def rounds_for(size: int) -> int:
+    """Rounds of a benchmark, long series run once."""
+    return max(1, min(10, 10 ** 5 // size))
@@ -0,0 +1,133 @@
+"""
+Benchmark every :class:`ChangePointDetector` method and cost model on series of 1e2 to 1e6 points.
+
+Every round runs on a fresh detector, so the fitted algorithm cache never turns a round into a lookup.
+Every method runs its default exact path, and is only benchmarked up to the sizes it finishes in seconds.
+The opt-in coarse-to-fine mode (``max_points``) of the l2 cost is benchmarked as its own case.
+
+Usage:
+    python -m pytest benchmarks/test_bench_detector.py --benchmark-autosave [--bench_max_size 100000]
+"""
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+from benchmarks.data import SIZES, make_date_ids, make_series, rounds_for
+from mcp_conductor.detector.generic.bootstrap import bootstrap_scores, exceedance_scores
+from mcp_conductor.detector.generic.changepoints import COARSE_TO_FINE_METHODS, ChangePointDetector
+from mcp_conductor.storage.baselines import BaselineCache, SeasonalBaseline
+
+SEGMENTATION_METHODS = ['bic', 'pelt', 'binseg', 'bottomup', 'window']
+NATIVE_METHODS = ['fast_pelt', 'fast_binseg']
+MODELS = ['l1', 'l2', 'normal', 'rbf']
+
+# largest series per (method, model) that fits in memory / a few seconds: the rbf cost keeps the gram matrix
+# of the segments it is fitted on, the window method scores every point with the full resolution cost
+MAX_SIZES = {
+    ('pelt', 'l2'): 10 ** 4,
+    ('bic', 'l2'): 10 ** 5,
+    ('binseg', 'l2'): 10 ** 5,
+    ('bottomup', 'l2'): 10 ** 5,
+    ('fast_pelt', 'l2'): 10 ** 5,
+    ('window', 'rbf'): 10 ** 3,
+    ('window', 'l1'): 10 ** 5,
+    ('window', 'l2'): 10 ** 5,
+    ('window', 'normal'): 10 ** 5,
+    ('bic', 'rbf'): 10 ** 3,
+    ('pelt', 'rbf'): 10 ** 3,
+    ('binseg', 'rbf'): 10 ** 3,
+    ('bottomup', 'rbf'): 10 ** 4,
+    ('bic', 'l1'): 10 ** 3,
+    ('pelt', 'l1'): 10 ** 3,
+    ('binseg', 'l1'): 10 ** 4,
+    ('bottomup', 'l1'): 10 ** 4,
+    ('bic', 'normal'): 10 ** 4,
+    ('pelt', 'normal'): 10 ** 3,
+    ('binseg', 'normal'): 10 ** 4,
+    ('bottomup', 'normal'): 10 ** 4,
+    ('fast_pelt', 'normal'): 10 ** 5,
+    ('bocpd', None): 10 ** 5,
+}
+BASE_CONFIG = {'min_size': 3, 'penalty': 200, 'n_bkps': 9, 'width': 30}
+
+
+def _run(benchmark, config: dict, size: int, **kwargs) -> None:
+    # the caps are those of the exact path, coarse-to-fine bounds the runtime whatever the length
+    limit = None if config.get('max_points') else MAX_SIZES.get((config['method'], config.get('model')))
+    if limit is not None and size > limit:
+        pytest.skip(f"{config['method']} / {config.get('model')} is only benchmarked up to {limit} points")
+    signal = make_series(size)
+    benchmark.extra_info.update({'size': size, **config})
+    result = benchmark.pedantic(
+        lambda detector: detector.detect(signal, **kwargs),
+        setup=lambda: ((ChangePointDetector({**BASE_CONFIG, **config}),), {}),
+        rounds=rounds_for(size),
+    )
+    assert result['status'] == 'success', result
+
+
+@pytest.mark.parametrize("size", SIZES)
+@pytest.mark.parametrize("model", MODELS)
+@pytest.mark.parametrize("method", SEGMENTATION_METHODS)
+def test_segmentation(benchmark, method, model, size):
+    _run(benchmark, {'method': method, 'model': model}, size)
+
+
+@pytest.mark.parametrize("size", SIZES)
+@pytest.mark.parametrize("model", ['l2', 'normal'])
+@pytest.mark.parametrize("method", NATIVE_METHODS)
+def test_native_segmentation(benchmark, method, model, size):
+    _run(benchmark, {'method': method, 'model': model}, size)
+
+
+@pytest.mark.parametrize("size", SIZES)
+@pytest.mark.parametrize("method", sorted(COARSE_TO_FINE_METHODS))
+def test_coarse_to_fine(benchmark, method, size):
+    """The opt-in approximation: series longer than 730 points run on weekly blocks, then refined."""
+    _run(benchmark, {'method': method, 'model': 'l2', 'max_points': 730}, size)
+
+
+@pytest.mark.parametrize("size", SIZES)
+@pytest.mark.parametrize("method", ['sisi', 'rolling_mad', 'rolling_zscore', 'bocpd'])
+def test_screening(benchmark, method, size):
+    _run(benchmark, {'method': method, 'min_alert_cnt': 13, 'max_alert_cnt': 41}, size, pipe_name='曼德海峡')
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_seasonal(benchmark, size):
+    date_ids = make_date_ids(size)
+    baseline = SeasonalBaseline()
+    baseline.update(date_ids, make_series(size, seed=1))
+    with patch("mcp_conductor.storage.baselines._BASELINE_CACHE", BaselineCache()) as cache:
+        cache.update({'曼德海峡': baseline})
+        _run(benchmark, {'method': 'seasonal'}, size, pipe_name='曼德海峡', date_ids=date_ids)
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_detect_many_sisi(benchmark, size):
+    """Vectorized sisi screening of 100 pipes."""
+    signals = {f'pipe_{i}': make_series(size // 100 or 1, seed=i) for i in range(100)}
+    detector = ChangePointDetector({'method': 'sisi', 'min_alert_cnt': 13, 'max_alert_cnt': 41})
+    benchmark.extra_info.update({'size': size, 'pipes': 100})
+    benchmark.pedantic(detector.detect_many, args=(signals,), rounds=rounds_for(size))
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_bootstrap_scores(benchmark, size):
+    """500 block bootstrap resamples of one change point every 50 days."""
+    signal = make_series(size)
+    change_points = np.arange(25, size, 50)
+    benchmark.extra_info.update({'size': size, 'change_points': change_points.shape[0]})
+    benchmark.pedantic(
+        bootstrap_scores, args=(signal, change_points, 7), kwargs={'seed': 0}, rounds=rounds_for(size)
+    )
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_exceedance_scores(benchmark, size):
+    """500 bootstrap-t resamples of one flagged day every 50 days."""
+    signal = make_series(size)
+    points = np.arange(25, size, 50)
+    benchmark.extra_info.update({'size': size, 'points': points.shape[0]})
+    benchmark.pedantic(exceedance_scores, args=(signal, points, 7), kwargs={'seed': 0}, rounds=rounds_for(size))
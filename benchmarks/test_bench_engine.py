@@ -0,0 +1,53 @@
+"""
+Benchmark :func:`pipe_detect_engine` end to end on a generated sqlite fixture (ten years, three pipes).
+
+- cold: empty series and result caches, every round reads the window from sqlite and runs the detector
+- warm_series: the series is cached in memory, every round runs the detector
+- cached_result: the result cache answers
+
+Usage:
+    python -m pytest benchmarks/test_bench_engine.py --benchmark-autosave
+"""
+from unittest.mock import patch
+
+import pytest
+
+from mcp_conductor.detector import pipe_detect_engine as engine_module
+from mcp_conductor.detector import result_cache as result_cache_module
+from mcp_conductor.detector.result_cache import DetectionResultCache
+from mcp_conductor.storage import series_cache as series_cache_module
+from mcp_conductor.storage.series_cache import PipeSeriesCache
+
+RUN_DATE = "2024-12-31"
+
+
+@pytest.fixture
+def process_caches():
+    """Swap the process wide caches for the test, the benchmark rounds replace them as needed."""
+    with patch.object(series_cache_module, "_SERIES_CACHE", PipeSeriesCache()), \
+            patch.object(result_cache_module, "_RESULT_CACHE", DetectionResultCache(db_path="")):
+        yield
+
+
+def _reset(series: bool, result: bool) -> None:
+    if series:
+        series_cache_module._SERIES_CACHE = PipeSeriesCache()
+    if result:
+        result_cache_module._RESULT_CACHE = DetectionResultCache(db_path="")
+
+
+@pytest.mark.parametrize("month", [1, 12, 120])
+@pytest.mark.parametrize("scenario", ["cold", "warm_series", "cached_result"])
+def test_pipe_detect_engine(benchmark, sqlite_fixture, process_caches, scenario, month):
+    # the first call fills the caches the warm scenarios start from
+    result = engine_module.pipe_detect_engine(RUN_DATE, "曼德海峡", month=month)
+    assert "曼德海峡" in result
+
+    benchmark.extra_info.update({'scenario': scenario, 'month': month})
+    benchmark.pedantic(
+        engine_module.pipe_detect_engine,
+        args=(RUN_DATE, "曼德海峡"),
+        kwargs={'month': month},
+        setup=lambda: _reset(series=scenario == "cold", result=scenario != "cached_result"),
+        rounds=20,
+    )
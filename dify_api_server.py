@@ -11,8 +11,13 @@ from pydantic import BaseModel
 
 # Import the actual tool functions
 from mcp_conductor.entry.main_traffic_detect import trigger_traffic_detect
-from mcp_conductor.detector.pipe_detect_engine import pipe_detect_engine
+from mcp_conductor.detector.pipe_detect_engine import pipe_detect_engine_async
 from mcp_conductor.detector.plot_ship_congestion import plot_ship_congestion
+from mcp_conductor.storage.async_ship_cnt import close_async_repository
+from mcp_conductor.storage.engine import warm_up, dispose_engines
+from mcp_conductor.storage.migrations import run_migrations
+from mcp_conductor.storage.baselines import load_baseline_cache
+from mcp_conductor.storage.thresholds import load_threshold_lookup
 import re
 import calendar
 
@@ -35,6 +40,26 @@ app.add_middleware(
 )
 
 
+@app.on_event("startup")
+async def startup():
+    """Create the shared database engine pool before the first request"""
+    try:
+        warm_up()
+        run_migrations()
+        load_threshold_lookup()
+        load_baseline_cache()
+        logger.info("Database engine pool initialized.")
+    except Exception as e:
+        logger.warning(f"Database warm up failed, engine will connect on first request: {e}")
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    """Close pooled database connections"""
+    await close_async_repository()
+    dispose_engines()
+
+
 class QuestionRequest(BaseModel):
     question: str
 
@@ -100,17 +125,11 @@ async def detect_congestion(request: QuestionRequest):
                 "message": "无法解析问题。请确保包含年月和通道名称。示例：2023年12月 曼德海峡是否发生异常？"
             }
 
-        # Run detection in executor to avoid blocking
-        loop = asyncio.get_event_loop()
-        changepoints_result = await loop.run_in_executor(
-            None,
-            pipe_detect_engine,
-            run_date,
-            pipe_name
-        )
+        # series read is awaited directly, detection runs in the detector pool
+        changepoints_result = await pipe_detect_engine_async(run_date, pipe_name)
 
         if len(changepoints_result) > 0:
-            result_text = f"🚢 检测结果：{run_date} {pipe_name} 发生异常，异常天数 {changepoints_result[pipe_name].shape[0]}"
+            result_text = f"🚢 检测结果：{run_date} {pipe_name} 发生异常，异常天数 {len(changepoints_result[pipe_name])}"
         else:
             result_text = f"✅ 检测结果：{run_date} {pipe_name} 无异常发生"
 
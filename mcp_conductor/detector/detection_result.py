@@ -0,0 +1,151 @@
+"""
+Compact result of one pipe window detection.
+
+:func:`pipe_detect_engine` returns a :class:`DetectionResult` per pipe instead of a DataFrame slice:
+three small NumPy arrays (position in the window, date_id, ship cnt of every detected day) and the
+window metadata. The arrays are gathered from the window, they don't keep the cached series alive,
+so results are cheap to keep in the result cache and to pickle between processes.
+``to_frame()`` gives the former DataFrame when pandas is actually needed.
+
+With ``bootstrap_samples`` in the detector config every day also carries its bootstrap confidence score,
+``confident(min_score)`` keeps the days worth an expensive follow up (e.g. the LLM calls of analyze_congestion).
+"""
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Dict, List
+
+import numpy as np
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# layout version of DetectionResult, names the persistent result cache table so that payloads of another
+# layout are never read back. Bump it whenever a field is added, removed or changes meaning.
+SCHEMA_VERSION = 4
+
+
+@dataclass(slots=True, eq=False)
+class DetectionResult:
+    """Detected days of one pipe window, ordered by date_id"""
+    pipe_name: str
+    # position of every detected day in the detection window, None for materialized (backfill) results
+    index: np.ndarray | None
+    date_ids: np.ndarray
+    ship_cnts: np.ndarray
+    method: str = ""
+    start_date_id: int | None = None
+    end_date_id: int | None = None
+    # bootstrap confidence of every day (NaN when unknown), None when the detector didn't score them
+    scores: np.ndarray | None = None
+
+    @classmethod
+    def from_change_points(
+        cls,
+        pipe_name: str,
+        date_ids: np.ndarray,
+        ship_cnts: np.ndarray,
+        change_points: List[int],
+        method: str = "",
+        start_date_id: int | None = None,
+        end_date_id: int | None = None,
+        scores: List[float] | None = None,
+    ) -> "DetectionResult":
+        """Gather the change point days of a window (``date_ids`` / ``ship_cnts`` arrays of the whole window)."""
+        idx = np.asarray(change_points, dtype=np.intp)
+        return cls(
+            pipe_name,
+            idx,
+            date_ids[idx],
+            ship_cnts[idx],
+            method,
+            start_date_id,
+            end_date_id,
+            None if scores is None else np.asarray(scores, dtype=np.float64),
+        )
+
+    @classmethod
+    def from_frame(
+        cls,
+        pipe_name: str,
+        df: "pd.DataFrame",
+        method: str = "",
+        start_date_id: int | None = None,
+        end_date_id: int | None = None,
+    ) -> "DetectionResult":
+        """Wrap rows with ``date_id`` / ``ship_cnt`` columns, e.g. a ``pipe_anomalies`` lookup."""
+        return cls(
+            pipe_name,
+            None,
+            df["date_id"].to_numpy(dtype=np.int64),
+            df["ship_cnt"].to_numpy(dtype=np.float64, na_value=np.nan),
+            method,
+            start_date_id,
+            end_date_id,
+        )
+
+    def __len__(self) -> int:
+        """Number of detected days."""
+        return int(self.date_ids.shape[0])
+
+    @property
+    def last_date_id(self) -> int | None:
+        """date_id of the latest detected day, None when nothing was detected."""
+        return int(self.date_ids[-1]) if self.date_ids.shape[0] else None
+
+    def confident(self, min_score: float) -> "DetectionResult":
+        """
+        Days scored at least ``min_score``, a result without scores is returned as it is.
+
+        Days whose score is NaN (no baseline to score them against, e.g. most of the window is anomalous)
+        are kept, an unknown confidence never hides a detection.
+        """
+        if self.scores is None:
+            return self
+        keep = ~(self.scores < min_score)
+        return DetectionResult(
+            self.pipe_name,
+            None if self.index is None else self.index[keep],
+            self.date_ids[keep],
+            self.ship_cnts[keep],
+            self.method,
+            self.start_date_id,
+            self.end_date_id,
+            self.scores[keep],
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON serializable form."""
+        return {
+            "pipe_name": self.pipe_name,
+            "method": self.method,
+            "start_date_id": self.start_date_id,
+            "end_date_id": self.end_date_id,
+            "index": None if self.index is None else self.index.tolist(),
+            "date_ids": self.date_ids.tolist(),
+            "ship_cnts": self.ship_cnts.tolist(),
+            # NaN (unknown) scores as null, NaN isn't valid JSON
+            "scores": None if self.scores is None else [None if np.isnan(x) else x for x in self.scores.tolist()],
+        }
+
+    @classmethod
+    def from_dict(cls, payload: Dict[str, Any]) -> "DetectionResult":
+        """Inverse of :meth:`to_dict`."""
+        index, scores = payload["index"], payload["scores"]
+        return cls(
+            payload["pipe_name"],
+            None if index is None else np.asarray(index, dtype=np.intp),
+            np.asarray(payload["date_ids"], dtype=np.int64),
+            np.asarray(payload["ship_cnts"]),
+            payload["method"],
+            payload["start_date_id"],
+            payload["end_date_id"],
+            None if scores is None else np.array([np.nan if x is None else x for x in scores], dtype=np.float64),
+        )
+
+    def to_frame(self) -> "pd.DataFrame":
+        """``pipe_name, date_id, ship_cnt`` (and ``score``) rows, indexed by the position of the days in the window."""
+        import pandas as pd
+
+        columns = {"pipe_name": self.pipe_name, "date_id": self.date_ids, "ship_cnt": self.ship_cnts}
+        if self.scores is not None:
+            columns["score"] = self.scores
+        return pd.DataFrame(columns, index=None if self.index is None else pd.Index(self.index))
@@ -0,0 +1,233 @@
+"""
+Bootstrap confidence of detected change points and point anomalies.
+
+Every change point is scored on the ``window`` points before and after it, the statistic is the distance
+between the means of both sides (Euclidean over the columns of a 2-D signal). Without a change both sides are
+one stationary stretch: the pooled points are resampled with a circular block bootstrap (blocks keep the day
+to day autocorrelation) and split again at the same position. The score is the share of resamples whose
+statistic stays below the observed one, close to 1 for a lasting shift and around 0.5 or less for noise.
+
+The resamples of a chunk of change points are drawn and reduced in one batched pass over an array of shape
+``(n_resamples, n_change_points, 2 * window, n_features)``. Chunks bound the memory, on long series with many
+change points they are spread over a process pool. Every chunk has its own seed spawned from ``seed``, so the
+scores don't depend on the number of workers.
+
+The days flagged by the point anomaly methods (sisi, rolling, seasonal) are no shift between two stretches:
+a lone spike barely moves the mean of its side, and the days of an ongoing event have no after side at all.
+:func:`exceedance_scores` scores them as single points instead, the statistic is the distance of the day to the
+mean of its baseline in baseline standard deviations, the baseline being the ``window`` nearest days that were
+not flagged (preceding ones first, following ones when the history is short). The null draws a day and a
+baseline from the baseline days with replacement (bootstrap-t, studentizing keeps short baselines calibrated).
+When most of the window is flagged there is no baseline to score against, the days get a NaN score (unknown)
+rather than a low one.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from math import ceil
+from typing import Callable, Sequence
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# values of one batched pass (32 MiB of float64)
+MAX_CHUNK_VALUES = 1 << 22
+# fewest baseline days a point anomaly is scored on (half the window on longer windows), shorter baselines
+# resample to a handful of distinct values and can't tell an anomaly from noise
+MIN_BASELINE_DAYS = 4
+
+
+def default_block_size(window: int) -> int:
+    """Cube root rule of thumb for the block length of a ``2 * window`` points stretch."""
+    return max(1, round((2 * window) ** (1 / 3)))
+
+
+def bootstrap_scores(
+    signal: np.ndarray,
+    change_points: Sequence[int],
+    window: int,
+    n_resamples: int = 500,
+    block_size: int | None = None,
+    seed: int | None = None,
+    workers: int = 1,
+) -> np.ndarray:
+    """
+    Confidence score in [0, 1] of every change point.
+
+    Args:
+        signal: 1-d or 2-d ``(n_samples, n_features)`` array, NaN for missing values
+        change_points: indices of the change points, the first point after the change
+        window: points compared on each side of a change point (fewer at the ends of the signal)
+        n_resamples: bootstrap resamples per change point
+        block_size: length of the resampled blocks (default: :func:`default_block_size`)
+        seed: seed of the resamples, None draws a fresh one
+        workers: processes scoring the chunks, 1 scores them in the current process
+
+    Returns:
+        np.ndarray: score of every change point, 0 when one side has no valid value
+    """
+    arr = np.asarray(signal, dtype=np.float64)
+    if arr.ndim == 1:
+        arr = arr[:, None]
+    cps = np.asarray(change_points, dtype=np.intp)
+    if cps.shape[0] == 0:
+        return np.zeros(0)
+    window = max(1, int(window))
+    block_size = block_size or default_block_size(window)
+
+    # pooled stretch of every change point, left aligned and padded to 2 * window points
+    n_samples = arr.shape[0]
+    n_left = np.minimum(window, cps)
+    lengths = n_left + np.minimum(window, n_samples - cps)
+    rows = np.clip(cps[:, None] - n_left[:, None] + np.arange(2 * window), 0, n_samples - 1)
+    stretches = arr[rows]
+
+    return _map_chunks(
+        _score_chunk,
+        (stretches, n_left, lengths),
+        (n_resamples, block_size),
+        n_resamples * 2 * window * arr.shape[1],
+        seed,
+        workers,
+    )
+
+
+def exceedance_scores(
+    signal: np.ndarray,
+    points: Sequence[int],
+    window: int,
+    n_resamples: int = 500,
+    seed: int | None = None,
+    workers: int = 1,
+) -> np.ndarray:
+    """
+    Confidence score in [0, 1] of every point anomaly.
+
+    Args:
+        signal: 1-d array, NaN for missing values
+        points: indices of the flagged days, they are left out of each other's baselines
+        window: days of the baseline of every flagged day
+        n_resamples: bootstrap resamples per flagged day
+        seed: seed of the resamples, None draws a fresh one
+        workers: processes scoring the chunks, 1 scores them in the current process
+
+    Returns:
+        np.ndarray: score of every flagged day, 0 when the day is missing or equals a constant baseline,
+            NaN when fewer than ``min(window, max(MIN_BASELINE_DAYS, window // 2))`` days are left for the baseline
+    """
+    arr = np.asarray(signal, dtype=np.float64).ravel()
+    idx = np.asarray(points, dtype=np.intp)
+    if idx.shape[0] == 0:
+        return np.zeros(0)
+    flagged = np.zeros(arr.shape[0], dtype=bool)
+    flagged[idx] = True
+    baseline_days = np.flatnonzero(~flagged & ~np.isnan(arr))
+    window = max(2, int(window))
+    n_base = min(window, baseline_days.shape[0])
+    if n_base < min(window, max(MIN_BASELINE_DAYS, window // 2)):
+        return np.full(idx.shape[0], np.nan)
+
+    # the n_base baseline days closest before every flagged day, shifted forward when fewer precede it
+    first = np.clip(np.searchsorted(baseline_days, idx) - n_base, 0, baseline_days.shape[0] - n_base)
+    baselines = arr[baseline_days[first[:, None] + np.arange(n_base)]]
+    return _map_chunks(
+        _score_points_chunk, (arr[idx], baselines), (n_resamples,), n_resamples * (n_base + 1), seed, workers
+    )
+
+
+def _map_chunks(
+    score_chunk: Callable[..., np.ndarray],
+    per_point: tuple,
+    shared: tuple,
+    values_per_point: int,
+    seed: int | None,
+    workers: int,
+) -> np.ndarray:
+    """Score ``per_point`` arrays chunk by chunk, every chunk with its own seed spawned from ``seed``."""
+    n_points = per_point[0].shape[0]
+    chunk = max(1, MAX_CHUNK_VALUES // values_per_point)
+    starts = range(0, n_points, chunk)
+    seeds = np.random.SeedSequence(seed).spawn(len(starts))
+    args = [
+        tuple(values[i:i + chunk] for values in per_point) + shared + (chunk_seed,)
+        for i, chunk_seed in zip(starts, seeds)
+    ]
+    if workers > 1 and len(args) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(args))) as pool:
+            scores = list(pool.map(score_chunk, *zip(*args)))
+    else:
+        scores = [score_chunk(*chunk_args) for chunk_args in args]
+    return np.concatenate(scores)
+
+
+def _score_chunk(
+    stretches: np.ndarray,
+    n_left: np.ndarray,
+    lengths: np.ndarray,
+    n_resamples: int,
+    block_size: int,
+    seed: np.random.SeedSequence,
+) -> np.ndarray:
+    """Scores of a chunk of change points, all resamples in one batched pass."""
+    rng = np.random.default_rng(seed)
+    n_cps, n_points, n_features = stretches.shape
+    observed = _mean_distance(stretches, n_left, lengths)
+
+    # every stretch repeated circularly past its end, so that a block starting anywhere is contiguous,
+    # a resample gathers whole blocks from a sliding window view instead of single points
+    k = np.arange(n_cps)[:, None]
+    circular = stretches[k, np.arange(n_points + block_size) % lengths[:, None]]
+    blocks = sliding_window_view(circular, block_size, axis=1)
+    n_blocks = ceil(n_points / block_size)
+    block_starts = (rng.random((n_resamples, n_cps, n_blocks)) * lengths[:, None]).astype(np.intp)
+    resampled = np.moveaxis(blocks[k, block_starts], -1, -2).reshape(
+        n_resamples, n_cps, n_blocks * block_size, n_features
+    )[:, :, :n_points]
+    stats = _mean_distance(resampled, n_left, lengths)
+
+    scores = (stats < observed).mean(axis=0)
+    scores[np.isnan(observed)] = 0.0
+    return scores
+
+
+def _mean_distance(values: np.ndarray, n_left: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+    """Distance between the means of ``values[..., :n_left, :]`` and ``values[..., n_left:lengths, :]``."""
+    pos = np.arange(values.shape[-2])
+    sides = np.stack([
+        pos < n_left[:, None], (pos >= n_left[:, None]) & (pos < lengths[:, None])
+    ]).astype(np.float64)
+    finite = ~np.isnan(values)
+    if finite.all():
+        sums = np.einsum('...kpd,skp->...skd', values, sides)
+        counts = sides.sum(axis=-1)[..., None]
+    else:
+        sums = np.einsum('...kpd,skp->...skd', np.where(finite, values, 0.0), sides)
+        counts = np.einsum('...kpd,skp->...skd', finite.astype(np.float64), sides)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        means = sums / counts
+    return np.sqrt(((means[..., 1, :, :] - means[..., 0, :, :]) ** 2).sum(axis=-1))
+
+
+def _score_points_chunk(
+    values: np.ndarray,
+    baselines: np.ndarray,
+    n_resamples: int,
+    seed: np.random.SeedSequence,
+) -> np.ndarray:
+    """Scores of a chunk of flagged days, all resamples in one batched pass."""
+    rng = np.random.default_rng(seed)
+    n_points, n_base = baselines.shape
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # inf for a day off a constant baseline, NaN for a day equal to it
+        observed = np.abs(values - baselines.mean(axis=1)) / baselines.std(axis=1, ddof=1)
+
+        # a resampled day and a resampled baseline per resample, both drawn from the baseline days,
+        # resampled baselines of equal days have no spread to studentize with and are left out
+        draws = baselines[np.arange(n_points)[:, None], rng.integers(0, n_base, (n_resamples, n_points, n_base + 1))]
+        spread = draws[..., 1:].std(axis=-1, ddof=1)
+        stats = np.abs(draws[..., 0] - draws[..., 1:].mean(axis=-1)) / np.where(spread > 0, spread, np.nan)
+        valid = ~np.isnan(stats)
+        scores = ((stats < observed[None]) & valid).sum(axis=0) / valid.sum(axis=0)
+
+    # a constant baseline leaves no valid resample: any other value is an anomaly
+    scores = np.where(valid.any(axis=0), scores, np.isinf(observed).astype(np.float64))
+    scores[np.isnan(observed)] = 0.0
+    return scores
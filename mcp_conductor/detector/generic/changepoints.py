@@ -1,8 +1,61 @@
+import hashlib
+from collections import OrderedDict
+from math import ceil
+from typing import Any, Callable, Dict, List, Tuple, Union
+
 import numpy as np
-import ruptures as rpt
-from typing import Dict, Any, List, Union
 
 from mcp_conductor.detector.generic.base_detector import BaseDetector
+from mcp_conductor.detector.generic.bootstrap import bootstrap_scores, exceedance_scores
+from mcp_conductor.detector.generic.registry import (
+    available_methods,
+    get_method,
+    register_method,
+    supports_multivariate,
+)
+
+
+# segmentation methods whose cost grows faster than linearly with the signal length, run coarse-to-fine on long signals
+COARSE_TO_FINE_METHODS = frozenset(('bic', 'pelt', 'binseg', 'bottomup', 'fast_pelt', 'fast_binseg'))
+# cost models the 1 / sqrt(days) block scaling keeps the penalties of, see _detect_coarse_to_fine
+COARSE_TO_FINE_MODELS = frozenset(('l2',))
+# methods flagging single days rather than shifts, their days are scored as point anomalies (exceedance_scores)
+POINT_ANOMALY_METHODS = frozenset(('sisi', 'rolling_mad', 'rolling_zscore', 'seasonal'))
+# halvings of a penalty_path interval on which PELT and the CROPS hull disagree
+PENALTY_PATH_MAX_BISECTIONS = 8
+
+
+def _as_input_array(value: Any) -> np.ndarray:
+    """
+    View an input series as a numpy array, without copying numpy backed inputs.
+
+    Arrays are returned as they are, pandas Series / DataFrame columns as a view of their data with their
+    dtype (ints stay ints). Lists and object columns are converted, with pd.NA / None as NaN.
+    """
+    if isinstance(value, np.ndarray):
+        return value
+    to_numpy = getattr(value, "to_numpy", None)
+    if to_numpy is None:
+        return np.asarray(value)
+    arr = to_numpy()
+    if arr.dtype == object:
+        arr = to_numpy(dtype=np.float64, na_value=np.nan)
+    return arr
+
+
+def _as_signal_array(signal: Union[List[float], np.ndarray]) -> np.ndarray:
+    """Flatten a signal into a 1-d numpy array, missing values (None) of object arrays become NaN."""
+    # ensure signal is a 1-d numpy array
+    arr = np.asarray(signal).ravel()
+    if arr.dtype == object:
+        arr = np.array([np.nan if val is None else val for val in arr], dtype=np.float64)
+    return arr
+
+
+def _signal_key(signal: np.ndarray) -> Tuple[str, Tuple[int, ...], str]:
+    """Content hash of a signal, used to recognise a signal that was already fitted."""
+    arr = np.ascontiguousarray(signal)
+    return hashlib.blake2b(arr.tobytes(), digest_size=16).hexdigest(), arr.shape, arr.dtype.str
 
 
 class ChangePointDetector(BaseDetector):
@@ -12,13 +65,44 @@ class ChangePointDetector(BaseDetector):
         
         Args:
             config: Configuration dictionary with parameters:
-                - method: Detection method ('bic', 'pelt', 'binseg', 'bottomup', 'window'), default method: sisi
+                - method: Detection method ('bic', 'pelt', 'binseg', 'bottomup', 'window', 'bocpd',
+                  'fast_pelt', 'fast_binseg'), default method: sisi. The fast_* methods run the prefix sum
+                  engine of :mod:`segmentation` (models 'l2' / 'normal'), same breakpoints as pelt / binseg.
+                  'rolling_mad' / 'rolling_zscore' flag the points far from the ``width`` points before them.
+                  'seasonal' flags the days far from the pipe's (month x day of week) baseline.
+                  Plugins add methods through :mod:`registry`
                 - model: Cost model ('l1', 'l2', 'rbf', etc.)
                 - min_size: Minimum segment size (default: 3)
                 - penalty: Penalty term for BIC/PELT (default: 'default')
                 - n_bkps: Number of breakpoints for methods that require it (default: 3)
                 - jump: Jump value for approximation methods (default: 5)
-                - width: Window width for window-based method (default: 5)
+                - width: Window width for window-based and rolling methods (default: 5)
+                - z_threshold: Score above which rolling / seasonal methods flag a point
+                  (default: 3.5 rolling_mad, 3.0 rolling_zscore / seasonal)
+                - fit_cache_size: Fitted ruptures algorithms kept for reuse (default: 8)
+                - standardize: Scale every column of a 2-D signal to zero mean / unit variance, so that
+                  no indicator dominates the cost by its unit (default: True)
+                - max_points: Opt-in, longer signals run the segmentation methods (except window) with the l2 cost
+                  coarse-to-fine, they run on the signal aggregated by ``coarse_factor`` days (more for very long
+                  signals, so that the coarse pass has no more candidate breakpoints than a max_points long daily
+                  signal), then every breakpoint is refined on the daily points around it. An approximation:
+                  breakpoints closer than a block merge, so penalties near the noise level find fewer of them
+                  than the exact path. None runs every signal at full resolution (default: None)
+                - coarse_factor: Days per aggregated point of the coarse pass (default: 7, weekly)
+                - bootstrap_samples: Bootstrap resamples scoring the confidence of every change point,
+                  results get a 'scores' list next to 'change_points' (see :mod:`bootstrap`). The days of the
+                  point anomaly methods (sisi, rolling, seasonal) are scored against a baseline of unflagged
+                  days, the change points of the other methods as a shift of the mean. 0 disables (default: 0)
+                - bootstrap_window: Points compared on each side of a change point, or baseline days of a point
+                  anomaly (default: width)
+                - bootstrap_block: Length of the resampled blocks of the change point scores
+                  (default: cube root of 2 * bootstrap_window)
+                - bootstrap_seed: Seed of the resamples, None draws a fresh one (default: 0)
+                - bootstrap_workers: Processes scoring the change points of long series (default: 1)
+
+        The ruptures methods and the fast_* methods also accept 2-D ``(n_samples, n_features)`` signals,
+        e.g. ship_cnt next to the BCI indicators of :mod:`mcp_conductor.storage.bci_series`, with the
+        multivariate 'l2' / 'rbf' / 'normal' (full covariance) cost models.
         """
         super().__init__(config)
         self.method = self.config.get('method', 'sisi')
@@ -28,42 +112,358 @@ class ChangePointDetector(BaseDetector):
         self.n_bkps = self.config.get('n_bkps', 3)
         self.jump = self.config.get('jump', 5)
         self.width = self.config.get('width', 5)
+        self.z_threshold = self.config.get('z_threshold')
+        self.standardize = self.config.get('standardize', True)
+        self.max_points = self.config.get('max_points')
+        self.coarse_factor = self.config.get('coarse_factor', 7)
+        self.bootstrap_samples = self.config.get('bootstrap_samples', 0)
+        self.bootstrap_window = self.config.get('bootstrap_window')
+        self.bootstrap_block = self.config.get('bootstrap_block')
+        self.bootstrap_seed = self.config.get('bootstrap_seed', 0)
+        self.bootstrap_workers = self.config.get('bootstrap_workers', 1)
         self.algo = None
+        # fitted ruptures algorithms, so querying the same signal with other n_bkps / penalties doesn't refit
+        self.fit_cache_size = self.config.get('fit_cache_size', 8)
+        self._fit_cache: OrderedDict = OrderedDict()
+        # detectors of the coarse passes per aggregation factor, they keep their own fitted algorithms
+        self._coarse_detectors: Dict[int, "ChangePointDetector"] = {}
 
-    def detect(self, value: Union[List[float], np.ndarray], pipe_name: str | None = None) -> Dict[str, Any]:
+    def detect(
+        self,
+        value: Union[List[float], np.ndarray],
+        pipe_name: str | None = None,
+        date_ids: Union[List[int], np.ndarray, None] = None,
+    ) -> Dict[str, Any]:
         """
         Detect change points in a time series.
         
         Args:
-            input_data: Time series data as a list or numpy array
+            input_data: Time series data as a list, numpy array or pandas Series, 2-D ``(n_samples, n_features)``
+                for the multivariate methods. Arrays and Series are read in place, not copied
+            date_ids: date_id (YYYYMMDD) of every point, needed by the seasonal method
             
         Returns:
             Dict[str, Any]: Detection results including change point indices
         """
 
-        # Convert input to numpy array if it's a list
-        signal = np.array(value) if isinstance(value, list) else value
-        
+        # Convert input to numpy array, arrays and Series columns are viewed without a copy
+        signal = _as_input_array(value)
+
         # Check if we have enough data points
         if len(signal) < self.min_size:
             return {'change_points': [], 'status': 'error', 'message': 'Time series too short'}
             
-        # Select and run the appropriate algorithm
-        if self.method == 'bic':
-            change_points = self._detect_bic(signal)
-        elif self.method == "sisi":
-            change_points = self._detect_sisi(signal, pipe_name)
-        elif self.method == 'pelt':
-            change_points = self._detect_pelt(signal)
-        elif self.method == 'binseg':
-            change_points = self._detect_binary_segmentation(signal)
-        elif self.method == 'bottomup':
-            change_points = self._detect_bottom_up(signal)
-        elif self.method == 'window':
-            change_points = self._detect_window(signal)
-        else:
+        # Select and run the appropriate algorithm, its backend is imported on first use
+        try:
+            detect_method = get_method(self.method)
+        except KeyError:
             return {'change_points': [], 'status': 'error', 'message': f'Unknown method: {self.method}'}
-        return {'change_points': change_points, 'status': 'success', 'method': self.method, 'message': ''}
+        if np.ndim(signal) == 2 and np.shape(signal)[1] > 1:
+            if not supports_multivariate(self.method):
+                return {
+                    'change_points': [], 'status': 'error', 'message': f'Method {self.method} only supports 1-d signals'
+                }
+            signal = self._multivariate_signal(signal)
+        if (
+            self.max_points and len(signal) > self.max_points
+            and self.method in COARSE_TO_FINE_METHODS and self.model in COARSE_TO_FINE_MODELS
+        ):
+            change_points = self._detect_coarse_to_fine(detect_method, signal, pipe_name)
+        else:
+            change_points = detect_method(self, signal, pipe_name, date_ids)
+        result = {'change_points': change_points, 'status': 'success', 'method': self.method, 'message': ''}
+        if self.bootstrap_samples:
+            result['scores'] = self._bootstrap_scores(signal, change_points)
+        return result
+
+    def detect_many(
+        self,
+        signals: Union[Dict[str, Union[List[float], np.ndarray]], np.ndarray],
+        lengths: Union[List[int], np.ndarray, None] = None,
+        pipe_names: List[str] | None = None,
+        configs: Dict[str, Dict[str, Any]] | None = None,
+        raise_errors: bool = True,
+        date_ids: Dict[str, Union[List[int], np.ndarray]] | None = None,
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Detect change points in the series of many pipes at once.
+
+        Pipes running the sisi method are screened together in one vectorized pass, over the padded 2-D array
+        or over the series of a dict laid end to end (a single series is screened in place, without a copy),
+        other methods fall back to :meth:`detect` per pipe.
+
+        Args:
+            signals: Either a dict of pipe name -> series (2-D for the multivariate methods),
+                or a padded 2-D array with one pipe per row
+            lengths: Valid length of each row when ``signals`` is a 2-D array (default: full rows)
+            pipe_names: Pipe name of each row when ``signals`` is a 2-D array
+            configs: Per pipe config overrides on top of this detector's config, e.g. thresholds
+            raise_errors: If False, a pipe that fails (e.g. no thresholds) gets an error result instead of raising
+            date_ids: date_ids of the series per pipe name, needed by the seasonal method
+
+        Returns:
+            Dict[str, Dict[str, Any]]: Detection results per pipe, shaped like the ones of :meth:`detect`
+        """
+        configs = configs or {}
+        date_ids = date_ids or {}
+        if isinstance(signals, dict):
+            pipe_names = list(signals)
+            # arrays / Series are viewed, multivariate series are passed to detect as they are
+            rows = [_as_input_array(signals[pipe_name]) for pipe_name in pipe_names]
+            rows = [row if row.ndim == 2 else _as_signal_array(row) for row in rows]
+            row_lengths = np.array([row.shape[0] for row in rows], dtype=np.int64)
+            matrix = None
+        else:
+            rows = None
+            matrix = np.asarray(signals)
+            if matrix.ndim != 2:
+                raise ValueError("signals must be a dict or a 2-D array")
+            if pipe_names is None or len(pipe_names) != matrix.shape[0]:
+                raise ValueError("pipe_names must name every row of signals")
+            if matrix.dtype == object:
+                matrix = np.array([_as_signal_array(row) for row in matrix], dtype=np.float64)
+            row_lengths = (
+                np.full(matrix.shape[0], matrix.shape[1], dtype=np.int64)
+                if lengths is None else np.asarray(lengths, dtype=np.int64)
+            )
+
+        results: Dict[str, Dict[str, Any]] = {}
+        # rows screened by the vectorized sisi pass, thresholds stay NaN (never out of band) for the others
+        min_cnts = np.full(len(pipe_names), np.nan)
+        max_cnts = np.full(len(pipe_names), np.nan)
+        sisi_rows = []
+        detectors = []
+        for i, pipe_name in enumerate(pipe_names):
+            detector = ChangePointDetector({**self.config, **configs[pipe_name]}) if pipe_name in configs else self
+            detectors.append(detector)
+            n = int(row_lengths[i])
+            try:
+                if detector.method != 'sisi' or n < detector.min_size or rows is not None and rows[i].ndim == 2:
+                    signal = rows[i] if rows is not None else matrix[i, :n]
+                    results[pipe_name] = detector.detect(
+                        signal, pipe_name=pipe_name, date_ids=date_ids.get(pipe_name)
+                    )
+                    continue
+                min_cnts[i], max_cnts[i] = detector._sisi_thresholds(pipe_name)
+            except ValueError as e:
+                if raise_errors:
+                    raise
+                results[pipe_name] = {'change_points': [], 'status': 'error', 'message': repr(e)}
+                continue
+            sisi_rows.append(i)
+
+        if sisi_rows and rows is not None:
+            # one pass over the rows laid end to end (no padding), a single row is screened in place
+            lengths = row_lengths[sisi_rows]
+            flat = rows[sisi_rows[0]] if len(sisi_rows) == 1 else np.concatenate([rows[i] for i in sisi_rows])
+            # NaN compares False on both sides so missing values are skipped
+            out_of_band = (
+                (flat < np.repeat(min_cnts[sisi_rows], lengths)) | (flat > np.repeat(max_cnts[sisi_rows], lengths))
+            )
+            offsets = np.concatenate(([0], np.cumsum(lengths)))
+            positions = np.flatnonzero(out_of_band)
+            bounds = np.searchsorted(positions, offsets)
+            for k, i in enumerate(sisi_rows):
+                results[pipe_names[i]] = {
+                    'change_points': (positions[bounds[k]:bounds[k + 1]] - offsets[k]).tolist(),
+                    'status': 'success', 'method': 'sisi', 'message': '',
+                }
+        elif sisi_rows:
+            valid = np.arange(matrix.shape[1]) < row_lengths[:, None]
+            out_of_band = ((matrix < min_cnts[:, None]) | (matrix > max_cnts[:, None])) & valid
+            # np.nonzero walks row-major, so the columns of each row come out sorted
+            row_ids, col_ids = np.nonzero(out_of_band)
+            per_row = np.split(col_ids, np.cumsum(np.bincount(row_ids, minlength=matrix.shape[0]))[:-1])
+            for i in sisi_rows:
+                results[pipe_names[i]] = {
+                    'change_points': per_row[i].tolist(), 'status': 'success', 'method': 'sisi', 'message': ''
+                }
+
+        for i in sisi_rows:
+            if detectors[i].bootstrap_samples:
+                signal = rows[i] if rows is not None else matrix[i, :row_lengths[i]]
+                result = results[pipe_names[i]]
+                result['scores'] = detectors[i]._bootstrap_scores(signal, result['change_points'])
+
+        return {pipe_name: results[pipe_name] for pipe_name in pipe_names}
+
+    def _bootstrap_scores(self, signal: np.ndarray, change_points: List[int]) -> List[float]:
+        """
+        Bootstrap confidence of every change point, see :func:`bootstrap.exceedance_scores` for the days of
+        the point anomaly methods and :func:`bootstrap.bootstrap_scores` for the others.
+
+        Args:
+            signal: The signal the change points were detected on (standardized for 2-D signals)
+            change_points: Indices of the detected change points
+
+        Returns:
+            List[float]: Score in [0, 1] of every change point
+        """
+        arr = np.asarray(signal) if np.ndim(signal) == 2 else _as_signal_array(signal)
+        if self.method in POINT_ANOMALY_METHODS:
+            return exceedance_scores(
+                arr,
+                change_points,
+                window=self.bootstrap_window or self.width,
+                n_resamples=self.bootstrap_samples,
+                seed=self.bootstrap_seed,
+                workers=self.bootstrap_workers,
+            ).tolist()
+        return bootstrap_scores(
+            arr,
+            change_points,
+            window=self.bootstrap_window or self.width,
+            n_resamples=self.bootstrap_samples,
+            block_size=self.bootstrap_block,
+            seed=self.bootstrap_seed,
+            workers=self.bootstrap_workers,
+        ).tolist()
+
+    def state_key(self, pipe_name: str) -> str:
+        """
+        Version of the per-pipe state the method reads besides its config, the resolved sisi thresholds or the
+        seasonal baseline. It is part of the keys of cached and materialized results, so results detected with
+        former thresholds / baselines are not served after a recompute.
+
+        Args:
+            pipe_name: Name of the pipe
+
+        Returns:
+            str: Empty for methods without per-pipe state, or a pipe the state is missing for
+        """
+        if self.method == 'sisi':
+            try:
+                min_cnt, max_cnt = self._sisi_thresholds(pipe_name)
+            except ValueError:
+                return ""
+            return f"thresholds:{min_cnt!r},{max_cnt!r}"
+        if self.method == 'seasonal':
+            from mcp_conductor.storage.baselines import get_baseline_cache
+
+            baseline = get_baseline_cache().get(pipe_name)
+            return "" if baseline is None else f"baseline:{baseline.version}"
+        return ""
+
+    def _sisi_thresholds(self, pipe_name: str) -> Tuple[float, float]:
+        """
+        Resolve the (min, max) alert thresholds of a pipe for the SISI algorithm.
+
+        Args:
+            pipe_name: Name of the pipe
+
+        Returns:
+            Tuple[float, float]: min and max alert ship cnt
+        """
+        # allow overriding thresholds via detector config, the lookup is only consulted for the missing ones
+        min_cnt = self.config.get("min_alert_cnt")
+        max_cnt = self.config.get("max_alert_cnt")
+        if min_cnt is None or max_cnt is None:
+            # storage pulls in pandas and sqlalchemy, only loaded when the lookup is needed
+            from mcp_conductor.storage.thresholds import get_threshold_lookup
+
+            thresholds = get_threshold_lookup().get(pipe_name)
+            if thresholds is None:
+                raise ValueError(
+                    f"No sisi thresholds for pipe {pipe_name}, run mcp_conductor.entry.main_precompute_thresholds "
+                    "or set min_alert_cnt / max_alert_cnt in the detector config."
+                )
+            min_cnt = thresholds[0] if min_cnt is None else min_cnt
+            max_cnt = thresholds[1] if max_cnt is None else max_cnt
+        return min_cnt, max_cnt
+
+    def _detect_coarse_to_fine(self, detect_method: Callable, signal: np.ndarray, pipe_name: str | None) -> List[int]:
+        """
+        Run a segmentation method on the aggregated signal, then refine each breakpoint on the daily points.
+
+        Blocks of ``factor`` days are summed and scaled by 1 / sqrt(days), which keeps the noise variance and the
+        l2 cost of a mean shift of the daily signal, so the penalties keep their meaning on the coarse pass
+        (only for the l2 cost, the other models run at full resolution).
+        The coarse pass (every block is a candidate) has at most ``max_points / jump`` points, as many candidates
+        as a ``max_points`` long daily signal, and the refinement looks at ``O(factor)`` points per breakpoint,
+        which bounds the runtime whatever the window length.
+
+        Args:
+            detect_method: The registered method
+            signal: The time series signal to analyze
+            pipe_name: Name of the pipe
+
+        Returns:
+            List[int]: Indices of detected change points
+        """
+        arr = np.asarray(signal, dtype=np.float64)
+        n_samples = arr.shape[0]
+        factor = max(self.coarse_factor, ceil(n_samples * max(self.jump, 1) / self.max_points))
+        starts = np.arange(0, n_samples, factor)
+        days = np.diff(np.append(starts, n_samples)).reshape(-1, *([1] * (arr.ndim - 1)))
+        coarse = np.add.reduceat(arr, starts, axis=0) / np.sqrt(days)
+
+        detector = self._coarse_detectors.get(factor)
+        if detector is None:
+            detector = self._coarse_detectors[factor] = ChangePointDetector({
+                **self.config,
+                'min_size': max(1, ceil(self.min_size / factor)),
+                'jump': 1,
+                'max_points': None,
+            })
+        coarse_bkps = detect_method(detector, coarse, pipe_name, None)
+        return self._refine_breakpoints(arr, [int(bkp) * factor for bkp in coarse_bkps], factor)
+
+    def _refine_breakpoints(self, signal: np.ndarray, bkps: List[int], radius: int) -> List[int]:
+        """
+        Move every breakpoint to the best single split within ``radius`` points of it.
+
+        Each breakpoint is refined on the points between its refined predecessor and its successor
+        (at most ``2 * radius`` away on each side), with the prefix sum l2 cost, which scores every
+        candidate in one vectorized expression (coarse-to-fine only runs the l2 cost, see COARSE_TO_FINE_MODELS).
+
+        Args:
+            signal: The full resolution signal
+            bkps: Sorted breakpoints of the coarse pass, at full resolution
+            radius: Search distance around each breakpoint
+
+        Returns:
+            List[int]: Refined breakpoints
+        """
+        from mcp_conductor.detector.generic.segmentation import PrefixSumCost
+
+        cost = PrefixSumCost(self.model).fit(signal)
+        n_samples = signal.shape[0]
+        min_size = max(self.min_size, cost.min_size)
+
+        refined: List[int] = []
+        for i, bkp in enumerate(bkps):
+            lo = max(refined[-1] if refined else 0, bkp - 2 * radius)
+            hi = min(bkps[i + 1] if i + 1 < len(bkps) else n_samples, bkp + 2 * radius)
+            candidates = np.arange(max(lo + min_size, bkp - radius), min(hi - min_size, bkp + radius) + 1)
+            if candidates.shape[0] == 0:
+                if not refined or bkp > refined[-1]:
+                    refined.append(bkp)
+                continue
+            errors = cost.error(lo, candidates) + cost.error(candidates, hi)
+            refined.append(int(candidates[int(np.argmin(errors))]))
+        return refined
+
+    def _multivariate_signal(self, signal: np.ndarray) -> np.ndarray:
+        """
+        Prepare a 2-D signal for the multivariate cost models.
+
+        Args:
+            signal: Signal of shape (n_samples, n_features)
+
+        Returns:
+            np.ndarray: float signal, every column standardized when ``standardize`` is set
+        """
+        arr = np.asarray(signal, dtype=np.float64)
+        if np.isnan(arr).any():
+            raise ValueError(
+                "Multivariate signals can't have missing values, align the series with "
+                "mcp_conductor.storage.bci_series.align_by_date first."
+            )
+        if not self.standardize:
+            return arr
+        std = arr.std(axis=0)
+        # constant columns are only centered
+        return (arr - arr.mean(axis=0)) / np.where(std > 0, std, 1.0)
 
     def _detect_sisi(self, signal: np.ndarray, pipe_name: str) -> List[int]:
         """
@@ -75,39 +475,42 @@ class ChangePointDetector(BaseDetector):
         Returns:
             List[int]: Indices of detected change points
         """
-        THRESHOLD_DICT: dict = {
-            "曼德海峡": {
-                "min_alert_cnt": 13,
-                "max_alert_cnt": 41
-            }
-        }
+        min_cnt, max_cnt = self._sisi_thresholds(pipe_name)
+        arr = _as_signal_array(signal)
 
-        # allow overriding thresholds via detector config
-        min_cnt = self.config.get("min_alert_cnt", THRESHOLD_DICT[pipe_name]["min_alert_cnt"])
-        max_cnt = self.config.get("max_alert_cnt", THRESHOLD_DICT[pipe_name]["max_alert_cnt"])
+        # collect indices where value is below min or above max,
+        # NaN compares False on both sides so missing values are skipped
+        out_of_band = (arr < min_cnt) | (arr > max_cnt)
+        return np.flatnonzero(out_of_band).tolist()
+    
+    def _fitted(self, signal: np.ndarray, method: str, create: Callable[[], Any]) -> Any:
+        """
+        Return a ruptures algorithm fitted on ``signal``, reused from a bounded LRU when possible.
 
-        # ensure signal is a 1-d numpy array
-        arr = np.asarray(signal).ravel()
+        The fitted algorithm keeps its cost structures and memoized segmentations, so predicting
+        the same signal again with another n_bkps or penalty skips the fit.
 
-        indices: List[int] = []
-        for idx, val in enumerate(arr):
-            # skip missing values
-            try:
-                if val is None or (isinstance(val, float) and np.isnan(val)):
-                    continue
-            except Exception:
-                # if np.isnan fails for non-numeric, attempt numeric cast
-                try:
-                    val = float(val)
-                except Exception:
-                    continue
+        Args:
+            signal: The time series signal to analyze
+            method: Detection method the algorithm is created for
+            create: Factory of the unfitted algorithm
 
-            # collect index when value is below min or above max
-            if val < min_cnt or val > max_cnt:
-                indices.append(int(idx))
+        Returns:
+            Any: The fitted ruptures algorithm
+        """
+        key = (_signal_key(signal), method, self.model, self.min_size, self.jump, self.width)
+        algo = self._fit_cache.get(key)
+        if algo is not None:
+            self._fit_cache.move_to_end(key)
+        else:
+            algo = create()
+            algo.fit(signal)
+            self._fit_cache[key] = algo
+            while len(self._fit_cache) > self.fit_cache_size:
+                self._fit_cache.popitem(last=False)
+        self.algo = algo
+        return algo
 
-        return indices
-    
     def _detect_bic(self, signal: np.ndarray) -> List[int]:
         """
         Detect change points using Bayesian Information Criterion (BIC).
@@ -118,9 +521,12 @@ class ChangePointDetector(BaseDetector):
         Returns:
             List[int]: Indices of detected change points
         """
+        import ruptures as rpt
+
         # Create and fit algorithm
-        algo = rpt.Dynp(model=self.model, min_size=self.min_size)
-        algo.fit(signal)
+        algo = self._fitted(
+            signal, 'bic', lambda: rpt.Dynp(model=self.model, min_size=self.min_size, jump=self.jump)
+        )
         
         if isinstance(self.penalty, (int, float)) and self.penalty != 'default':
             # Higher penalty = fewer breakpoints, lower penalty = more breakpoints
@@ -137,18 +543,30 @@ class ChangePointDetector(BaseDetector):
             
         return changes
     
-    def _detect_pelt(self, signal: np.ndarray) -> List[int]:
+    def _detect_pelt(self, signal: np.ndarray, native: bool = False) -> List[int]:
         """
         Detect change points using PELT algorithm.
         
         Args:
             signal: The time series signal to analyze
+            native: Use the prefix sum engine instead of ruptures
             
         Returns:
             List[int]: Indices of detected change points
         """
-        algo = rpt.Pelt(model=self.model, min_size=self.min_size)
-        algo.fit(signal)
+        if native:
+            from mcp_conductor.detector.generic import segmentation
+
+            algo = self._fitted(
+                signal, 'fast_pelt',
+                lambda: segmentation.Pelt(model=self.model, min_size=self.min_size, jump=self.jump),
+            )
+        else:
+            import ruptures as rpt
+
+            algo = self._fitted(
+                signal, 'pelt', lambda: rpt.Pelt(model=self.model, min_size=self.min_size, jump=self.jump)
+            )
         
         # For PELT, we can specify penalty parameter
         if self.penalty == 'default':
@@ -164,18 +582,131 @@ class ChangePointDetector(BaseDetector):
             
         return changes
     
-    def _detect_binary_segmentation(self, signal: np.ndarray) -> List[int]:
+    def penalty_path(
+        self, value: Union[List[float], np.ndarray], pen_min: float, pen_max: float
+    ) -> List[Dict[str, Any]]:
+        """
+        Optimal PELT segmentations for every penalty in ``[pen_min, pen_max]``, using CROPS
+        (Haynes, Eckley & Fearnhead, 2017).
+
+        PELT only runs at the penalties where two segmentations can tie, which is at most
+        2 * (number of distinct segmentations) runs instead of a loop over a penalty grid.
+        CROPS assumes an exact solver, ruptures' PELT isn't (candidates on the ``jump`` grid, pruning),
+        so every interval of the hull is checked against PELT at its midpoint and bisected where they
+        disagree: each row reports the segmentation PELT returns at the middle of its interval.
+
+        Args:
+            value: Time series data as a list, numpy array or pandas Series
+            pen_min: Lowest penalty of the range (> 0)
+            pen_max: Highest penalty of the range
+
+        Returns:
+            List[Dict[str, Any]]: One row per penalty interval, ordered by penalty: ``pen_min`` / ``pen_max``
+            bounds of the interval, ``n_bkps``, ``change_points`` and the unpenalized segmentation ``cost``
+        """
+        if pen_min <= 0 or pen_max < pen_min:
+            raise ValueError("penalty range must satisfy 0 < pen_min <= pen_max")
+        import ruptures as rpt
+
+        signal = _as_input_array(value)
+        algo = self._fitted(
+            signal, 'pelt', lambda: rpt.Pelt(model=self.model, min_size=self.min_size, jump=self.jump)
+        )
+
+        # n_bkps -> (cost, change points) of every segmentation PELT returned
+        segmentations: Dict[int, Tuple[float, List[int]]] = {}
+
+        def solve(pen: float) -> Tuple[float, int, float]:
+            bkps = algo.predict(pen=pen)
+            cost = float(algo.cost.sum_of_costs(bkps))
+            n_bkps = len(bkps) - 1
+            if n_bkps not in segmentations or cost < segmentations[n_bkps][0]:
+                segmentations[n_bkps] = (cost, bkps[:-1])
+            return pen, n_bkps, cost
+
+        intervals = [(solve(pen_min), solve(pen_max))]
+        while intervals:
+            (pen_0, m_0, cost_0), (pen_1, m_1, cost_1) = intervals.pop()
+            if m_0 <= m_1 + 1:
+                continue
+            # penalty where the two segmentations have the same penalized cost
+            pen_int = (cost_1 - cost_0) / (m_0 - m_1)
+            if not pen_0 < pen_int < pen_1:
+                continue
+            middle = solve(pen_int)
+            if middle[1] not in (m_0, m_1):
+                intervals.append(((pen_0, m_0, cost_0), middle))
+                intervals.append((middle, (pen_1, m_1, cost_1)))
+
+        # lower convex hull of (n_bkps, cost), every hull point is optimal on the interval between its neighbours
+        hull: List[Tuple[int, float, float]] = []  # (n_bkps, cost, lowest penalty it is optimal for)
+        for n_bkps in sorted(segmentations, reverse=True):
+            cost = segmentations[n_bkps][0]
+            while hull:
+                start = (cost - hull[-1][1]) / (hull[-1][0] - n_bkps)
+                if start > hull[-1][2]:
+                    break
+                hull.pop()
+            hull.append((n_bkps, cost, (cost - hull[-1][1]) / (hull[-1][0] - n_bkps) if hull else -np.inf))
+
+        path: List[Dict[str, Any]] = []
+
+        def add_row(low: float, high: float, change_points: List[int]) -> None:
+            if path and path[-1]['change_points'] == change_points:
+                # adjacent pieces of one segmentation are merged when PELT agrees on the merged midpoint
+                if algo.predict(pen=(path[-1]['pen_min'] + high) / 2)[:-1] == change_points:
+                    path[-1]['pen_max'] = float(high)
+                    return
+            path.append({
+                'pen_min': float(low),
+                'pen_max': float(high),
+                'n_bkps': len(change_points),
+                'change_points': change_points,
+                'cost': float(algo.cost.sum_of_costs(change_points + [signal.shape[0]])),
+            })
+
+        def verify(low: float, high: float, change_points: List[int], depth: int) -> None:
+            middle = (low + high) / 2
+            predicted = algo.predict(pen=middle)[:-1]
+            if predicted == change_points or depth == 0 or not low < middle < high:
+                add_row(low, high, predicted)
+                return
+            # both halves are checked against what PELT returned here, a PELT answer constant on the
+            # interval ends the bisection after one step
+            verify(low, middle, predicted, depth - 1)
+            verify(middle, high, predicted, depth - 1)
+
+        for i, (n_bkps, cost, start) in enumerate(hull):
+            low = max(pen_min, start)
+            high = min(pen_max, hull[i + 1][2]) if i + 1 < len(hull) else pen_max
+            if low <= high:
+                verify(low, high, segmentations[n_bkps][1], PENALTY_PATH_MAX_BISECTIONS)
+        return path
+
+    def _detect_binary_segmentation(self, signal: np.ndarray, native: bool = False) -> List[int]:
         """
         Detect change points using Binary Segmentation.
         
         Args:
             signal: The time series signal to analyze
+            native: Use the prefix sum engine instead of ruptures
             
         Returns:
             List[int]: Indices of detected change points
         """
-        algo = rpt.Binseg(model=self.model, min_size=self.min_size, jump=self.jump)
-        algo.fit(signal)
+        if native:
+            from mcp_conductor.detector.generic import segmentation
+
+            algo = self._fitted(
+                signal, 'fast_binseg',
+                lambda: segmentation.Binseg(model=self.model, min_size=self.min_size, jump=self.jump),
+            )
+        else:
+            import ruptures as rpt
+
+            algo = self._fitted(
+                signal, 'binseg', lambda: rpt.Binseg(model=self.model, min_size=self.min_size, jump=self.jump)
+            )
         
         # Binary segmentation requires specifying number of breakpoints
         changes = algo.predict(n_bkps=self.n_bkps)
@@ -196,8 +727,11 @@ class ChangePointDetector(BaseDetector):
         Returns:
             List[int]: Indices of detected change points
         """
-        algo = rpt.BottomUp(model=self.model, min_size=self.min_size, jump=self.jump)
-        algo.fit(signal)
+        import ruptures as rpt
+
+        algo = self._fitted(
+            signal, 'bottomup', lambda: rpt.BottomUp(model=self.model, min_size=self.min_size, jump=self.jump)
+        )
         
         # Bottom-Up requires specifying number of breakpoints
         changes = algo.predict(n_bkps=self.n_bkps)
@@ -218,8 +752,11 @@ class ChangePointDetector(BaseDetector):
         Returns:
             List[int]: Indices of detected change points
         """
-        algo = rpt.Window(width=self.width, model=self.model, min_size=self.min_size)
-        algo.fit(signal)
+        import ruptures as rpt
+
+        algo = self._fitted(
+            signal, 'window', lambda: rpt.Window(width=self.width, model=self.model, min_size=self.min_size)
+        )
         
         # Window method requires specifying number of breakpoints
         changes = algo.predict(n_bkps=self.n_bkps)
@@ -230,14 +767,81 @@ class ChangePointDetector(BaseDetector):
             
         return changes
 
+    def _detect_bocpd(self, signal: np.ndarray) -> List[int]:
+        """
+        Detect change points using Bayesian online change point detection, replayed over the whole signal.
+        See :class:`OnlineChangePointDetector` to ingest one day at a time.
+
+        Args:
+            signal: The time series signal to analyze
+
+        Returns:
+            List[int]: Indices of detected change points
+        """
+        from mcp_conductor.detector.generic.online import OnlineChangePointDetector
+
+        return OnlineChangePointDetector(self.config).detect(signal)['change_points']
+
+    def _detect_rolling(self, signal: np.ndarray, robust: bool) -> List[int]:
+        """
+        Detect anomalies using a rolling score against the ``width`` points before each point.
+
+        Args:
+            signal: The time series signal to analyze
+            robust: Median / MAD modified z-score (rolling_mad) instead of mean / std z-score (rolling_zscore)
+
+        Returns:
+            List[int]: Indices of detected anomalies
+        """
+        from mcp_conductor.detector.generic import rolling
+
+        arr = _as_signal_array(signal)
+        if robust:
+            scores = rolling.rolling_mad(arr, self.width, min_periods=self.min_size)
+            threshold = 3.5 if self.z_threshold is None else self.z_threshold
+        else:
+            scores = rolling.rolling_zscore(arr, self.width, min_periods=self.min_size)
+            threshold = 3.0 if self.z_threshold is None else self.z_threshold
+        # missing values have a NaN score and are never flagged
+        return np.flatnonzero(np.abs(scores) > threshold).tolist()
+
+    def _detect_seasonal(
+        self, signal: np.ndarray, pipe_name: str, date_ids: Union[List[int], np.ndarray, None]
+    ) -> List[int]:
+        """
+        Detect anomalies as residuals against the pipe's seasonal (month x day of week) baseline.
+
+        Args:
+            signal: The time series signal to analyze
+            pipe_name: Name of the pipe
+            date_ids: date_id (YYYYMMDD) of every point
+
+        Returns:
+            List[int]: Indices of detected anomalies
+        """
+        if date_ids is None:
+            raise ValueError("The seasonal method needs the date_ids of the signal")
+        from mcp_conductor.storage.baselines import get_baseline_cache
+
+        baseline = get_baseline_cache().get(pipe_name)
+        if baseline is None:
+            raise ValueError(
+                f"No seasonal baseline for pipe {pipe_name}, run mcp_conductor.storage.baselines first."
+            )
+        arr = _as_signal_array(signal).astype(np.float64)
+        mean, std = baseline.expected(date_ids)
+        threshold = 3.0 if self.z_threshold is None else self.z_threshold
+        # NaN (missing value, cell without history) compares False and is never flagged
+        return np.flatnonzero(np.abs(arr - mean) > threshold * std).tolist()
+
     def set_method(self, method: str) -> None:
         """
         Set the change point detection method.
         
         Args:
-            method: One of 'bic', 'pelt', 'binseg', 'bottomup', 'window'
+            method: A registered method, see :func:`registry.available_methods`
         """
-        valid_methods = ['bic', 'pelt', 'binseg', 'bottomup', 'window']
+        valid_methods = available_methods()
         if method not in valid_methods:
             raise ValueError(f"Method must be one of {valid_methods}")
         self.method = method
@@ -264,3 +868,42 @@ class ChangePointDetector(BaseDetector):
         for param, value in params.items():
             if hasattr(self, param):
                 setattr(self, param, value)
+
+
+# built-in methods, ruptures and the other backends are imported inside the methods on first use
+register_method('sisi', lambda detector, signal, pipe_name, date_ids: detector._detect_sisi(signal, pipe_name))
+register_method('bic', lambda detector, signal, pipe_name, date_ids: detector._detect_bic(signal), multivariate=True)
+register_method(
+    'pelt', lambda detector, signal, pipe_name, date_ids: detector._detect_pelt(signal), multivariate=True
+)
+register_method(
+    'binseg',
+    lambda detector, signal, pipe_name, date_ids: detector._detect_binary_segmentation(signal),
+    multivariate=True,
+)
+register_method(
+    'bottomup', lambda detector, signal, pipe_name, date_ids: detector._detect_bottom_up(signal), multivariate=True
+)
+register_method(
+    'window', lambda detector, signal, pipe_name, date_ids: detector._detect_window(signal), multivariate=True
+)
+register_method('bocpd', lambda detector, signal, pipe_name, date_ids: detector._detect_bocpd(signal))
+register_method(
+    'fast_pelt',
+    lambda detector, signal, pipe_name, date_ids: detector._detect_pelt(signal, native=True),
+    multivariate=True,
+)
+register_method(
+    'fast_binseg',
+    lambda detector, signal, pipe_name, date_ids: detector._detect_binary_segmentation(signal, native=True),
+    multivariate=True,
+)
+register_method(
+    'rolling_mad', lambda detector, signal, pipe_name, date_ids: detector._detect_rolling(signal, robust=True)
+)
+register_method(
+    'rolling_zscore', lambda detector, signal, pipe_name, date_ids: detector._detect_rolling(signal, robust=False)
+)
+register_method(
+    'seasonal', lambda detector, signal, pipe_name, date_ids: detector._detect_seasonal(signal, pipe_name, date_ids)
+)
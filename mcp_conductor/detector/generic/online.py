@@ -0,0 +1,237 @@
+"""
+Online change point detection (Bayesian online change point detection, Adams & MacKay 2007).
+
+Each pipe keeps a run-length posterior: for every hypothesis "the current segment started on day s" its
+probability and the Normal-Inverse-Gamma statistics of the segment. Ingesting one day costs
+O(max_run_length), independent of the history length, and the state is checkpointed to a ``.npz`` file
+so a daily job resumes where it stopped.
+"""
+import logging
+import math
+import os
+from typing import Any, Dict, List, Union
+
+import numpy as np
+
+from mcp_conductor.detector.generic.base_detector import BaseDetector
+
+logger = logging.getLogger(__name__)
+
+
+def _logsumexp(values: np.ndarray) -> float:
+    peak = values.max()
+    return float(peak + np.log(np.exp(values - peak).sum()))
+
+
+class RunLengthState:
+    """Run-length posterior of one pipe, index 0 is the most recent segment hypothesis.
+
+    A hypothesis is opened with the prior statistics, its start (position / date_id) is filled in by
+    the first observation it receives, until then it is -1.
+    """
+
+    __slots__ = (
+        "log_probs", "mu", "beta", "counts", "start_idx", "start_date_ids",
+        "prior_mu", "prior_beta", "n_obs", "last_date_id", "segment_start", "change_points", "change_date_ids",
+    )
+
+    _ARRAYS = ("log_probs", "mu", "beta", "counts", "start_idx", "start_date_ids", "change_points", "change_date_ids")
+    _FLOATS = ("prior_mu", "prior_beta")
+    _INTS = ("n_obs", "last_date_id", "segment_start")
+
+    def __init__(self, prior_mu: float = 0.0, prior_beta: float = 1.0) -> None:
+        self.log_probs = np.zeros(1)
+        self.mu = np.array([prior_mu])
+        self.beta = np.array([prior_beta])
+        self.counts = np.zeros(1, dtype=np.int64)
+        self.start_idx = np.full(1, -1, dtype=np.int64)
+        self.start_date_ids = np.full(1, -1, dtype=np.int64)
+        self.prior_mu = prior_mu
+        self.prior_beta = prior_beta
+        # positions seen so far, last ingested date_id, start position of the last reported segment
+        self.n_obs = 0
+        self.last_date_id = -1
+        self.segment_start = -1
+        self.change_points = np.zeros(0, dtype=np.int64)
+        self.change_date_ids = np.zeros(0, dtype=np.int64)
+
+    def save(self, path: str) -> None:
+        """Checkpoint the state to ``path`` (npz), written atomically."""
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        payload = {name: getattr(self, name) for name in self._ARRAYS}
+        payload.update({name: np.float64(getattr(self, name)) for name in self._FLOATS})
+        payload.update({name: np.int64(getattr(self, name)) for name in self._INTS})
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(f, **payload)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "RunLengthState":
+        """Restore a state checkpointed by :meth:`save`."""
+        state = cls()
+        with np.load(path) as data:
+            for name in cls._ARRAYS:
+                setattr(state, name, data[name])
+            for name in cls._FLOATS:
+                setattr(state, name, float(data[name]))
+            for name in cls._INTS:
+                setattr(state, name, int(data[name]))
+        return state
+
+
+class OnlineChangePointDetector(BaseDetector):
+    def __init__(self, config: Dict[str, Any] | None = None) -> None:
+        """
+        Initialize the online change point detector with configuration.
+
+        Args:
+            config: Configuration dictionary with parameters:
+                - hazard: Prior probability that a segment ends on any given day (default: 1/250)
+                - max_run_length: Run-length hypotheses kept per pipe, bounds the cost of an update (default: 366)
+                - lag: Days a new segment is looked for after it started (default: 14)
+                - threshold: Posterior mass of the segments started in the last ``lag`` days that
+                  reports a change point (default: 0.5)
+                - prior_mean: Prior segment mean, default: the first value of the pipe
+                - prior_kappa / prior_alpha: Normal-Inverse-Gamma prior strength (default: 1.0 / 1.0)
+                - prior_beta: Prior scale of the variance, default: the first value of the pipe (count data)
+        """
+        super().__init__(config)
+        self.hazard = float(self.config.get('hazard', 1 / 250))
+        self.max_run_length = int(self.config.get('max_run_length', 366))
+        self.lag = int(self.config.get('lag', 14))
+        self._log_threshold = math.log(float(self.config.get('threshold', 0.5)))
+        self.prior_kappa = float(self.config.get('prior_kappa', 1.0))
+        self.prior_alpha = float(self.config.get('prior_alpha', 1.0))
+        self.states: Dict[str, RunLengthState] = {}
+        # lgamma(alpha + 0.5) - lgamma(alpha) of a segment holding n observations, grown on demand
+        self._log_norm = np.zeros(0)
+
+    def update(self, pipe_name: str, value: float | None, date_id: int | None = None) -> Dict[str, Any]:
+        """
+        Ingest the next observation of a pipe.
+
+        Args:
+            pipe_name: Name of the pipe
+            value: ship cnt of the next day, missing values (None / NaN) only advance the position
+            date_id: date of the observation, kept to resume from a checkpoint
+
+        Returns:
+            Dict[str, Any]: ``change_points`` (positions) found by this update, and the MAP ``run_length``
+        """
+        state = self.states.get(pipe_name)
+        position = state.n_obs if state is not None else 0
+        missing = value is None or math.isnan(value)
+        if state is None:
+            if missing:
+                return {'change_points': [], 'status': 'success', 'run_length': 0}
+            state = self.states[pipe_name] = self._new_state(float(value))
+
+        state.n_obs = position + 1
+        if date_id is not None:
+            state.last_date_id = int(date_id)
+        if missing:
+            return {'change_points': [], 'status': 'success', 'run_length': self._run_length(state)}
+
+        x = float(value)
+        date = -1 if date_id is None else int(date_id)
+        # the newest hypothesis receives its first observation
+        if state.start_idx[0] < 0:
+            state.start_idx[0] = position
+            state.start_date_ids[0] = date
+
+        # growth / change probabilities from the Student-t predictive of every hypothesis
+        log_joint = state.log_probs + self._log_predictive(state, x)
+        log_cp = _logsumexp(log_joint) + math.log(self.hazard)
+        log_growth = log_joint + math.log1p(-self.hazard)
+
+        # posterior update of the segment statistics, then open the "next day starts a segment" hypothesis
+        kappa = self.prior_kappa + state.counts
+        state.beta = state.beta + kappa * (x - state.mu) ** 2 / (2 * (kappa + 1))
+        state.mu = (kappa * state.mu + x) / (kappa + 1)
+        state.counts = state.counts + 1
+        state.log_probs = np.concatenate(([log_cp], log_growth))
+        state.mu = np.concatenate(([state.prior_mu], state.mu))
+        state.beta = np.concatenate(([state.prior_beta], state.beta))
+        state.counts = np.concatenate(([0], state.counts))
+        state.start_idx = np.concatenate(([-1], state.start_idx))
+        state.start_date_ids = np.concatenate(([-1], state.start_date_ids))
+        if state.log_probs.shape[0] > self.max_run_length:
+            self._prune(state)
+        state.log_probs -= _logsumexp(state.log_probs)
+
+        # a change point is reported once the segments started in the last ``lag`` days hold most of the mass
+        change_points: List[int] = []
+        later = (state.counts <= self.lag) & (state.start_idx > state.segment_start)
+        if later.any() and _logsumexp(state.log_probs[later]) > self._log_threshold:
+            best = int(np.flatnonzero(later)[np.argmax(state.log_probs[later])])
+            start = int(state.start_idx[best])
+            if state.segment_start >= 0:
+                change_points.append(start)
+                state.change_points = np.append(state.change_points, start)
+                state.change_date_ids = np.append(state.change_date_ids, state.start_date_ids[best])
+            state.segment_start = start
+        return {'change_points': change_points, 'status': 'success', 'run_length': self._run_length(state)}
+
+    def detect(self, value: Union[List[float], np.ndarray], pipe_name: str | None = None) -> Dict[str, Any]:
+        """
+        Run the online detector over a whole series from an empty state.
+
+        Args:
+            value: Time series data as a list or numpy array
+
+        Returns:
+            Dict[str, Any]: Detection results including change point indices
+        """
+        key = pipe_name or ""
+        self.states.pop(key, None)
+        change_points: List[int] = []
+        for val in np.asarray(value, dtype=np.float64).ravel():
+            change_points.extend(self.update(key, val)['change_points'])
+        self.states.pop(key, None)
+        return {'change_points': change_points, 'status': 'success', 'method': 'bocpd', 'message': ''}
+
+    def save_state(self, pipe_name: str, path: str) -> None:
+        """Checkpoint the state of a pipe to ``path``."""
+        self.states[pipe_name].save(path)
+
+    def load_state(self, pipe_name: str, path: str) -> bool:
+        """Restore the state of a pipe from ``path``, returns False if there is no checkpoint yet."""
+        if not os.path.exists(path):
+            return False
+        self.states[pipe_name] = RunLengthState.load(path)
+        return True
+
+    def _new_state(self, first_value: float) -> RunLengthState:
+        prior_mu = float(self.config.get('prior_mean', first_value))
+        prior_beta = self.config.get('prior_beta')
+        prior_beta = max(abs(first_value), 1.0) if prior_beta is None else float(prior_beta)
+        return RunLengthState(prior_mu, prior_beta)
+
+    def _prune(self, state: RunLengthState) -> None:
+        """Drop the least likely hypothesis (never the newest one), long stable segments are kept."""
+        drop = 1 + int(np.argmin(state.log_probs[1:]))
+        for name in ("log_probs", "mu", "beta", "counts", "start_idx", "start_date_ids"):
+            setattr(state, name, np.delete(getattr(state, name), drop))
+
+    def _log_predictive(self, state: RunLengthState, x: float) -> np.ndarray:
+        """Student-t log density of ``x`` under every hypothesis."""
+        max_count = int(state.counts.max())
+        if max_count >= self._log_norm.shape[0]:
+            alphas = self.prior_alpha + np.arange(max(2 * max_count, 64)) / 2
+            self._log_norm = np.array([math.lgamma(a + 0.5) - math.lgamma(a) for a in alphas])
+
+        alpha = self.prior_alpha + state.counts / 2
+        kappa = self.prior_kappa + state.counts
+        nu = 2 * alpha
+        scale2 = state.beta * (kappa + 1) / (alpha * kappa)
+        return (
+            self._log_norm[state.counts]
+            - 0.5 * np.log(nu * np.pi * scale2)
+            - (nu + 1) / 2 * np.log1p((x - state.mu) ** 2 / (nu * scale2))
+        )
+
+    @staticmethod
+    def _run_length(state: RunLengthState) -> int:
+        """Observations in the MAP segment."""
+        return int(state.counts[int(np.argmax(state.log_probs))])
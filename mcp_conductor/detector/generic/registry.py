@@ -0,0 +1,122 @@
+"""
+Registry of the :class:`ChangePointDetector` methods.
+
+A method is a function ``(detector, signal, pipe_name, date_ids) -> change point indices``. Methods are
+registered with :func:`register_method` (decorator), or lazily as an ``"module:function"`` target that
+is only imported on first use, so heavy backends (ruptures, scipy) stay out of the cold start of
+processes that only run the threshold method.
+
+Third-party packages add methods through the ``mcp_conductor.detector_methods`` entry point group::
+
+    [project.entry-points."mcp_conductor.detector_methods"]
+    my_method = "my_package.detectors:detect_my_method"
+
+Entry points are only scanned when a method isn't registered in-process.
+
+Methods are univariate unless registered with ``multivariate=True`` (or the function has a truthy
+``multivariate`` attribute), only those receive 2-D ``(n_samples, n_features)`` signals.
+"""
+import importlib
+import logging
+import threading
+from importlib.metadata import entry_points
+from typing import Any, Callable, Dict, List
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+ENTRY_POINT_GROUP = "mcp_conductor.detector_methods"
+
+DetectMethod = Callable[[Any, np.ndarray, "str | None", "np.ndarray | None"], List[int]]
+
+_METHODS: Dict[str, DetectMethod] = {}
+_LAZY_METHODS: Dict[str, str] = {}
+_MULTIVARIATE_METHODS: set = set()
+_REGISTRY_LOCK = threading.Lock()
+_entry_points_loaded = False
+
+
+def register_method(name: str, func: DetectMethod | None = None, multivariate: bool = False):
+    """
+    Register a detection method, usable as ``@register_method("name")`` or ``register_method("name", func)``.
+
+    Args:
+        name: Method name, the ``method`` of the detector config
+        func: Detection function ``(detector, signal, pipe_name, date_ids) -> List[int]``
+        multivariate: The method accepts 2-D signals
+
+    Returns:
+        The decorator, or ``func`` when given
+    """
+    def decorator(f: DetectMethod) -> DetectMethod:
+        with _REGISTRY_LOCK:
+            _METHODS[name] = f
+            _LAZY_METHODS.pop(name, None)
+            if multivariate:
+                _MULTIVARIATE_METHODS.add(name)
+        return f
+
+    return decorator if func is None else decorator(func)
+
+
+def register_lazy_method(name: str, target: str, multivariate: bool = False) -> None:
+    """
+    Register a method by its ``"module:function"`` path, the module is imported on first use.
+
+    Args:
+        name: Method name
+        target: Import path of the detection function
+        multivariate: The method accepts 2-D signals
+    """
+    with _REGISTRY_LOCK:
+        if name not in _METHODS:
+            _LAZY_METHODS[name] = target
+            if multivariate:
+                _MULTIVARIATE_METHODS.add(name)
+
+
+def get_method(name: str) -> DetectMethod:
+    """
+    Resolve a method, importing its backend on first use.
+
+    Raises:
+        KeyError: if no method is registered under ``name``
+    """
+    func = _METHODS.get(name)
+    if func is not None:
+        return func
+    if name not in _LAZY_METHODS:
+        _load_entry_points()
+    target = _LAZY_METHODS.get(name)
+    if target is None:
+        raise KeyError(name)
+    module_name, _, attr = target.partition(":")
+    func = getattr(importlib.import_module(module_name), attr)
+    logger.debug(f"Loaded detection method {name} from {target}")
+    return register_method(name, func)
+
+
+def supports_multivariate(name: str) -> bool:
+    """
+    Whether a method accepts 2-D ``(n_samples, n_features)`` signals.
+
+    Raises:
+        KeyError: if no method is registered under ``name``
+    """
+    return name in _MULTIVARIATE_METHODS or bool(getattr(get_method(name), "multivariate", False))
+
+
+def available_methods() -> List[str]:
+    """Names of every registered method, including the ones of installed entry points."""
+    _load_entry_points()
+    return sorted({*_METHODS, *_LAZY_METHODS})
+
+
+def _load_entry_points() -> None:
+    global _entry_points_loaded
+    if _entry_points_loaded:
+        return
+    for entry_point in entry_points(group=ENTRY_POINT_GROUP):
+        register_lazy_method(entry_point.name, entry_point.value)
+    _entry_points_loaded = True
@@ -0,0 +1,121 @@
+"""
+Rolling (sliding window) anomaly scores, a cheap screening for very long series.
+
+Every point is scored against the ``width`` points before it (the point itself is left out, so a spike
+doesn't inflate its own spread), missing values (NaN) are skipped and never scored.
+
+- :func:`rolling_zscore`: mean / standard deviation from prefix sums, O(n).
+- :func:`rolling_mad`: median / median absolute deviation from a sorted window that is updated by one
+  insertion and one removal per point, O(n log w) comparisons, no window is recomputed.
+"""
+from bisect import bisect_left, insort
+
+import numpy as np
+
+# MAD of a normal sample is 0.6745 sigma, used for the modified z-score (Iglewicz & Hoaglin)
+MAD_SCALE = 0.6745
+
+
+def rolling_zscore(signal: np.ndarray, width: int, min_periods: int = 2) -> np.ndarray:
+    """
+    z-score of every point against the mean / standard deviation of the ``width`` points before it.
+
+    Args:
+        signal: 1-d float array, NaN for missing values
+        width: trailing window length
+        min_periods: valid values a window needs, fewer gives a NaN score
+
+    Returns:
+        np.ndarray: scores, NaN where the point is missing or the window too sparse
+    """
+    arr = np.asarray(signal, dtype=np.float64)
+    valid = ~np.isnan(arr)
+    # centering keeps the sum of squares - squared sum accurate on large counts
+    centered = np.where(valid, arr - (arr[valid].mean() if valid.any() else 0.0), 0.0)
+    zero = np.zeros(1)
+    cnt = np.concatenate([zero, np.cumsum(valid)])
+    s1 = np.concatenate([zero, np.cumsum(centered)])
+    s2 = np.concatenate([zero, np.cumsum(centered ** 2)])
+
+    end = np.arange(arr.shape[0])
+    start = np.maximum(end - width, 0)
+    n = cnt[end] - cnt[start]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean = (s1[end] - s1[start]) / n
+        var = (s2[end] - s2[start]) / n - mean ** 2
+        deviation = centered - mean
+        # below the rounding error of the prefix sums the window is constant
+        tolerance = 64 * np.finfo(np.float64).eps * s2[end] / n
+        flat = var <= tolerance
+        var[flat] = 0.0
+        deviation[flat & (deviation ** 2 <= tolerance)] = 0.0
+        scores = _ratio(deviation, np.sqrt(var * n / (n - 1)))
+    scores[~valid | (n < max(min_periods, 2))] = np.nan
+    return scores
+
+
+def rolling_mad(signal: np.ndarray, width: int, min_periods: int = 2) -> np.ndarray:
+    """
+    Modified z-score ``0.6745 * (x - median) / MAD`` of every point against the ``width`` points before it.
+
+    Args:
+        signal: 1-d float array, NaN for missing values
+        width: trailing window length
+        min_periods: valid values a window needs, fewer gives a NaN score
+
+    Returns:
+        np.ndarray: scores, NaN where the point is missing or the window too sparse
+    """
+    arr = np.asarray(signal, dtype=np.float64)
+    medians = np.full(arr.shape[0], np.nan)
+    mads = np.full(arr.shape[0], np.nan)
+    window: list = []  # sorted valid values of arr[i - width:i]
+    values = arr.tolist()
+    min_periods = max(min_periods, 1)
+    for i, x in enumerate(values):
+        if i >= 1 and values[i - 1] == values[i - 1]:
+            insort(window, values[i - 1])
+        if i > width and values[i - width - 1] == values[i - width - 1]:
+            del window[bisect_left(window, values[i - width - 1])]
+        if x == x and len(window) >= min_periods:
+            medians[i], mads[i] = _median_mad(window)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return _ratio(MAD_SCALE * (arr - medians), mads)
+
+
+def _median_mad(window: list) -> tuple[float, float]:
+    """Median and median absolute deviation of a sorted list, in O(log w)."""
+    n = len(window)
+    half = n // 2
+    median = window[half] if n % 2 else (window[half - 1] + window[half]) / 2
+    # the deviations below / above the median are two sorted sequences, the MAD is their merged median
+    split = bisect_left(window, median)
+    if n % 2:
+        return median, _kth_deviation(window, median, split, half)
+    return median, (_kth_deviation(window, median, split, half - 1) + _kth_deviation(window, median, split, half)) / 2
+
+
+def _kth_deviation(window: list, median: float, split: int, k: int) -> float:
+    """k-th (0 based) smallest ``|x - median|``, ``window[:split]`` are below the median."""
+    # take i deviations from below (median - window[split - 1 - j]) and k + 1 - i from above
+    lo, hi = max(0, k + 1 - (len(window) - split)), min(k + 1, split)
+    while lo < hi:
+        i = (lo + hi) // 2
+        # is the (i + 1)-th deviation from below smaller than the (k + 1 - i)-th one from above
+        if median - window[split - 1 - i] < window[split + k - i] - median:
+            lo = i + 1
+        else:
+            hi = i
+    i = lo
+    below = median - window[split - i] if i > 0 else -np.inf
+    above = window[split + k - i] - median if k - i >= 0 else -np.inf
+    return max(below, above)
+
+
+def _ratio(deviation: np.ndarray, scale: np.ndarray) -> np.ndarray:
+    """deviation / scale, a deviation from a constant window is an infinite score, no deviation is 0."""
+    scores = deviation / scale
+    flat = scale == 0
+    scores[flat] = np.where(deviation[flat] == 0, 0.0, np.copysign(np.inf, deviation[flat]))
+    return scores
@@ -0,0 +1,297 @@
+"""
+Native segmentation engine for the ``l2`` and ``normal`` cost models.
+
+Segment costs come from prefix sums of the (centered) signal and its square (its outer products for the
+multivariate ``normal`` model), so the cost of any segment is O(1) and the candidates of a PELT / binary
+segmentation step are scored in one vectorized numpy expression instead of one ruptures cost call each.
+
+``Pelt`` and ``Binseg`` follow the ruptures estimators step by step (admissible set, pruning rule,
+tie breaking), they return the same breakpoints and expose the same ``fit`` / ``predict`` API.
+Prefix sums round differently than ruptures' per segment ``var``, so the candidates within rounding
+distance of a decision (exact ties are common on integer counts) are re-scored with the ruptures formula.
+"""
+from itertools import pairwise
+from math import ceil, floor
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+SUPPORTED_MODELS = ('l2', 'normal')
+
+
+def _sanity_check(n_samples: int, n_bkps: int, jump: int, min_size: int) -> bool:
+    """Whether a segmentation exists for the parameters (same rule as ``ruptures.utils.sanity_check``)."""
+    if n_bkps > n_samples // jump:
+        return False
+    if n_bkps * ceil(min_size / jump) * jump + min_size > n_samples:
+        return False
+    return True
+
+
+class PrefixSumCost:
+    def __init__(self, model: str = 'l2') -> None:
+        """
+        Segment cost from prefix sums.
+
+        Args:
+            model: 'l2' (n * variance, summed over dimensions) or 'normal' (n * log det(covariance + 1e-6 I))
+        """
+        if model not in SUPPORTED_MODELS:
+            raise ValueError(f"Model must be one of {list(SUPPORTED_MODELS)}")
+        self.model = model
+        self.min_size = 1 if model == 'l2' else 2
+        self.signal = None
+        self.tolerance = 0.0
+        self._sum = None
+        self._sum_sq = None
+        self._cross = None
+
+    def fit(self, signal: np.ndarray) -> "PrefixSumCost":
+        """
+        Compute the prefix sums of a signal.
+
+        Args:
+            signal: array of shape (n_samples,) or (n_samples, n_features)
+
+        Returns:
+            PrefixSumCost: self
+        """
+        signal = np.asarray(signal)
+        self.signal = signal.reshape(-1, 1) if signal.ndim == 1 else signal
+        # centering keeps sum of squares - squared sum small, i.e. the variances accurate
+        centered = self.signal - self.signal.mean(axis=0)
+        zeros = np.zeros((1, self.signal.shape[1]))
+        self._sum = np.concatenate([zeros, np.cumsum(centered, axis=0)])
+        self._sum_sq = np.concatenate([zeros, np.cumsum(centered ** 2, axis=0)])
+        if self.model == 'normal' and self.signal.shape[1] > 1:
+            # prefix sums of the outer products, the segment covariances need the cross terms
+            n_dims = self.signal.shape[1]
+            self._cross = np.concatenate([
+                np.zeros((1, n_dims, n_dims)), np.cumsum(centered[:, :, None] * centered[:, None, :], axis=0)
+            ])
+        else:
+            self._cross = None
+        # rounding error of the prefix sum scatter, decisions closer than error_bound() are re-scored exactly
+        self.tolerance = 64 * np.finfo(np.float64).eps * self.signal.shape[0] * (float(self._sum_sq[-1].sum()) + 1.0)
+        return self
+
+    def error(self, start, end):
+        """
+        Cost of the segments ``[start:end]``, start / end can be integers or arrays of the same shape.
+
+        Returns:
+            float or np.ndarray: segment costs
+        """
+        length = np.asarray(end - start, dtype=np.float64)
+        if self._cross is not None:
+            return np.linalg.slogdet(self._covariance(start, end))[1] * length
+        seg_sum = self._sum[end] - self._sum[start]
+        seg_sum_sq = self._sum_sq[end] - self._sum_sq[start]
+        # n * variance of every dimension, clipped against rounding below zero
+        scatter = np.maximum(seg_sum_sq - seg_sum ** 2 / length[..., None], 0.0)
+        if self.model == 'l2':
+            return scatter.sum(axis=-1)
+        return np.log(scatter[..., 0] / length + 1e-6) * length
+
+    def error_bound(self, start, end):
+        """
+        Bound of the rounding error of :meth:`error` on the segments ``[start:end]``.
+
+        Returns:
+            float or np.ndarray: error bounds
+        """
+        if self.model == 'l2':
+            return np.full(np.shape(end - start), self.tolerance)
+        if self._cross is not None:
+            # d/dC of n * log det(C) is n * C^-1, the scatter error is shared by the n - 1 degrees of freedom
+            length = np.asarray(end - start, dtype=np.float64)
+            inverse = np.linalg.inv(self._covariance(start, end))
+            return self.tolerance * np.trace(inverse, axis1=-2, axis2=-1) * length / (length - 1)
+        # d/dvar of n * log(var + 1e-6) is n / (var + 1e-6), the scatter error is shared by the n points
+        length = np.asarray(end - start, dtype=np.float64)
+        scatter = np.maximum(self._sum_sq[end, 0] - self._sum_sq[start, 0] - (self._sum[end, 0] - self._sum[start, 0]) ** 2 / length, 0.0)
+        return self.tolerance / (scatter / length + 1e-6)
+
+    def exact_error(self, start: int, end: int) -> float:
+        """Cost of the segment ``[start:end]`` computed like the ruptures cost (same rounding)."""
+        sub = self.signal[start:end]
+        if self.model == 'l2':
+            return sub.var(axis=0).sum() * (end - start)
+        # ruptures uses the unbiased covariance for multivariate signals, the biased variance for 1-d ones
+        cov = np.cov(sub.T) if sub.shape[1] > 1 else np.array([[sub.var()]])
+        cov = cov + 1e-6 * np.eye(sub.shape[1])
+        _, val = np.linalg.slogdet(cov)
+        return val * (end - start)
+
+    def _covariance(self, start, end) -> np.ndarray:
+        """Unbiased covariance (+ 1e-6 I) of the segments ``[start:end]``, shape (..., n_features, n_features)."""
+        length = np.asarray(end - start, dtype=np.float64)[..., None, None]
+        seg_sum = self._sum[end] - self._sum[start]
+        scatter = self._cross[end] - self._cross[start] - seg_sum[..., :, None] * seg_sum[..., None, :] / length
+        return scatter / (length - 1) + 1e-6 * np.eye(self.signal.shape[1])
+
+    def sum_of_costs(self, bkps: List[int]) -> float:
+        """Total cost of the segmentation ending at each of ``bkps``."""
+        return float(sum(self.error(start, end) for start, end in pairwise([0] + bkps)))
+
+
+class Pelt:
+    def __init__(self, model: str = 'l2', min_size: int = 2, jump: int = 5) -> None:
+        """
+        Penalized change point detection (PELT) on prefix sum costs.
+
+        Args:
+            model: 'l2' or 'normal'
+            min_size: Minimum segment length
+            jump: Subsample (one candidate every ``jump`` points)
+        """
+        self.cost = PrefixSumCost(model)
+        self.min_size = max(min_size, self.cost.min_size)
+        self.jump = jump
+        self.n_samples = None
+        self._total = None
+
+    def fit(self, signal: np.ndarray) -> "Pelt":
+        self.cost.fit(signal)
+        self.n_samples = self.cost.signal.shape[0]
+        return self
+
+    def predict(self, pen: float) -> List[int]:
+        """
+        Return the optimal breakpoints (the last one is the signal length).
+
+        Args:
+            pen: Penalty value (> 0)
+        """
+        if not _sanity_check(self.n_samples, 0, self.jump, self.min_size):
+            raise ValueError("Impossible segmentation configuration")
+
+        n_samples = self.n_samples
+        # total penalized cost and last segment start of the optimal partition of signal[0:t]
+        total = self._total = np.zeros(n_samples + 1)
+        previous = np.zeros(n_samples + 1, dtype=np.int64)
+        solved = np.zeros(n_samples + 1, dtype=bool)
+        solved[0] = True
+
+        admissible = np.zeros(0, dtype=np.int64)
+        ind = [k for k in range(0, n_samples, self.jump) if k >= self.min_size] + [n_samples]
+        for bkp in ind:
+            new_adm_pt = floor((bkp - self.min_size) / self.jump) * self.jump
+            admissible = np.append(admissible, new_adm_pt)
+            # admissible points without a partition are skipped (not removed), as in ruptures
+            starts = admissible[solved[admissible]]
+            sums = total[starts] + (self.cost.error(starts, bkp) + pen)
+            bounds = self.cost.error_bound(starts, bkp) + 4 * np.finfo(np.float64).eps * np.abs(sums)
+            rescored = np.zeros(starts.shape[0], dtype=bool)
+            self._rescore(sums, rescored, starts, bkp, pen, sums - bounds <= (sums + bounds).min())
+            best = int(np.argmin(sums))
+            total[bkp] = sums[best]
+            previous[bkp] = starts[best]
+            solved[bkp] = True
+            # pruning pairs admissible points with the subproblems positionally, as ruptures does
+            threshold = sums[best] + pen
+            self._rescore(sums, rescored, starts, bkp, pen, np.abs(sums - threshold) <= bounds + bounds[best])
+            admissible = admissible[:starts.shape[0]][sums <= threshold]
+
+        bkps = []
+        end = n_samples
+        while end > 0:
+            bkps.append(int(end))
+            end = previous[end]
+        return sorted(bkps)
+
+    def _rescore(
+        self, sums: np.ndarray, rescored: np.ndarray, starts: np.ndarray, bkp: int, pen: float, mask: np.ndarray
+    ) -> None:
+        """Replace the penalized costs of ``mask`` by their exact (ruptures rounding) value, in place."""
+        total = self._total
+        for i in np.flatnonzero(mask & ~rescored):
+            sums[i] = total[starts[i]] + (self.cost.exact_error(int(starts[i]), bkp) + pen)
+            rescored[i] = True
+
+    def fit_predict(self, signal: np.ndarray, pen: float) -> List[int]:
+        return self.fit(signal).predict(pen)
+
+
+class Binseg:
+    def __init__(self, model: str = 'l2', min_size: int = 2, jump: int = 5) -> None:
+        """
+        Binary segmentation on prefix sum costs.
+
+        Args:
+            model: 'l2' or 'normal'
+            min_size: Minimum segment length
+            jump: Subsample (one candidate every ``jump`` points)
+        """
+        self.cost = PrefixSumCost(model)
+        self.min_size = max(min_size, self.cost.min_size)
+        self.jump = jump
+        self.n_samples = None
+        self._single_bkps: Dict[Tuple[int, int], Tuple[int | None, float]] = {}
+
+    def fit(self, signal: np.ndarray) -> "Binseg":
+        self.cost.fit(signal)
+        self.n_samples = self.cost.signal.shape[0]
+        self._single_bkps = {}
+        return self
+
+    def single_bkp(self, start: int, end: int) -> Tuple[int | None, float]:
+        """Return the optimal breakpoint of ``[start:end]`` and its gain, ``(None, 0)`` if there is none."""
+        key = (start, end)
+        if key not in self._single_bkps:
+            self._single_bkps[key] = self._best_split(start, end)
+        return self._single_bkps[key]
+
+    def _best_split(self, start: int, end: int) -> Tuple[int | None, float]:
+        segment_cost = self.cost.error(start, end)
+        if np.isinf(segment_cost) and segment_cost < 0:
+            return None, 0
+        candidates = np.arange(start, end, self.jump)
+        candidates = candidates[(candidates - start >= self.min_size) & (end - candidates >= self.min_size)]
+        if candidates.shape[0] == 0:
+            return None, 0
+        gains = segment_cost - self.cost.error(start, candidates) - self.cost.error(candidates, end)
+        bounds = (
+            self.cost.error_bound(start, end) + self.cost.error_bound(start, candidates)
+            + self.cost.error_bound(candidates, end) + 4 * np.finfo(np.float64).eps * np.abs(gains)
+        )
+        near = np.flatnonzero(gains + bounds >= (gains - bounds).max())
+        if near.shape[0]:
+            exact_cost = self.cost.exact_error(start, end)
+            for i in near:
+                bkp = int(candidates[i])
+                gains[i] = exact_cost - self.cost.exact_error(start, bkp) - self.cost.exact_error(bkp, end)
+        # ties go to the largest breakpoint, like max() over (gain, bkp) tuples
+        best = candidates.shape[0] - 1 - int(np.argmax(gains[::-1]))
+        return int(candidates[best]), float(gains[best])
+
+    def predict(self, n_bkps: int | None = None, pen: float | None = None) -> List[int]:
+        """
+        Return the breakpoints (the last one is the signal length).
+
+        Args:
+            n_bkps: Number of breakpoints to find
+            pen: Penalty value (> 0), used when n_bkps is not given
+        """
+        if n_bkps is None and pen is None:
+            raise ValueError("Give a parameter.")
+        if not _sanity_check(self.n_samples, 0 if n_bkps is None else n_bkps, self.jump, self.min_size):
+            raise ValueError("Impossible segmentation configuration")
+
+        bkps = [self.n_samples]
+        while True:
+            new_bkps = [self.single_bkp(start, end) for start, end in pairwise([0] + bkps)]
+            bkp, gain = max(new_bkps, key=lambda x: x[1])
+            if bkp is None:
+                break
+            if n_bkps is not None:
+                if len(bkps) - 1 >= n_bkps:
+                    break
+            elif gain <= pen:
+                break
+            bkps.append(bkp)
+            bkps.sort()
+        return bkps
+
+    def fit_predict(self, signal: np.ndarray, n_bkps: int | None = None, pen: float | None = None) -> List[int]:
+        return self.fit(signal).predict(n_bkps=n_bkps, pen=pen)
@@ -1,24 +1,114 @@
+import asyncio
+import logging
 import pandas as pd
-from datetime import datetime, timedelta
-import glob
 import os
-from pathlib import Path
-from sqlalchemy import create_engine
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
+import numpy as np
+from sqlalchemy.exc import OperationalError
+
+from mcp_conductor.detector.detection_result import DetectionResult
 from mcp_conductor.detector.generic.changepoints import ChangePointDetector
+from mcp_conductor.detector.result_cache import config_hash, get_result_cache
+from mcp_conductor.storage.anomalies import lookup_anomalies, lookup_anomalies_async
+from mcp_conductor.storage.async_ship_cnt import get_async_repository
+from mcp_conductor.storage.series_cache import get_series_cache
+from mcp_conductor.storage.ship_cnt import get_date_window
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DETECTOR_CONFIG = {
+    'method': 'sisi',
+    'penalty': 2,
+    'width': 7  # time window, 7 days
+}
+DEFAULT_CONFIG_HASH = config_hash(DEFAULT_DETECTOR_CONFIG)
+# default detection with a bootstrap confidence score per detected day (see DetectionResult.confident)
+SCORED_DETECTOR_CONFIG = {**DEFAULT_DETECTOR_CONFIG, 'bootstrap_samples': 500}
+
+
+_DETECTION_EXECUTOR: ThreadPoolExecutor | None = None
+_DETECTION_EXECUTOR_LOCK = threading.Lock()
+
 
+def get_detection_executor() -> ThreadPoolExecutor:
+    """Executor reserved for CPU bound detection, sized by ``SISI_DETECT_WORKERS`` (default: cpu count).
 
-def pipe_detect_engine(run_date: str, pipe_name: str, month: int = 1, day: int = 0) -> dict[str, pd.DataFrame]:
+    Kept apart from the default executor, so slow I/O bound work can't starve detection (and vice versa).
     """
-    TODO: currently, this function is just for demonstration purposes. will optimize later.
+    global _DETECTION_EXECUTOR
+    if _DETECTION_EXECUTOR is None:
+        with _DETECTION_EXECUTOR_LOCK:
+            if _DETECTION_EXECUTOR is None:
+                _DETECTION_EXECUTOR = ThreadPoolExecutor(
+                    max_workers=int(os.getenv("SISI_DETECT_WORKERS") or os.cpu_count() or 1),
+                    thread_name_prefix="detector",
+                )
+    return _DETECTION_EXECUTOR
+
+
+def _materialized_result(
+    pipe_name: str, anomalies: pd.DataFrame, start_date_id: int, run_date_id: int, config: dict
+) -> DetectionResult:
+    """Wrap the ``pipe_anomalies`` rows of a window covered by a backfill."""
+    return DetectionResult.from_frame(pipe_name, anomalies, config['method'], start_date_id, run_date_id)
+
+
+def _detector_state(pipe_name: str, config: dict) -> str:
+    """Per-pipe thresholds / baseline version the detection reads besides the config."""
+    return ChangePointDetector(config).state_key(pipe_name)
+
+
+def _detect_window(
+    pipe_name: str,
+    start_date_id: int,
+    run_date_id: int,
+    date_ids: np.ndarray,
+    ship_cnts: np.ndarray,
+    data_version: str,
+    config: dict | None = None,
+    detector_state: str = "",
+) -> dict[str, DetectionResult]:
+    """Run the detector on one pipe window, through the result cache.
+
+    ``data_version`` is the version of the pipe's series, ``detector_state`` the thresholds / baseline
+    the detection reads besides the config (see :func:`_detector_state`), both are part of the cache key.
     """
-    config = {
-        'method': 'sisi', 
-        'penalty': 2,
-        'width': 7  # time window, 7 days
-    }
+    config = config or DEFAULT_DETECTOR_CONFIG
+
+    # historical windows never change, reuse the result until new rows arrive for the pipe
+    result_cache = get_result_cache()
+    cache_key = result_cache.make_key(pipe_name, start_date_id, run_date_id, config, data_version, detector_state)
+    cached_result = result_cache.get(cache_key)
+    if cached_result is not None:
+        return cached_result
+
     detector = ChangePointDetector(config)
 
+    # feed the ship cnt views into detector, will get changepoints as expected.
+    results = detector.detect_many({pipe_name: ship_cnts}, date_ids={pipe_name: date_ids})
+    all_changepoints_result = {
+        name: DetectionResult.from_change_points(
+            name, date_ids, ship_cnts, result["change_points"], config['method'], start_date_id, run_date_id,
+            result.get("scores"),
+        )
+        for name, result in results.items()
+    }
+
+    result_cache.put(cache_key, all_changepoints_result)
+    return all_changepoints_result
+
+
+def pipe_detect_engine(
+    run_date: str, pipe_name: str, month: int = 1, day: int = 0, config: dict | None = None
+) -> dict[str, DetectionResult]:
+    """
+    TODO: currently, this function is just for demonstration purposes. will optimize later.
+
+    ``config`` replaces the default detector config, e.g. :data:`SCORED_DETECTOR_CONFIG` to score every detected day.
+    """
     # # load data from dummy folder
     # dummy_data_folder = "/home/jerry/codebase/sisimcp/data/dummy"
     # dummy_data_files = glob.glob(os.path.join(dummy_data_folder, "*.csv"))
@@ -28,37 +118,85 @@ def pipe_detect_engine(run_date: str, pipe_name: str, month: int = 1, day: int =
     #     df_list.append(_df)
 
     # df = pd.concat(df_list, ignore_index=True)
-    # load data from sqlite
-    db_path = Path("./data/sisi.sqlite")
-    engine = create_engine(f"sqlite:///{db_path.absolute()}") # ensure this # ensure this is the correct path for the sqlite file. 
-    df = pd.read_sql(
-        f"SELECT * FROM ship_cnt_in_pipe WHERE pipe_name = '{pipe_name}'", con=engine
+    config = config or DEFAULT_DETECTOR_CONFIG
+    start_date_id, run_date_id = get_date_window(run_date, month=month, day=day)
+    detector_state = _detector_state(pipe_name, config)
+
+    # windows covered by a backfill are answered from the materialized pipe_anomalies table
+    try:
+        anomalies = lookup_anomalies(pipe_name, start_date_id, run_date_id, config_hash(config), detector_state)
+    except OperationalError as e:
+        logger.debug(f"pipe_anomalies lookup unavailable: {e}")
+        anomalies = None
+    if anomalies is not None:
+        return {pipe_name: _materialized_result(pipe_name, anomalies, start_date_id, run_date_id, config)}
+
+    # load the monitor time window of the pipe, served from the in-memory series cache
+    series_cache = get_series_cache()
+    date_ids, ship_cnts = series_cache.get_window(pipe_name, start_date_id, run_date_id)
+
+    if date_ids.shape[0] == 0:
+        if not series_cache.has_pipe(pipe_name):
+            raise ValueError(
+                f"For {run_date}, {pipe_name} there is no pipe ship cnt data."
+            )
+        # there is no data in the time window
+        return {}
+
+    return _detect_window(
+        pipe_name, start_date_id, run_date_id, date_ids, ship_cnts,
+        series_cache.data_version(pipe_name), config, detector_state,
     )
 
-    if df.shape[0] == 0:
-        raise ValueError(
-            f"For {run_date}, {pipe_name} there is no pipe ship cnt data."
-        )
 
-    # base on run_date find out the records in monitor time window
-    # group by strait name
-    pipe_gdf = df.groupby("pipe_name")
-    all_changepoints_result = {}
-    for pipe_name, group in pipe_gdf:
-        run_date_obj = datetime.strptime(str(run_date), "%Y-%m-%d")
-        start_date_obj = run_date_obj - timedelta(days=day) - pd.DateOffset(months=month)
-        start_date_id = int(start_date_obj.strftime("%Y%m%d"))
-        run_date_id = int(run_date_obj.strftime("%Y%m%d"))
-        
-        group = group.loc[
-            (group['date_id'] >= start_date_id) & (group['date_id'] <= run_date_id)
-        ]
-        if group.shape[0] == 0:
-            # there is no data in the time window, skip this pipe
-            continue
-
-        # feed the ship cnt into detector, will get changepoints as expected.
-        result = detector.detect(group["ship_cnt"].tolist(), pipe_name=pipe_name)
-        changepoints_df = group.iloc[result["change_points"]]
-        all_changepoints_result[pipe_name] = changepoints_df
-    return all_changepoints_result
+async def pipe_detect_engine_async(
+    run_date: str, pipe_name: str, month: int = 1, day: int = 0, config: dict | None = None
+) -> dict[str, DetectionResult]:
+    """Asyncio variant of :func:`pipe_detect_engine` for the tool handlers.
+
+    The series read is awaited on the aiosqlite repository (no executor thread is held on I/O),
+    the thresholds / baseline lookups and the detection itself run in :func:`get_detection_executor`.
+    """
+    config = config or DEFAULT_DETECTOR_CONFIG
+    start_date_id, run_date_id = get_date_window(run_date, month=month, day=day)
+    repository = get_async_repository()
+    loop = asyncio.get_running_loop()
+    detector_state = await loop.run_in_executor(get_detection_executor(), _detector_state, pipe_name, config)
+
+    # windows covered by a backfill are answered from the materialized pipe_anomalies table
+    if repository is not None:
+        try:
+            anomalies = await lookup_anomalies_async(
+                repository, pipe_name, start_date_id, run_date_id, config_hash(config), detector_state
+            )
+        except sqlite3.OperationalError as e:
+            logger.debug(f"pipe_anomalies lookup unavailable: {e}")
+            anomalies = None
+        if anomalies is not None:
+            return {pipe_name: _materialized_result(pipe_name, anomalies, start_date_id, run_date_id, config)}
+
+    series_cache = get_series_cache()
+    date_ids, ship_cnts = await series_cache.get_window_async(
+        pipe_name, start_date_id, run_date_id, repository
+    )
+
+    # the pipe's series is cached at this point, has_pipe / data_version don't touch the database
+    if date_ids.shape[0] == 0:
+        if not series_cache.has_pipe(pipe_name):
+            raise ValueError(
+                f"For {run_date}, {pipe_name} there is no pipe ship cnt data."
+            )
+        return {}
+
+    return await loop.run_in_executor(
+        get_detection_executor(),
+        _detect_window,
+        pipe_name,
+        start_date_id,
+        run_date_id,
+        date_ids,
+        ship_cnts,
+        series_cache.data_version(pipe_name),
+        config,
+        detector_state,
+    )
@@ -1,14 +1,14 @@
 import pandas as pd
 import matplotlib.pyplot as plt
-from datetime import datetime, timedelta
+from datetime import datetime
 import glob
 import os
 import re
 import numpy as np
-from pathlib import Path
-from sqlalchemy import create_engine
 
 from mcp_conductor.detector.generic.changepoints import ChangePointDetector
+from mcp_conductor.storage.series_cache import get_series_cache
+from mcp_conductor.storage.ship_cnt import date_ids_to_datetime64, get_date_window
 
 
 def _safe_filename(s: str) -> str:
@@ -48,35 +48,18 @@ def plot_ship_congestion(run_date: str, pipe_name: str, month: int = 3, day: int
 
     # df = pd.concat(df_list, ignore_index=True)
     # df = pd.concat(df_list, ignore_index=True)
-    # load data from sqlite
-    db_path = Path("data/sisi.sqlite")
-    engine = create_engine(f"sqlite:///{db_path.absolute()}") # ensure this # ensure this is the correct path for the sqlite file. 
-    df = pd.read_sql(
-        "SELECT * FROM ship_cnt_in_pipe", con=engine
-    )
-
-    # Filter data for the specified pipe and time window
-    pipe_df = df[df["pipe_name"] == pipe_name].copy()
-    
-    run_date_obj = datetime.strptime(str(run_date), "%Y-%m-%d")
-    start_date_obj = run_date_obj - timedelta(days=day) - pd.DateOffset(months=month)
-    start_date_id = int(start_date_obj.strftime("%Y%m%d"))
-    run_date_id = int(run_date_obj.strftime("%Y%m%d"))
-
-    pipe_df = pipe_df.loc[
-        (pipe_df['date_id'] >= start_date_id) & (pipe_df['date_id'] <= run_date_id)
-    ]
-
-    if pipe_df.empty:
+    # load the pipe's time window, served from the in-memory series cache
+    start_date_id, run_date_id = get_date_window(run_date, month=month, day=day)
+    date_ids, ship_cnts = get_series_cache().get_window(pipe_name, start_date_id, run_date_id)
+
+    if date_ids.shape[0] == 0:
         raise ValueError(f"No data found for pipe '{pipe_name}' in the given time window.")
 
-    pipe_df['date_str'] = pd.to_datetime(pipe_df['date_id'].astype(str), format='%Y%m%d')
-    pipe_df = pipe_df.sort_values('date_str')
-    
-    ship_counts = pipe_df["ship_cnt"].tolist()
-    
+    # rows are already ordered by date_id, the detector reads the cached arrays in place
+    dates = date_ids_to_datetime64(date_ids)
+
     # Detect changepoints
-    result = detector.detect(ship_counts, pipe_name)
+    result = detector.detect(ship_cnts, pipe_name)
     changepoints = result["change_points"]
 
     # Create plot
@@ -85,17 +68,17 @@ def plot_ship_congestion(run_date: str, pipe_name: str, month: int = 3, day: int
     # Ensure the minus sign is displayed correctly
     plt.rcParams['axes.unicode_minus'] = False
     plt.figure(figsize=(15, 7))
-    plt.plot(pipe_df['date_str'], ship_counts, label='Ship Count', color='blue', zorder=2)
+    plt.plot(dates, ship_cnts, label='Ship Count', color='blue', zorder=2)
 
     # Highlight congestion periods
     if changepoints:
         for i in range(len(changepoints) - 1):
             start_idx = changepoints[i]
             end_idx = changepoints[i+1]
-            avg_count_period = np.mean(ship_counts[start_idx:end_idx])
-            avg_count_total = np.mean(ship_counts)
+            avg_count_period = np.mean(ship_cnts[start_idx:end_idx])
+            avg_count_total = np.mean(ship_cnts)
             if avg_count_period > avg_count_total * 1.1: # Simple logic for congestion
-                 plt.axvspan(pipe_df['date_str'].iloc[start_idx], pipe_df['date_str'].iloc[end_idx-1], color='red', alpha=0.3, label='Congestion' if i == 0 else "")
+                 plt.axvspan(dates[start_idx], dates[end_idx-1], color='red', alpha=0.3, label='Congestion' if i == 0 else "")
 
     plt.title(f'Ship Congestion Analysis for {pipe_name}')
     plt.xlabel('Date')
@@ -0,0 +1,212 @@
+"""
+Cache of ``pipe_detect_engine`` results.
+
+Entries are keyed by (pipe, start date_id, end date_id, detector config hash, data version).
+The data version changes whenever new rows are loaded for the pipe, so stale results are never
+served, and older versions of the pipe are dropped on the next put.
+
+Tiers:
+    - memory: LRU bounded by ``SISI_RESULT_CACHE_SIZE`` (default 256) entries,
+      each entry expires after ``SISI_RESULT_CACHE_TTL_SECONDS`` (default 3600).
+    - sqlite (optional): enabled by ``SISI_RESULT_CACHE_PATH``, survives restarts and is shared
+      between server processes. It only holds ``{pipe_name: DetectionResult}`` results, stored as JSON:
+      nothing read back from the shared file is ever unpickled.
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+from mcp_conductor.detector.detection_result import SCHEMA_VERSION, DetectionResult
+from mcp_conductor.storage.engine import get_engine
+
+logger = logging.getLogger(__name__)
+
+# payloads are ``{pipe_name: DetectionResult.to_dict()}`` JSON documents, one table per DetectionResult layout:
+# payloads of another layout are never read back. The detection_result_cache_v* tables of older releases
+# held pickles and are left unread.
+RESULT_CACHE_TABLE = f"detection_result_json_v{SCHEMA_VERSION}"
+
+
+def _dump_payload(value: Dict[str, DetectionResult]) -> str:
+    if not all(isinstance(result, DetectionResult) for result in value.values()):
+        raise TypeError("only {pipe_name: DetectionResult} results are persisted")
+    return json.dumps({pipe_name: result.to_dict() for pipe_name, result in value.items()}, ensure_ascii=False)
+
+
+def _load_payload(payload: str) -> Dict[str, DetectionResult]:
+    return {pipe_name: DetectionResult.from_dict(result) for pipe_name, result in json.loads(payload).items()}
+
+
+def config_hash(config: Dict[str, Any]) -> str:
+    """Stable short hash of a detector config."""
+    payload = json.dumps(config, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:16]
+
+
+class DetectionResultCache:
+    def __init__(
+        self,
+        max_entries: int | None = None,
+        ttl: float | None = None,
+        db_path: str | None = None,
+    ) -> None:
+        """Two tier (memory LRU+TTL, optional sqlite) cache of detection results.
+
+        Args:
+            max_entries: memory tier size, default ``SISI_RESULT_CACHE_SIZE`` or 256.
+            ttl: memory tier time to live in seconds, default ``SISI_RESULT_CACHE_TTL_SECONDS`` or 3600.
+            db_path: sqlite file of the persistent tier, default ``SISI_RESULT_CACHE_PATH`` (disabled if empty).
+        """
+        self.max_entries = max_entries if max_entries is not None else int(os.getenv("SISI_RESULT_CACHE_SIZE") or 256)
+        self.ttl = ttl if ttl is not None else float(os.getenv("SISI_RESULT_CACHE_TTL_SECONDS") or 3600)
+        db_path = db_path if db_path is not None else os.getenv("SISI_RESULT_CACHE_PATH")
+        self.engine: Engine | None = get_engine(f"sqlite:///{os.path.abspath(db_path)}") if db_path else None
+
+        self._entries: OrderedDict[tuple, tuple[float, Any]] = OrderedDict()
+        self._pipe_versions: dict[str, str] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        if self.engine is not None:
+            self._create_table()
+
+    def _create_table(self) -> None:
+        with self.engine.begin() as conn:
+            conn.execute(text(
+                f"CREATE TABLE IF NOT EXISTS {RESULT_CACHE_TABLE} ("
+                "cache_key TEXT PRIMARY KEY, pipe_name TEXT NOT NULL, data_version TEXT NOT NULL, "
+                "created_at REAL NOT NULL, payload TEXT NOT NULL)"
+            ))
+            conn.execute(text(
+                f"CREATE INDEX IF NOT EXISTS idx_{RESULT_CACHE_TABLE}_pipe ON {RESULT_CACHE_TABLE} (pipe_name)"
+            ))
+
+    @staticmethod
+    def make_key(
+        pipe_name: str,
+        start_date_id: int,
+        end_date_id: int,
+        config: Dict[str, Any],
+        data_version: str,
+        detector_state: str = "",
+    ) -> tuple:
+        """Key of a result: ``data_version`` is the pipe's series version, the only part whose change makes
+        the pipe's other results stale. ``detector_state`` (thresholds / baseline version) is per config."""
+        return (
+            pipe_name, int(start_date_id), int(end_date_id), config_hash(config), str(detector_state), str(data_version)
+        )
+
+    def get(self, key: tuple) -> Any | None:
+        """Return the cached result of ``key`` or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at >= time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+
+        if self.engine is not None:
+            with self.engine.connect() as conn:
+                row = conn.execute(
+                    text(f"SELECT payload FROM {RESULT_CACHE_TABLE} WHERE cache_key = :cache_key"),
+                    {"cache_key": json.dumps(key, ensure_ascii=False)},
+                ).first()
+            if row is not None:
+                value = _load_payload(row[0])
+                self._put_memory(key, value)
+                self.hits += 1
+                return value
+
+        self.misses += 1
+        return None
+
+    def _put_memory(self, key: tuple, value: Any) -> None:
+        pipe_name, data_version = key[0], key[-1]
+        with self._lock:
+            if self._pipe_versions.get(pipe_name) != data_version:
+                # new rows arrived for this pipe, results of older data versions are stale
+                for stale_key in [k for k in self._entries if k[0] == pipe_name and k[-1] != data_version]:
+                    del self._entries[stale_key]
+                self._pipe_versions[pipe_name] = data_version
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def put(self, key: tuple, value: Any) -> None:
+        """Store ``value`` under ``key`` in every tier, the sqlite tier only takes ``{pipe_name: DetectionResult}``."""
+        self._put_memory(key, value)
+        if self.engine is None:
+            return
+        pipe_name, data_version = key[0], key[-1]
+        try:
+            with self.engine.begin() as conn:
+                conn.execute(
+                    text(f"DELETE FROM {RESULT_CACHE_TABLE} WHERE pipe_name = :pipe_name AND data_version != :data_version"),
+                    {"pipe_name": pipe_name, "data_version": data_version},
+                )
+                conn.execute(
+                    text(
+                        f"INSERT OR REPLACE INTO {RESULT_CACHE_TABLE} "
+                        "(cache_key, pipe_name, data_version, created_at, payload) "
+                        "VALUES (:cache_key, :pipe_name, :data_version, :created_at, :payload)"
+                    ),
+                    {
+                        "cache_key": json.dumps(key, ensure_ascii=False),
+                        "pipe_name": pipe_name,
+                        "data_version": data_version,
+                        "created_at": time.time(),
+                        "payload": _dump_payload(value),
+                    },
+                )
+        except Exception as e:
+            # the persistent tier is best effort, the memory tier already holds the result
+            logger.warning(f"Failed to persist detection result of {pipe_name}: {e}")
+
+    def invalidate(self, pipe_name: str | None = None) -> None:
+        """Drop the results of one pipe (or every pipe) from every tier."""
+        with self._lock:
+            if pipe_name is None:
+                self._entries.clear()
+                self._pipe_versions.clear()
+            else:
+                for key in [k for k in self._entries if k[0] == pipe_name]:
+                    del self._entries[key]
+                self._pipe_versions.pop(pipe_name, None)
+        if self.engine is not None:
+            with self.engine.begin() as conn:
+                if pipe_name is None:
+                    conn.execute(text(f"DELETE FROM {RESULT_CACHE_TABLE}"))
+                else:
+                    conn.execute(
+                        text(f"DELETE FROM {RESULT_CACHE_TABLE} WHERE pipe_name = :pipe_name"),
+                        {"pipe_name": pipe_name},
+                    )
+
+    def stats(self) -> dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries)}
+
+
+_RESULT_CACHE: DetectionResultCache | None = None
+_RESULT_CACHE_LOCK = threading.Lock()
+
+
+def get_result_cache() -> DetectionResultCache:
+    """Return the process-wide detection result cache."""
+    global _RESULT_CACHE
+    if _RESULT_CACHE is None:
+        with _RESULT_CACHE_LOCK:
+            if _RESULT_CACHE is None:
+                _RESULT_CACHE = DetectionResultCache()
+    return _RESULT_CACHE
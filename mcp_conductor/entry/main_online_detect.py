@@ -0,0 +1,95 @@
+"""
+This script is the daily job of the online change point detector.
+For every pipe, the run-length state is restored from its checkpoint, only the days after the checkpoint
+are read from ship_cnt_in_pipe and ingested one by one, then the state is checkpointed again.
+The first run replays the whole history of the pipe.
+
+Checkpoints live under ``<state_dir>/<config hash>/<pipe>.npz``, state_dir defaults to
+``SISI_ONLINE_STATE_DIR`` or ./data/online_state.
+
+Usage:
+    python -m mcp_conductor.entry.main_online_detect [--pipe 曼德海峡] [--state_dir ./data/online_state]
+"""
+import argparse
+import logging
+import os
+import time
+
+from sqlalchemy.engine import Engine
+
+from mcp_conductor.detector.generic.online import OnlineChangePointDetector
+from mcp_conductor.detector.result_cache import config_hash
+from mcp_conductor.storage.engine import get_engine
+from mcp_conductor.storage.ship_cnt import list_pipes, load_pipe_series
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ONLINE_CONFIG = {
+    'method': 'bocpd',
+    'hazard': 1 / 250,
+    'lag': 14,
+}
+
+
+def get_state_dir() -> str:
+    return os.getenv("SISI_ONLINE_STATE_DIR") or os.path.abspath(os.path.join(".", "data", "online_state"))
+
+
+def run_online_detection(
+    pipe_names: list[str] | None = None,
+    state_dir: str | None = None,
+    config: dict | None = None,
+    engine: Engine | None = None,
+) -> dict[str, list[int]]:
+    """Ingest the new days of every pipe (or the given pipes) into the online detector.
+
+    Args:
+        pipe_names: pipes to update, default every pipe in ship_cnt_in_pipe.
+        state_dir: checkpoint directory, default ``SISI_ONLINE_STATE_DIR`` or ./data/online_state.
+        config: online detector config, default ``DEFAULT_ONLINE_CONFIG``.
+
+    Returns:
+        dict[str, list[int]]: date_ids of the change points found by this run, per pipe.
+    """
+    engine = engine or get_engine()
+    config = config or DEFAULT_ONLINE_CONFIG
+    root = os.path.join(state_dir or get_state_dir(), config_hash(config))
+    detector = OnlineChangePointDetector(config)
+
+    found = {}
+    for pipe_name in pipe_names or list_pipes(engine):
+        path = os.path.join(root, f"{pipe_name}.npz")
+        after_date_id = None
+        if detector.load_state(pipe_name, path):
+            after_date_id = detector.states[pipe_name].last_date_id
+
+        df = load_pipe_series(pipe_name, after_date_id=after_date_id, engine=engine)
+        found[pipe_name] = []
+        for date_id, ship_cnt in zip(df["date_id"].to_numpy(), df["ship_cnt"].to_numpy()):
+            if detector.update(pipe_name, ship_cnt, date_id)["change_points"]:
+                found[pipe_name].append(int(detector.states[pipe_name].change_date_ids[-1]))
+
+        if pipe_name in detector.states:
+            detector.save_state(pipe_name, path)
+        logger.info(f"{pipe_name}: ingested {df.shape[0]} days, change points {found[pipe_name]}")
+    return found
+
+
+def run_app():
+    parser = argparse.ArgumentParser(description='daily update of the online change point detector')
+    parser.add_argument("--pipe", type=str, action="append", default=None, help='pipe to update, repeatable (default: all)')
+    parser.add_argument("--state_dir", type=str, default=None, help='checkpoint directory, default: SISI_ONLINE_STATE_DIR or ./data/online_state')
+    parser.add_argument("--db_url", type=str, default=None, help='SQLAlchemy url, default: SISI_DB_URL or ./data/sisi.sqlite')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    started_at = time.perf_counter()
+    found = run_online_detection(args.pipe, args.state_dir, engine=get_engine(args.db_url))
+    print(
+        f"Updated {len(found)} pipes, {sum(len(v) for v in found.values())} new change points "
+        f"in {time.perf_counter() - started_at:.2f}s"
+    )
+
+
+if __name__ == "__main__":
+    run_app()
@@ -0,0 +1,195 @@
+"""
+This script is to re-score history in parallel: the ``pipe_detect_engine`` detection runs for every
+(pipe x run_date) combination, fanned out over a process pool.
+
+The series of every pipe are loaded once in the parent and handed to each worker through the pool
+initializer, tasks only carry (pipe, chunk of run dates), so no series is pickled per task.
+
+Usage:
+    python -m mcp_conductor.entry.main_parallel_backfill --start_date 2019-01-01 --end_date 2024-12-31 \
+        [--pipe 曼德海峡] [--workers 8] [--config '{"method": "sisi", "max_alert_cnt": 45}'] [--output scores.csv]
+"""
+import argparse
+import json
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+from sqlalchemy.engine import Engine
+
+from mcp_conductor.detector.generic.changepoints import ChangePointDetector
+from mcp_conductor.detector.pipe_detect_engine import DEFAULT_DETECTOR_CONFIG
+from mcp_conductor.storage.baselines import SeasonalBaseline, get_baseline_cache, load_baseline_cache
+from mcp_conductor.storage.engine import get_engine
+from mcp_conductor.storage.ship_cnt import get_date_window, list_pipes, load_pipe_series
+from mcp_conductor.storage.thresholds import get_threshold_lookup, load_threshold_lookup
+
+logger = logging.getLogger(__name__)
+
+RESULT_COLUMNS = ["pipe_name", "run_date_id", "date_id", "ship_cnt"]
+
+# set once per worker process by _init_worker
+_WORKER_SERIES: dict[str, tuple[np.ndarray, np.ndarray]] = {}
+_WORKER_DETECTOR: ChangePointDetector | None = None
+
+
+def _init_worker(
+    series: dict[str, tuple[np.ndarray, np.ndarray]],
+    config: dict,
+    thresholds: dict[str, tuple[float, float]],
+    baselines: dict[str, SeasonalBaseline],
+) -> None:
+    global _WORKER_SERIES, _WORKER_DETECTOR
+    _WORKER_SERIES = series
+    _WORKER_DETECTOR = ChangePointDetector(config)
+    get_threshold_lookup().update(thresholds)
+    get_baseline_cache().update(baselines)
+
+
+def _detect_run_dates(pipe_name: str, run_dates: list[str], month: int, day: int) -> tuple[str, list, str | None]:
+    """Detect every monitor window of ``run_dates`` for one pipe, inside a worker.
+
+    Returns:
+        tuple: pipe name, ``(run_date_id, anomaly date_ids, anomaly ship_cnts)`` per non empty window,
+        and an error message when the pipe can't be detected (e.g. no thresholds).
+    """
+    date_ids, ship_cnts = _WORKER_SERIES[pipe_name]
+    windows = []
+    try:
+        for run_date in run_dates:
+            start_date_id, run_date_id = get_date_window(run_date, month=month, day=day)
+            lo, hi = np.searchsorted(date_ids, [start_date_id, run_date_id + 1])
+            if hi == lo:
+                # there is no data in the time window
+                continue
+            result = _WORKER_DETECTOR.detect(ship_cnts[lo:hi], pipe_name=pipe_name, date_ids=date_ids[lo:hi])
+            change_points = np.asarray(result["change_points"], dtype=np.int64)
+            windows.append((run_date_id, date_ids[lo:hi][change_points], ship_cnts[lo:hi][change_points]))
+    except ValueError as e:
+        return pipe_name, [], repr(e)
+    return pipe_name, windows, None
+
+
+def parallel_backfill(
+    start_date: str,
+    end_date: str,
+    pipe_names: list[str] | None = None,
+    config: dict | None = None,
+    month: int = 1,
+    day: int = 0,
+    workers: int | None = None,
+    chunk_size: int = 64,
+    engine: Engine | None = None,
+) -> pd.DataFrame:
+    """Run the detection of every run date in ``[start_date, end_date]`` for every pipe (or the given pipes).
+
+    Args:
+        start_date: first run date (YYYY-MM-DD).
+        end_date: last run date (YYYY-MM-DD).
+        pipe_names: pipes to re-score, default every pipe in ship_cnt_in_pipe.
+        config: detector config, default the one used by ``pipe_detect_engine``.
+        month: months of the monitor window before each run date.
+        day: days of the monitor window before each run date.
+        workers: worker processes, default cpu count. 1 runs in the current process.
+        chunk_size: run dates per task.
+
+    Returns:
+        pd.DataFrame: one row per detected anomaly, columns pipe_name, run_date_id, date_id, ship_cnt.
+    """
+    engine = engine or get_engine()
+    config = config or DEFAULT_DETECTOR_CONFIG
+    workers = workers or os.cpu_count() or 1
+    thresholds = load_threshold_lookup(engine).snapshot()
+    baselines = load_baseline_cache(engine).snapshot()
+
+    series = {}
+    for pipe_name in pipe_names or list_pipes(engine):
+        df = load_pipe_series(pipe_name, engine=engine)
+        series[pipe_name] = (
+            df["date_id"].to_numpy(dtype=np.int64), df["ship_cnt"].to_numpy(dtype=np.float64)
+        )
+
+    run_dates = pd.date_range(start_date, end_date, freq="D").strftime("%Y-%m-%d").tolist()
+    tasks = [
+        (pipe_name, run_dates[i:i + chunk_size])
+        for pipe_name in series
+        for i in range(0, len(run_dates), chunk_size)
+    ]
+
+    started_at = time.perf_counter()
+    if workers == 1:
+        _init_worker(series, config, thresholds, baselines)
+        outputs = [_detect_run_dates(pipe_name, chunk, month, day) for pipe_name, chunk in tasks]
+    else:
+        # the pool already spreads the windows over the cpus, workers score their change points in process
+        # instead of each opening a nested bootstrap pool
+        worker_config = {**config, "bootstrap_workers": 1}
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(series, worker_config, thresholds, baselines)) as pool:
+            futures = [pool.submit(_detect_run_dates, pipe_name, chunk, month, day) for pipe_name, chunk in tasks]
+            outputs = [future.result() for future in as_completed(futures)]
+    elapsed = time.perf_counter() - started_at
+    n_windows = len(series) * len(run_dates)
+    logger.info(
+        f"Scored {n_windows} windows ({len(series)} pipes x {len(run_dates)} run dates) with {workers} workers "
+        f"in {elapsed:.2f}s, {n_windows / max(elapsed, 1e-9):.0f} windows/s"
+    )
+
+    # assembled with numpy, one DataFrame per window would dominate the run time
+    pipe_parts, run_date_parts, date_id_parts, ship_cnt_parts = [], [], [], []
+    skipped = set()
+    for pipe_name, windows, error in outputs:
+        if error is not None:
+            if pipe_name not in skipped:
+                logger.warning(f"Skip {pipe_name}: {error}")
+                skipped.add(pipe_name)
+            continue
+        for run_date_id, anomaly_date_ids, anomaly_ship_cnts in windows:
+            pipe_parts.append(np.full(anomaly_date_ids.shape[0], pipe_name, dtype=object))
+            run_date_parts.append(np.full(anomaly_date_ids.shape[0], run_date_id, dtype=np.int64))
+            date_id_parts.append(anomaly_date_ids)
+            ship_cnt_parts.append(anomaly_ship_cnts)
+
+    if not pipe_parts:
+        return pd.DataFrame(columns=RESULT_COLUMNS)
+    result = pd.DataFrame({
+        "pipe_name": np.concatenate(pipe_parts),
+        "run_date_id": np.concatenate(run_date_parts),
+        "date_id": np.concatenate(date_id_parts),
+        "ship_cnt": np.concatenate(ship_cnt_parts),
+    })
+    result = result[~result["pipe_name"].isin(skipped)]
+    return result.sort_values(["pipe_name", "run_date_id", "date_id"], ignore_index=True)
+
+
+def run_app():
+    parser = argparse.ArgumentParser(description='re-score every (pipe x run date) window with a process pool')
+    parser.add_argument("--start_date", type=str, required=True, help='first run date (YYYY-MM-DD)')
+    parser.add_argument("--end_date", type=str, required=True, help='last run date (YYYY-MM-DD)')
+    parser.add_argument("--pipe", type=str, action="append", default=None, help='pipe to re-score, repeatable (default: all)')
+    parser.add_argument("--month", type=int, default=1, help='months of the monitor window')
+    parser.add_argument("--day", type=int, default=0, help='days of the monitor window')
+    parser.add_argument("--workers", type=int, default=None, help='worker processes (default: cpu count)')
+    parser.add_argument("--config", type=str, default=None, help='detector config as JSON (default: pipe_detect_engine config)')
+    parser.add_argument("--output", type=str, default=None, help='write the anomalies to this csv file')
+    parser.add_argument("--db_url", type=str, default=None, help='SQLAlchemy url, default: SISI_DB_URL or ./data/sisi.sqlite')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    config = json.loads(args.config) if args.config else None
+
+    started_at = time.perf_counter()
+    result = parallel_backfill(
+        args.start_date, args.end_date, args.pipe, config,
+        month=args.month, day=args.day, workers=args.workers, engine=get_engine(args.db_url),
+    )
+    print(f"Found {result.shape[0]} anomalies in {time.perf_counter() - started_at:.2f}s")
+    if args.output:
+        result.to_csv(args.output, index=False)
+        print(f"Anomalies written to {args.output}")
+
+
+if __name__ == "__main__":
+    run_app()
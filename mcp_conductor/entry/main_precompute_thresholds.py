@@ -0,0 +1,114 @@
+"""
+This script is to precompute the sisi alert thresholds of every pipe into ``pipe_thresholds``.
+The thresholds are quantiles of the pipe's ship cnt over the trailing ``lookback_days`` ending at
+``end_date`` (default: the last day of each pipe), so a new pipe only needs a run of this job.
+Servers load the table at startup (see ``storage/thresholds.py``).
+
+Usage:
+    python -m mcp_conductor.entry.main_precompute_thresholds [--pipe 曼德海峡] [--lookback_days 365] \
+        [--lower_quantile 0.05] [--upper_quantile 0.95] [--end_date 2024-12-31]
+"""
+import argparse
+import logging
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+from sqlalchemy.engine import Engine
+
+from mcp_conductor.storage.engine import get_engine
+from mcp_conductor.storage.migrations import run_migrations
+from mcp_conductor.storage.ship_cnt import list_pipes, load_pipe_series
+from mcp_conductor.storage.thresholds import (
+    DEFAULT_LOOKBACK_DAYS,
+    DEFAULT_LOWER_QUANTILE,
+    DEFAULT_UPPER_QUANTILE,
+    compute_thresholds,
+    get_threshold_lookup,
+    write_thresholds,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def precompute_thresholds(
+    pipe_names: list[str] | None = None,
+    lookback_days: int = DEFAULT_LOOKBACK_DAYS,
+    lower_quantile: float = DEFAULT_LOWER_QUANTILE,
+    upper_quantile: float = DEFAULT_UPPER_QUANTILE,
+    end_date: str | None = None,
+    engine: Engine | None = None,
+) -> pd.DataFrame:
+    """Compute and store the thresholds of every pipe (or the given pipes).
+
+    Args:
+        pipe_names: pipes to compute, default every pipe in ship_cnt_in_pipe.
+        lookback_days: length of the trailing window the quantiles are computed on.
+        lower_quantile: quantile of the min alert cnt.
+        upper_quantile: quantile of the max alert cnt.
+        end_date: last day of the window (YYYY-MM-DD), default the last day of each pipe.
+
+    Returns:
+        pd.DataFrame: the written rows, one per pipe with data in the window.
+    """
+    engine = engine or get_engine()
+    run_migrations(engine)
+    end_date_id = int(datetime.strptime(str(end_date), "%Y-%m-%d").strftime("%Y%m%d")) if end_date else None
+
+    rows = []
+    for pipe_name in pipe_names or list_pipes(engine):
+        df = load_pipe_series(pipe_name, engine=engine)
+        date_ids = df["date_id"].to_numpy(dtype=np.int64)
+        thresholds = compute_thresholds(
+            date_ids, df["ship_cnt"].to_numpy(dtype=np.float64),
+            lookback_days=lookback_days, lower_quantile=lower_quantile, upper_quantile=upper_quantile,
+            end_date_id=end_date_id,
+        )
+        if thresholds is None:
+            logger.warning(f"Skip {pipe_name}: no ship cnt in the lookback window")
+            continue
+        rows.append({
+            "pipe_name": pipe_name,
+            "min_alert_cnt": thresholds[0],
+            "max_alert_cnt": thresholds[1],
+            "lookback_days": int(lookback_days),
+            "lower_quantile": float(lower_quantile),
+            "upper_quantile": float(upper_quantile),
+            "end_date_id": end_date_id if end_date_id is not None else int(date_ids[-1]),
+        })
+        logger.info(f"{pipe_name}: min_alert_cnt={thresholds[0]:.1f}, max_alert_cnt={thresholds[1]:.1f}")
+
+    result = pd.DataFrame(rows, columns=[
+        "pipe_name", "min_alert_cnt", "max_alert_cnt", "lookback_days", "lower_quantile", "upper_quantile",
+        "end_date_id",
+    ])
+    write_thresholds(result, engine=engine)
+    # the detectors of this process see the new thresholds right away
+    get_threshold_lookup().update({
+        row["pipe_name"]: (row["min_alert_cnt"], row["max_alert_cnt"]) for row in rows
+    })
+    return result
+
+
+def run_app():
+    parser = argparse.ArgumentParser(description='precompute the per-pipe sisi thresholds')
+    parser.add_argument("--pipe", type=str, action="append", default=None, help='pipe to compute, repeatable (default: all)')
+    parser.add_argument("--lookback_days", type=int, default=DEFAULT_LOOKBACK_DAYS, help='trailing window length in days')
+    parser.add_argument("--lower_quantile", type=float, default=DEFAULT_LOWER_QUANTILE, help='quantile of the min alert cnt')
+    parser.add_argument("--upper_quantile", type=float, default=DEFAULT_UPPER_QUANTILE, help='quantile of the max alert cnt')
+    parser.add_argument("--end_date", type=str, default=None, help='last day of the window (YYYY-MM-DD), default: last day of each pipe')
+    parser.add_argument("--db_url", type=str, default=None, help='SQLAlchemy url, default: SISI_DB_URL or ./data/sisi.sqlite')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    started_at = time.perf_counter()
+    result = precompute_thresholds(
+        args.pipe, args.lookback_days, args.lower_quantile, args.upper_quantile, args.end_date,
+        engine=get_engine(args.db_url),
+    )
+    print(f"Stored the thresholds of {result.shape[0]} pipes in {time.perf_counter() - started_at:.2f}s")
+
+
+if __name__ == "__main__":
+    run_app()
@@ -7,20 +7,27 @@ from pprint import pprint
 import argparse
 import json
 
-import pandas as pd
-
+from mcp_conductor.detector.detection_result import DetectionResult
 from mcp_conductor.resources.deepseek.rest_api import DeepSeekClient
 from mcp_conductor.resources.sisi.APIs.LLM import SISIClient
-from mcp_conductor.detector.pipe_detect_engine import pipe_detect_engine
+from mcp_conductor.detector.pipe_detect_engine import DEFAULT_DETECTOR_CONFIG, SCORED_DETECTOR_CONFIG, pipe_detect_engine
 from mcp_conductor.resources.tools import remove_think_tag
 from mcp_conductor.templates.questions import WEB_SEARCH_WEATHER_NEWS
 
+# suggested --min_confidence: changepoints scored below are not sent to deepseek / sisi-ai. The filter is off by
+# default until the scores are calibrated on short windows
+MIN_CONFIDENCE = 0.95
+
 
-def analyze_congestion(pipe_name: str, changepoints: pd.DataFrame) -> str:
-    if changepoints.shape[0] == 0:
+def analyze_congestion(pipe_name: str, changepoints: DetectionResult, min_confidence: float | None = None) -> str:
+    # only the days the bootstrap is confident about are worth the web search / LLM calls
+    if min_confidence is not None:
+        changepoints = changepoints.confident(min_confidence)
+    if len(changepoints) == 0:
         pprint(f"🟢 {pipe_name} 通航正常")
+        return f"🟢 {pipe_name} 通航正常"
     # get the last changepoint
-    changepoints_result = changepoints.iloc[[-1], :]
+    changepoints_result = changepoints.date_ids[-1:].tolist()
 
     # deepseek client
     ds_client = DeepSeekClient()
@@ -28,10 +35,9 @@ def analyze_congestion(pipe_name: str, changepoints: pd.DataFrame) -> str:
 
     # for each changepoints, request deepseek web search to find out the reason.
     detection_records = []
-    for _, row in changepoints_result.iterrows():
+    for changepoint_date_id in changepoints_result:
         # weather, news
-        changepoint_date_id = row['date_id']
-        pipe_name = row['pipe_name']
+        pipe_name = changepoints.pipe_name
         weather_news_question = WEB_SEARCH_WEATHER_NEWS.format(
             date_id = changepoint_date_id,
             pipe_name = pipe_name
@@ -68,10 +74,14 @@ def analyze_congestion(pipe_name: str, changepoints: pd.DataFrame) -> str:
     # print(f"Total records: {len(detection_records)}")
 
 
-def trigger_traffic_detect(run_date: str, pipe_name: str) -> str:
-    changepoints_result: dict[str, pd.DataFrame] = pipe_detect_engine(run_date, pipe_name)
+def trigger_traffic_detect(run_date: str, pipe_name: str, min_confidence: float | None = None) -> str:
+    # the days are only scored when they are filtered
+    config = DEFAULT_DETECTOR_CONFIG if min_confidence is None else SCORED_DETECTOR_CONFIG
+    changepoints_result: dict[str, DetectionResult] = pipe_detect_engine(run_date, pipe_name, config=config)
     changepoints = changepoints_result[pipe_name]
-    detection_text: str = analyze_congestion(pipe_name=pipe_name, changepoints=changepoints)
+    detection_text: str = analyze_congestion(
+        pipe_name=pipe_name, changepoints=changepoints, min_confidence=min_confidence
+    )
     return detection_text
 
 
@@ -79,13 +89,15 @@ def run_app():
     parser = argparse.ArgumentParser(description='process match polygon for events')
     parser.add_argument(f"--run_date", type=str, required=True, help='Process model run date')
     parser.add_argument(f"--pipe", type=str, required=True, help='Process model on specific pipe')
+    parser.add_argument(
+        f"--min_confidence", type=float, default=None,
+        help=f'Bootstrap confidence a changepoint needs to be analyzed, e.g. {MIN_CONFIDENCE} (default: no filter)'
+    )
     args = parser.parse_args()
 
     run_date = args.__getattribute__("run_date")
     pipe_name = args.__getattribute__("pipe")
-    changepoints_result: dict[str, pd.DataFrame] = pipe_detect_engine(run_date, pipe_name)
-    changepoints = changepoints_result[pipe_name]
-    analyze_congestion(pipe_name=pipe_name, changepoints=changepoints)
+    trigger_traffic_detect(run_date, pipe_name, min_confidence=args.min_confidence)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,169 @@
+"""
+Materialized detection results (``pipe_anomalies``).
+
+A backfill (``entry/main_anomaly_backfill.py``) runs the detector over whole date ranges and
+writes every detected day, together with the covered range in ``pipe_anomaly_runs``.
+"Did pipe X have an anomaly in month Y" is then one primary key range scan, answered only when a
+backfill run of the same detector config and per-pipe detector state (sisi thresholds, seasonal
+baseline) covers the window and the run is still fresh: the pipe's
+revision (bumped by the ingestion on rewrites of past days) and the number of days in the run's
+range must be the ones the backfill detected on. The ingestion also drops the runs overlapping
+the days it writes.
+
+Note: the backfill detects on the whole range at once, so a lookup equals a per window detection
+for point-wise methods (the default 'sisi' thresholds), not for segmentation methods.
+"""
+from datetime import datetime
+
+import pandas as pd
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+from mcp_conductor.storage.engine import get_engine
+from mcp_conductor.storage.ship_cnt import PIPE_REVISION_TABLE, SHIP_CNT_TABLE
+
+ANOMALY_TABLE = "pipe_anomalies"
+ANOMALY_RUN_TABLE = "pipe_anomaly_runs"
+
+_COVERED_QUERY = (
+    f"SELECT 1 FROM {ANOMALY_RUN_TABLE} AS run "
+    "WHERE config_hash = :config_hash AND pipe_name = :pipe_name "
+    "AND start_date_id <= :start_date_id AND end_date_id >= :end_date_id AND detector_state = :detector_state "
+    f"AND revision = COALESCE((SELECT revision FROM {PIPE_REVISION_TABLE} WHERE pipe_name = :pipe_name), 0) "
+    f"AND row_count = (SELECT COUNT(*) FROM {SHIP_CNT_TABLE} WHERE pipe_name = :pipe_name "
+    "AND date_id BETWEEN run.start_date_id AND run.end_date_id) LIMIT 1"
+)
+_LOOKUP_QUERY = (
+    f"SELECT pipe_name, date_id, ship_cnt FROM {ANOMALY_TABLE} "
+    "WHERE config_hash = :config_hash AND pipe_name = :pipe_name "
+    "AND date_id BETWEEN :start_date_id AND :end_date_id ORDER BY date_id"
+)
+
+
+def write_anomalies(
+    pipe_name: str,
+    start_date_id: int,
+    end_date_id: int,
+    anomalies: pd.DataFrame,
+    method: str,
+    config_hash: str,
+    row_count: int,
+    revision: int,
+    detector_state: str = "",
+    engine: Engine | None = None,
+) -> int:
+    """Replace the anomalies of one pipe and date range in a single transaction, and record the run.
+
+    Args:
+        pipe_name: pipe name.
+        start_date_id: first day covered by the detection.
+        end_date_id: last day covered by the detection.
+        anomalies: detected rows, columns date_id and ship_cnt.
+        method: detector method.
+        config_hash: hash of the detector config (see ``detector.result_cache.config_hash``).
+        row_count: number of days the detection ran on.
+        revision: pipe revision read before the days were loaded (see ``storage.ship_cnt.load_pipe_revision``).
+        detector_state: per-pipe thresholds / baseline version of the detection (``ChangePointDetector.state_key``).
+
+    Returns:
+        int: number of written anomalies.
+    """
+    engine = engine or get_engine()
+    params = {
+        "config_hash": config_hash,
+        "pipe_name": pipe_name,
+        "start_date_id": int(start_date_id),
+        "end_date_id": int(end_date_id),
+    }
+    rows = [
+        {"config_hash": config_hash, "pipe_name": pipe_name, "date_id": int(date_id),
+         "ship_cnt": None if pd.isna(ship_cnt) else float(ship_cnt), "method": method}
+        for date_id, ship_cnt in zip(anomalies["date_id"].tolist(), anomalies["ship_cnt"].tolist())
+    ]
+    with engine.begin() as conn:
+        conn.execute(text(
+            f"DELETE FROM {ANOMALY_TABLE} WHERE config_hash = :config_hash AND pipe_name = :pipe_name "
+            "AND date_id BETWEEN :start_date_id AND :end_date_id"
+        ), params)
+        if rows:
+            conn.execute(text(
+                f"INSERT INTO {ANOMALY_TABLE} (config_hash, pipe_name, date_id, ship_cnt, method) "
+                "VALUES (:config_hash, :pipe_name, :date_id, :ship_cnt, :method)"
+            ), rows)
+        conn.execute(text(
+            f"INSERT OR REPLACE INTO {ANOMALY_RUN_TABLE} "
+            "(config_hash, pipe_name, start_date_id, end_date_id, method, created_at, row_count, revision, "
+            "detector_state) "
+            "VALUES (:config_hash, :pipe_name, :start_date_id, :end_date_id, :method, :created_at, "
+            ":row_count, :revision, :detector_state)"
+        ), {
+            **params,
+            "method": method,
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "row_count": int(row_count),
+            "revision": int(revision),
+            "detector_state": detector_state,
+        })
+    return len(rows)
+
+
+def invalidate_anomaly_runs(date_ranges: dict[str, tuple[int, int]], engine: Engine | None = None) -> int:
+    """Drop the backfill runs overlapping ``{pipe_name: (first_date_id, last_date_id)}`` of rewritten days.
+
+    Returns:
+        int: number of dropped runs.
+    """
+    engine = engine or get_engine()
+    if not date_ranges:
+        return 0
+    with engine.begin() as conn:
+        result = conn.execute(text(
+            f"DELETE FROM {ANOMALY_RUN_TABLE} WHERE pipe_name = :pipe_name "
+            "AND end_date_id >= :first_date_id AND start_date_id <= :last_date_id"
+        ), [
+            {"pipe_name": pipe_name, "first_date_id": int(first), "last_date_id": int(last)}
+            for pipe_name, (first, last) in date_ranges.items()
+        ])
+        return max(result.rowcount, 0)
+
+
+def lookup_anomalies(
+    pipe_name: str,
+    start_date_id: int,
+    end_date_id: int,
+    config_hash: str,
+    detector_state: str = "",
+    engine: Engine | None = None,
+) -> pd.DataFrame | None:
+    """Return the materialized anomalies of a window, or None when no fresh backfill covers it."""
+    engine = engine or get_engine()
+    params = {
+        "config_hash": config_hash,
+        "pipe_name": pipe_name,
+        "start_date_id": int(start_date_id),
+        "end_date_id": int(end_date_id),
+        "detector_state": detector_state,
+    }
+    with engine.connect() as conn:
+        if conn.execute(text(_COVERED_QUERY), params).first() is None:
+            return None
+        rows = conn.execute(text(_LOOKUP_QUERY), params).fetchall()
+    return pd.DataFrame(rows, columns=["pipe_name", "date_id", "ship_cnt"])
+
+
+async def lookup_anomalies_async(
+    repository, pipe_name: str, start_date_id: int, end_date_id: int, config_hash: str, detector_state: str = ""
+) -> pd.DataFrame | None:
+    """Same as :func:`lookup_anomalies`, awaited on an ``AsyncShipCntRepository``."""
+    # sqlite3 binds the named parameters from a dict
+    params = {
+        "config_hash": config_hash,
+        "pipe_name": pipe_name,
+        "start_date_id": int(start_date_id),
+        "end_date_id": int(end_date_id),
+        "detector_state": detector_state,
+    }
+    if not await repository.fetch_all(_COVERED_QUERY, params):
+        return None
+    rows = await repository.fetch_all(_LOOKUP_QUERY, params)
+    return pd.DataFrame(rows, columns=["pipe_name", "date_id", "ship_cnt"])
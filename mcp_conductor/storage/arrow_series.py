@@ -0,0 +1,239 @@
+"""
+Arrow IPC / Parquet storage of the ``ship_cnt_in_pipe`` series.
+
+Alternative to ``data/sisi.sqlite``, selected with ``SISI_SERIES_BACKEND=arrow``.
+The dataset is partitioned by pipe and year:
+
+    <root>/pipe_name=<pipe_name>/year=<YYYY>.arrow    (or .parquet)
+
+Arrow IPC files are written uncompressed as a single record batch, so a partition is memory mapped
+and its columns are handed to NumPy without a copy. A window inside one year is a view on the
+memory map, a window across years only copies the selected rows.
+
+Usage (export the sqlite table):
+    python -m mcp_conductor.storage.arrow_series --root ./data/ship_cnt_in_pipe [--format parquet]
+"""
+import argparse
+import asyncio
+import os
+import threading
+from pathlib import Path
+
+import numpy as np
+from sqlalchemy.engine import Engine
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError as e:
+    raise ImportError("The arrow series backend needs pyarrow: pip install 'sisimcp[arrow]'") from e
+
+from mcp_conductor.storage.engine import get_engine
+
+DEFAULT_ARROW_ROOT = Path("./data/ship_cnt_in_pipe")
+PARTITION_SUFFIXES = (".arrow", ".parquet")
+
+
+def _pipe_dir(root: Path, pipe_name: str) -> Path:
+    return root / f"pipe_name={pipe_name.replace(os.sep, '_')}"
+
+
+def write_pipe_series(
+    root: str | Path, pipe_name: str, date_ids: np.ndarray, ship_cnts: np.ndarray, file_format: str = "arrow"
+) -> list[Path]:
+    """Write (overwrite) the year partitions of one pipe.
+
+    Args:
+        root: dataset root folder.
+        pipe_name: pipe name.
+        date_ids: date_id (YYYYMMDD) array.
+        ship_cnts: ship cnt array aligned with date_ids.
+        file_format: 'arrow' (memory mappable, zero-copy reads) or 'parquet'.
+
+    Returns:
+        list[Path]: written partition files.
+    """
+    if file_format not in ("arrow", "parquet"):
+        raise ValueError("file_format must be one of ['arrow', 'parquet']")
+    date_ids = np.asarray(date_ids, dtype=np.int64)
+    ship_cnts = np.asarray(ship_cnts)
+    order = np.argsort(date_ids, kind="stable")
+    date_ids, ship_cnts = date_ids[order], ship_cnts[order]
+
+    pipe_dir = _pipe_dir(Path(root), pipe_name)
+    pipe_dir.mkdir(parents=True, exist_ok=True)
+    years = date_ids // 10000
+    bounds = np.flatnonzero(np.diff(years)) + 1
+    written = []
+    for year_date_ids, year_ship_cnts in zip(np.split(date_ids, bounds), np.split(ship_cnts, bounds)):
+        if year_date_ids.shape[0] == 0:
+            continue
+        table = pa.table({"date_id": year_date_ids, "ship_cnt": year_ship_cnts})
+        path = pipe_dir / f"year={int(year_date_ids[0]) // 10000}.{file_format}"
+        tmp_path = path.with_suffix(path.suffix + ".tmp")
+        if file_format == "arrow":
+            with pa.OSFile(str(tmp_path), "wb") as sink:
+                with pa.ipc.new_file(sink, table.schema) as writer:
+                    writer.write_table(table, max_chunksize=table.num_rows)
+        else:
+            pq.write_table(table, tmp_path)
+        # readers holding a memory map of the old file are not affected
+        os.replace(tmp_path, path)
+        written.append(path)
+    return written
+
+
+def export_sqlite_to_arrow(root: str | Path, engine: Engine | None = None, file_format: str = "arrow") -> int:
+    """Export the whole ``ship_cnt_in_pipe`` table to the partitioned dataset.
+
+    Returns:
+        int: number of exported rows.
+    """
+    from mcp_conductor.storage.ship_cnt import list_pipes, load_pipe_series
+
+    engine = engine or get_engine()
+    n_rows = 0
+    for pipe_name in list_pipes(engine):
+        df = load_pipe_series(pipe_name, engine=engine)
+        write_pipe_series(root, pipe_name, df["date_id"].to_numpy(), df["ship_cnt"].to_numpy(), file_format)
+        n_rows += df.shape[0]
+    return n_rows
+
+
+def _column_to_numpy(column: pa.ChunkedArray) -> np.ndarray:
+    if column.num_chunks == 1 and column.null_count == 0:
+        # single chunk without nulls: a view on the (memory mapped) arrow buffer
+        return column.chunk(0).to_numpy(zero_copy_only=True)
+    return column.to_numpy()
+
+
+class _Partition:
+    __slots__ = ("year", "mtime", "date_ids", "ship_cnts")
+
+    def __init__(self, path: Path, year: int, mtime: float) -> None:
+        if path.suffix == ".arrow":
+            table = pa.ipc.open_file(pa.memory_map(str(path), "r")).read_all()
+        else:
+            table = pq.read_table(path, memory_map=True)
+        self.year = year
+        self.mtime = mtime
+        self.date_ids = _column_to_numpy(table.column("date_id"))
+        self.ship_cnts = _column_to_numpy(table.column("ship_cnt"))
+
+
+class ArrowSeriesCache:
+    def __init__(self, root: str | Path | None = None) -> None:
+        """Read pipe windows from memory mapped partitions.
+
+        Opened partitions are kept and reopened only when the file changes on disk.
+
+        Args:
+            root: dataset root, default ``SISI_ARROW_ROOT`` or ./data/ship_cnt_in_pipe.
+        """
+        self.root = Path(root or os.getenv("SISI_ARROW_ROOT") or DEFAULT_ARROW_ROOT)
+        self._partitions: dict[Path, _Partition] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.refreshes = 0
+
+    def _partition_files(self, pipe_name: str) -> list[tuple[int, Path]]:
+        pipe_dir = _pipe_dir(self.root, pipe_name)
+        if not pipe_dir.is_dir():
+            return []
+        files = []
+        for path in pipe_dir.iterdir():
+            if path.suffix in PARTITION_SUFFIXES and path.stem.startswith("year="):
+                files.append((int(path.stem[len("year="):]), path))
+        return sorted(files)
+
+    def _open(self, path: Path, year: int) -> _Partition:
+        mtime = path.stat().st_mtime
+        partition = self._partitions.get(path)
+        if partition is not None and partition.mtime == mtime:
+            self.hits += 1
+            return partition
+        with self._lock:
+            if partition is None:
+                self.misses += 1
+            else:
+                self.refreshes += 1
+            partition = _Partition(path, year, mtime)
+            self._partitions[path] = partition
+        return partition
+
+    def get_window(self, pipe_name: str, start_date_id: int, end_date_id: int) -> tuple[np.ndarray, np.ndarray]:
+        """Return ``(date_ids, ship_cnts)`` of ``start_date_id <= date_id <= end_date_id``.
+
+        Zero-copy when the window lies in one year partition.
+        """
+        date_id_parts, ship_cnt_parts = [], []
+        for year, path in self._partition_files(pipe_name):
+            if year < start_date_id // 10000 or year > end_date_id // 10000:
+                continue
+            partition = self._open(path, year)
+            lo = np.searchsorted(partition.date_ids, start_date_id, side="left")
+            hi = np.searchsorted(partition.date_ids, end_date_id, side="right")
+            if hi > lo:
+                date_id_parts.append(partition.date_ids[lo:hi])
+                ship_cnt_parts.append(partition.ship_cnts[lo:hi])
+
+        if len(date_id_parts) == 1:
+            return date_id_parts[0], ship_cnt_parts[0]
+        if not date_id_parts:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        return np.concatenate(date_id_parts), np.concatenate(ship_cnt_parts)
+
+    async def get_window_async(
+        self, pipe_name: str, start_date_id: int, end_date_id: int, repository=None
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Async variant of :meth:`get_window`, run in the default executor.
+
+        Listing, stat-ing and memory mapping the partitions block, ``repository`` is ignored.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.get_window, pipe_name, start_date_id, end_date_id)
+
+    def has_pipe(self, pipe_name: str) -> bool:
+        """Whether there is any partition for ``pipe_name``."""
+        return len(self._partition_files(pipe_name)) > 0
+
+    def data_version(self, pipe_name: str) -> str:
+        """Version of the pipe's partitions, changes whenever a partition file is rewritten."""
+        files = self._partition_files(pipe_name)
+        latest = max((path.stat().st_mtime_ns for _, path in files), default=0)
+        return f"{len(files)}:{latest}"
+
+    def invalidate(self, pipe_name: str | None = None) -> None:
+        """Drop the opened partitions of one pipe (or every pipe)."""
+        with self._lock:
+            if pipe_name is None:
+                self._partitions.clear()
+                return
+            pipe_dir = _pipe_dir(self.root, pipe_name)
+            for path in [path for path in self._partitions if path.parent == pipe_dir]:
+                del self._partitions[path]
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "refreshes": self.refreshes,
+            "partitions": len(self._partitions),
+            "rows": sum(partition.date_ids.shape[0] for partition in list(self._partitions.values())),
+        }
+
+
+def run_app():
+    parser = argparse.ArgumentParser(description='export ship_cnt_in_pipe into a partitioned arrow/parquet dataset')
+    parser.add_argument("--root", type=str, default=str(DEFAULT_ARROW_ROOT), help='dataset root folder')
+    parser.add_argument("--format", type=str, default="arrow", choices=["arrow", "parquet"], help='partition file format')
+    parser.add_argument("--db_url", type=str, default=None, help='SQLAlchemy url, default: SISI_DB_URL or ./data/sisi.sqlite')
+    args = parser.parse_args()
+
+    n_rows = export_sqlite_to_arrow(args.root, engine=get_engine(args.db_url), file_format=args.format)
+    print(f"Exported {n_rows} rows into {args.root}")
+
+
+if __name__ == "__main__":
+    run_app()
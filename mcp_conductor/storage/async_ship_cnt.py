@@ -0,0 +1,142 @@
+"""
+Asyncio-native read access to ``ship_cnt_in_pipe`` (aiosqlite).
+
+Tool handlers ``await`` these reads directly instead of parking a thread of the default
+executor on ``pd.read_sql``, only the CPU bound detection is handed to an executor.
+"""
+import asyncio
+import os
+import sqlite3
+from pathlib import Path
+
+import aiosqlite
+import numpy as np
+from sqlalchemy.engine import make_url
+
+from mcp_conductor.storage.engine import default_pool_size, get_db_url
+from mcp_conductor.storage.ship_cnt import MAX_DATE_ID, PIPE_REVISION_TABLE, SHIP_CNT_TABLE
+
+_WINDOW_QUERY = (
+    f"SELECT date_id, ship_cnt FROM {SHIP_CNT_TABLE} "
+    "WHERE pipe_name = ? AND date_id BETWEEN ? AND ? ORDER BY date_id"
+)
+_PIPE_EXISTS_QUERY = f"SELECT 1 FROM {SHIP_CNT_TABLE} WHERE pipe_name = ? LIMIT 1"
+_REVISION_QUERY = f"SELECT revision FROM {PIPE_REVISION_TABLE} WHERE pipe_name = ?"
+
+
+def _rows_to_arrays(rows: list[tuple]) -> tuple[np.ndarray, np.ndarray]:
+    if not rows:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    date_ids, ship_cnts = zip(*rows)
+    ship_cnt_arr = np.array(ship_cnts)
+    if ship_cnt_arr.dtype == object:
+        # missing counts become NaN, same as pd.read_sql
+        ship_cnt_arr = np.array([np.nan if v is None else v for v in ship_cnts], dtype=np.float64)
+    return np.array(date_ids, dtype=np.int64), ship_cnt_arr
+
+
+class AsyncShipCntRepository:
+    def __init__(self, db_path: str | Path, pool_size: int | None = None) -> None:
+        """Read only pool of aiosqlite connections on the sisi sqlite file.
+
+        Args:
+            db_path: sqlite file.
+            pool_size: maximum number of connections, default ``SISI_DB_POOL_SIZE`` or the executor size.
+        """
+        self.db_uri = f"{Path(db_path).absolute().as_uri()}?mode=ro"
+        self.pool_size = pool_size or int(os.getenv("SISI_DB_POOL_SIZE") or default_pool_size())
+        self._idle: asyncio.Queue | None = None
+        self._connections: list[aiosqlite.Connection] = []
+        self._opening = 0
+
+    @classmethod
+    def from_url(cls, db_url: str | None = None) -> "AsyncShipCntRepository":
+        """Build the repository for a ``sqlite:///<file>`` url (default: :func:`get_db_url`)."""
+        url = make_url(db_url or get_db_url())
+        if url.get_backend_name() != "sqlite" or not url.database or url.database == ":memory:":
+            raise ValueError(f"AsyncShipCntRepository only supports sqlite files, got {url!r}")
+        return cls(url.database)
+
+    async def _acquire(self) -> aiosqlite.Connection:
+        if self._idle is None:
+            self._idle = asyncio.Queue()
+        if self._idle.empty() and len(self._connections) + self._opening < self.pool_size:
+            self._opening += 1
+            try:
+                conn = await aiosqlite.connect(self.db_uri, uri=True)
+            finally:
+                self._opening -= 1
+            self._connections.append(conn)
+            return conn
+        return await self._idle.get()
+
+    async def fetch_all(self, query: str, params: tuple | dict) -> list[tuple]:
+        """Run a read query (qmark params, or named params from a dict) on a pooled connection."""
+        conn = await self._acquire()
+        try:
+            async with conn.execute(query, params) as cursor:
+                return list(await cursor.fetchall())
+        finally:
+            self._idle.put_nowait(conn)
+
+    async def load_pipe_window(
+        self, pipe_name: str, start_date_id: int, end_date_id: int
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Load ``(date_ids, ship_cnts)`` of one pipe for ``start_date_id <= date_id <= end_date_id``."""
+        rows = await self.fetch_all(_WINDOW_QUERY, (pipe_name, int(start_date_id), int(end_date_id)))
+        return _rows_to_arrays(rows)
+
+    async def load_pipe_series(
+        self, pipe_name: str, after_date_id: int | None = None
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Load the full series of one pipe, or only the rows with ``date_id > after_date_id``."""
+        start_date_id = 0 if after_date_id is None else int(after_date_id) + 1
+        return await self.load_pipe_window(pipe_name, start_date_id, MAX_DATE_ID)
+
+    async def load_pipe_revision(self, pipe_name: str) -> int:
+        """Revision of the pipe's past days, see :func:`mcp_conductor.storage.ship_cnt.load_pipe_revision`."""
+        try:
+            rows = await self.fetch_all(_REVISION_QUERY, (pipe_name,))
+        except sqlite3.OperationalError:
+            # database without migration 0006
+            return 0
+        return int(rows[0][0]) if rows else 0
+
+    async def pipe_exists(self, pipe_name: str) -> bool:
+        """Whether there is any ship cnt record for ``pipe_name``."""
+        return len(await self.fetch_all(_PIPE_EXISTS_QUERY, (pipe_name,))) > 0
+
+    async def close(self) -> None:
+        """Close every connection of the pool."""
+        connections, self._connections = self._connections, []
+        self._idle = None
+        for conn in connections:
+            await conn.close()
+
+
+_ASYNC_REPOSITORY: AsyncShipCntRepository | None = None
+
+
+def get_async_repository() -> AsyncShipCntRepository | None:
+    """Return the process-wide async repository.
+
+    None when the series don't come from a sqlite file (arrow backend or another database),
+    callers then fall back to the blocking path in an executor.
+    """
+    global _ASYNC_REPOSITORY
+    if _ASYNC_REPOSITORY is None:
+        if (os.getenv("SISI_SERIES_BACKEND") or "sqlite") != "sqlite":
+            return None
+        try:
+            _ASYNC_REPOSITORY = AsyncShipCntRepository.from_url()
+        except ValueError:
+            return None
+    return _ASYNC_REPOSITORY
+
+
+async def close_async_repository() -> None:
+    """Close the process-wide async repository (server shutdown)."""
+    global _ASYNC_REPOSITORY
+    if _ASYNC_REPOSITORY is not None:
+        await _ASYNC_REPOSITORY.close()
+        _ASYNC_REPOSITORY = None
@@ -0,0 +1,236 @@
+"""
+Seasonal baselines of the pipes (``pipe_baselines``).
+
+Strait traffic has a weekly and an annual cycle, the baseline of a pipe is the mean / standard deviation
+of its ship cnt per (month x day of week) cell. Only the sufficient statistics (count, sum, sum of squares)
+are stored, so new days are folded in incrementally: a refresh reads the rows after the pipe's
+``last_date_id`` and adds them to the cells. Upserts rewriting past days need a rebuild.
+
+Servers load the table once at startup into the process wide :class:`BaselineCache`,
+the ``seasonal`` detector method only reads it.
+
+Usage:
+    python -m mcp_conductor.storage.baselines [--pipe 曼德海峡] [--rebuild] [--db_url ...]
+"""
+import argparse
+import logging
+import threading
+import time
+
+import numpy as np
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+
+from mcp_conductor.storage.engine import get_engine
+from mcp_conductor.storage.migrations import run_migrations
+from mcp_conductor.storage.ship_cnt import date_ids_to_datetime64, list_pipes, load_pipe_series
+
+logger = logging.getLogger(__name__)
+
+BASELINE_TABLE = "pipe_baselines"
+N_MONTHS, N_DOWS = 12, 7
+
+
+def seasonal_cells(date_ids: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Return the month (0-11) and day of week (0 = Monday) of YYYYMMDD date_ids, vectorized."""
+    date_ids = np.asarray(date_ids, dtype=np.int64)
+    dates = date_ids_to_datetime64(date_ids)
+    # 1970-01-01 is a Thursday
+    dows = (dates.astype(np.int64) + 3) % 7
+    return date_ids // 100 % 100 - 1, dows
+
+
+class SeasonalBaseline:
+    """Sufficient statistics of one pipe per (month, day of week) cell."""
+    __slots__ = ("counts", "sums", "sum_sqs", "last_date_id")
+
+    def __init__(self) -> None:
+        self.counts = np.zeros((N_MONTHS, N_DOWS), dtype=np.int64)
+        self.sums = np.zeros((N_MONTHS, N_DOWS))
+        self.sum_sqs = np.zeros((N_MONTHS, N_DOWS))
+        self.last_date_id = -1
+
+    def update(self, date_ids: np.ndarray, ship_cnts: np.ndarray) -> int:
+        """Fold the days after ``last_date_id`` into the cells, missing values (NaN) are skipped.
+
+        Returns:
+            int: number of added days.
+        """
+        date_ids = np.asarray(date_ids, dtype=np.int64)
+        ship_cnts = np.asarray(ship_cnts, dtype=np.float64)
+        new = (date_ids > self.last_date_id) & ~np.isnan(ship_cnts)
+        if date_ids.shape[0]:
+            self.last_date_id = max(self.last_date_id, int(date_ids.max()))
+        if not new.any():
+            return 0
+        months, dows = seasonal_cells(date_ids[new])
+        cells = months * N_DOWS + dows
+        values = ship_cnts[new]
+        size = N_MONTHS * N_DOWS
+        self.counts += np.bincount(cells, minlength=size).reshape(N_MONTHS, N_DOWS)
+        self.sums += np.bincount(cells, weights=values, minlength=size).reshape(N_MONTHS, N_DOWS)
+        self.sum_sqs += np.bincount(cells, weights=values ** 2, minlength=size).reshape(N_MONTHS, N_DOWS)
+        return int(new.sum())
+
+    @property
+    def mean(self) -> np.ndarray:
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(self.counts > 0, self.sums / self.counts, np.nan)
+
+    @property
+    def std(self) -> np.ndarray:
+        """Sample standard deviation per cell, NaN for cells with less than 2 days."""
+        with np.errstate(divide='ignore', invalid='ignore'):
+            var = (self.sum_sqs - self.sums ** 2 / self.counts) / (self.counts - 1)
+        return np.where(self.counts > 1, np.sqrt(np.maximum(var, 0.0)), np.nan)
+
+    @property
+    def version(self) -> str:
+        """Changes whenever days are folded in or the baseline is rebuilt on rewritten days."""
+        return f"{self.last_date_id}:{int(self.counts.sum())}:{float(self.sums.sum())!r}:{float(self.sum_sqs.sum())!r}"
+
+    def expected(self, date_ids: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Baseline ``(mean, std)`` of every day of ``date_ids``."""
+        months, dows = seasonal_cells(date_ids)
+        return self.mean[months, dows], self.std[months, dows]
+
+
+def write_baseline(pipe_name: str, baseline: SeasonalBaseline, engine: Engine | None = None) -> None:
+    """Replace the stored cells of one pipe in a single transaction."""
+    engine = engine or get_engine()
+    months, dows = np.divmod(np.arange(N_MONTHS * N_DOWS), N_DOWS)
+    rows = [
+        {"pipe_name": pipe_name, "month": int(month) + 1, "dow": int(dow), "n": int(n), "total": float(total),
+         "total_sq": float(total_sq), "last_date_id": baseline.last_date_id}
+        for month, dow, n, total, total_sq in zip(
+            months, dows, baseline.counts.ravel(), baseline.sums.ravel(), baseline.sum_sqs.ravel()
+        )
+    ]
+    with engine.begin() as conn:
+        conn.execute(text(f"DELETE FROM {BASELINE_TABLE} WHERE pipe_name = :pipe_name"), {"pipe_name": pipe_name})
+        conn.execute(text(
+            f"INSERT INTO {BASELINE_TABLE} (pipe_name, month, dow, n, total, total_sq, last_date_id) "
+            "VALUES (:pipe_name, :month, :dow, :n, :total, :total_sq, :last_date_id)"
+        ), rows)
+
+
+def load_baselines(engine: Engine | None = None) -> dict[str, SeasonalBaseline]:
+    """Read every stored baseline, empty before the table is migrated."""
+    engine = engine or get_engine()
+    baselines: dict[str, SeasonalBaseline] = {}
+    with engine.connect() as conn:
+        if BASELINE_TABLE not in inspect(conn).get_table_names():
+            return baselines
+        rows = conn.execute(text(
+            f"SELECT pipe_name, month, dow, n, total, total_sq, last_date_id FROM {BASELINE_TABLE}"
+        ))
+        for pipe_name, month, dow, n, total, total_sq, last_date_id in rows:
+            baseline = baselines.setdefault(pipe_name, SeasonalBaseline())
+            baseline.counts[month - 1, dow] = n
+            baseline.sums[month - 1, dow] = total
+            baseline.sum_sqs[month - 1, dow] = total_sq
+            baseline.last_date_id = int(last_date_id)
+    return baselines
+
+
+class BaselineCache:
+    def __init__(self) -> None:
+        """In-memory ``pipe_name -> SeasonalBaseline``."""
+        self._baselines: dict[str, SeasonalBaseline] = {}
+        self._lock = threading.Lock()
+
+    def get(self, pipe_name: str) -> SeasonalBaseline | None:
+        return self._baselines.get(pipe_name)
+
+    def __contains__(self, pipe_name: str) -> bool:
+        return pipe_name in self._baselines
+
+    def snapshot(self) -> dict[str, SeasonalBaseline]:
+        return dict(self._baselines)
+
+    def update(self, baselines: dict[str, SeasonalBaseline]) -> None:
+        # readers keep the old dict, the cache is swapped as a whole
+        with self._lock:
+            self._baselines = {**self._baselines, **baselines}
+
+    def reload(self, engine: Engine | None = None) -> int:
+        """Replace the cache by the stored baselines.
+
+        Returns:
+            int: number of pipes with a baseline.
+        """
+        baselines = load_baselines(engine)
+        with self._lock:
+            self._baselines = baselines
+        logger.info(f"Loaded the seasonal baselines of {len(baselines)} pipes")
+        return len(baselines)
+
+
+_BASELINE_CACHE: BaselineCache | None = None
+_BASELINE_CACHE_LOCK = threading.Lock()
+
+
+def get_baseline_cache() -> BaselineCache:
+    """Process wide baseline cache, empty until :func:`load_baseline_cache` or :func:`refresh_baselines`."""
+    global _BASELINE_CACHE
+    if _BASELINE_CACHE is None:
+        with _BASELINE_CACHE_LOCK:
+            if _BASELINE_CACHE is None:
+                _BASELINE_CACHE = BaselineCache()
+    return _BASELINE_CACHE
+
+
+def load_baseline_cache(engine: Engine | None = None) -> BaselineCache:
+    """Load the ``pipe_baselines`` table into the process wide cache (server startup)."""
+    cache = get_baseline_cache()
+    cache.reload(engine)
+    return cache
+
+
+def refresh_baselines(
+    pipe_names: list[str] | None = None, rebuild: bool = False, engine: Engine | None = None
+) -> dict[str, int]:
+    """Fold the new days of every pipe (or the given pipes) into the stored baselines.
+
+    Args:
+        pipe_names: pipes to refresh, default every pipe in ship_cnt_in_pipe.
+        rebuild: recompute from the whole history instead of the days after ``last_date_id``.
+
+    Returns:
+        dict[str, int]: number of added days per pipe.
+    """
+    engine = engine or get_engine()
+    run_migrations(engine)
+    stored = {} if rebuild else load_baselines(engine)
+
+    added, refreshed = {}, {}
+    for pipe_name in pipe_names or list_pipes(engine):
+        baseline = stored.get(pipe_name) or SeasonalBaseline()
+        after_date_id = baseline.last_date_id if baseline.last_date_id >= 0 else None
+        df = load_pipe_series(pipe_name, after_date_id=after_date_id, engine=engine)
+        added[pipe_name] = baseline.update(
+            df["date_id"].to_numpy(dtype=np.int64), df["ship_cnt"].to_numpy(dtype=np.float64)
+        )
+        write_baseline(pipe_name, baseline, engine=engine)
+        refreshed[pipe_name] = baseline
+        logger.info(f"{pipe_name}: added {added[pipe_name]} days to the seasonal baseline")
+    # the detectors of this process see the new baselines right away
+    get_baseline_cache().update(refreshed)
+    return added
+
+
+def run_app():
+    parser = argparse.ArgumentParser(description='refresh the seasonal (month x day of week) baselines of the pipes')
+    parser.add_argument("--pipe", type=str, action="append", default=None, help='pipe to refresh, repeatable (default: all)')
+    parser.add_argument("--rebuild", action="store_true", help='recompute from the whole history (after past days were rewritten)')
+    parser.add_argument("--db_url", type=str, default=None, help='SQLAlchemy url, default: SISI_DB_URL or ./data/sisi.sqlite')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    started_at = time.perf_counter()
+    added = refresh_baselines(args.pipe, rebuild=args.rebuild, engine=get_engine(args.db_url))
+    print(f"Refreshed {len(added)} baselines ({sum(added.values())} days) in {time.perf_counter() - started_at:.2f}s")
+
+
+if __name__ == "__main__":
+    run_app()
@@ -0,0 +1,156 @@
+"""
+BCI indicators (``getZbcsdb``) aligned day by day with the ship cnt series of a pipe.
+
+:func:`mcp_conductor.resources.sisi.APIs.canal_traffic.get_bci_metrics` returns long records, one per
+(day, indicator). They are pivoted into a ``(n_days, n_indicators)`` array and left-joined onto the
+date_ids of the ship cnt series with ``np.searchsorted``, no per-day Python loop. Indicators are not
+published every day (weekends, holidays), a missing day carries the last published value forward.
+
+The result is the 2-D signal of the multivariate :class:`ChangePointDetector` methods::
+
+    date_ids, signal, columns = load_pipe_with_bci("曼德海峡", 20250101, 20250630, client="qiu", zbxxs="101-0003")
+    ChangePointDetector({'method': 'fast_pelt', 'model': 'normal'}).detect(signal)
+"""
+from typing import Any, Dict, Iterable, List, Tuple
+
+import numpy as np
+from sqlalchemy.engine import Engine
+
+from mcp_conductor.storage.ship_cnt import load_pipe_window
+
+# field names of the getZbcsdb records
+BCI_DATE_KEY = "day"
+BCI_INDICATOR_KEY = "zbxx"
+BCI_VALUE_KEY = "value"
+
+
+def to_date_ids(days: Iterable[Any]) -> np.ndarray:
+    """Convert ``YYYY-MM-DD`` strings (or YYYYMMDD integers) into YYYYMMDD date_ids, vectorized."""
+    arr = np.asarray(list(days) if not isinstance(days, np.ndarray) else days)
+    if arr.dtype.kind in "iuf":
+        return arr.astype(np.int64)
+    # "2025-01-31" and "2025-01-31 00:00:00" both keep their first 10 characters
+    return np.char.replace(arr.astype("U10"), "-", "").astype(np.int64)
+
+
+def pivot_indicators(
+    records: List[Dict[str, Any]],
+    date_key: str = BCI_DATE_KEY,
+    indicator_key: str = BCI_INDICATOR_KEY,
+    value_key: str = BCI_VALUE_KEY,
+) -> Tuple[np.ndarray, List[str], np.ndarray]:
+    """
+    Pivot long ``(day, indicator, value)`` records into a wide array.
+
+    Args:
+        records: ``data`` of a getZbcsdb response
+        date_key / indicator_key / value_key: field names of the records
+
+    Returns:
+        Tuple[np.ndarray, List[str], np.ndarray]: sorted date_ids, indicator names, values of shape
+        ``(n_days, n_indicators)``, NaN where an indicator has no value for a day
+    """
+    if not records:
+        return np.zeros(0, dtype=np.int64), [], np.zeros((0, 0))
+    date_ids = to_date_ids([record[date_key] for record in records])
+    names = np.array([str(record[indicator_key]) for record in records])
+    values = np.array(
+        [np.nan if record.get(value_key) in (None, "") else float(record[value_key]) for record in records]
+    )
+    days, day_idx = np.unique(date_ids, return_inverse=True)
+    indicators, indicator_idx = np.unique(names, return_inverse=True)
+    table = np.full((days.shape[0], indicators.shape[0]), np.nan)
+    # a repeated (day, indicator) keeps its last record
+    table[day_idx, indicator_idx] = values
+    return days, indicators.tolist(), table
+
+
+def align_by_date(
+    date_ids: np.ndarray, source_date_ids: np.ndarray, values: np.ndarray, forward_fill: bool = True
+) -> np.ndarray:
+    """
+    Left join ``values`` (rows indexed by the sorted ``source_date_ids``) onto ``date_ids``.
+
+    Args:
+        date_ids: target days, YYYYMMDD
+        source_date_ids: sorted days of the rows of ``values``
+        values: array of shape (n_source_days,) or (n_source_days, n_features)
+        forward_fill: take the last non missing value on or before each day, instead of exact matches only
+
+    Returns:
+        np.ndarray: values of every day of ``date_ids``, NaN when there is none
+    """
+    date_ids = np.asarray(date_ids, dtype=np.int64)
+    source_date_ids = np.asarray(source_date_ids, dtype=np.int64)
+    values = np.asarray(values, dtype=np.float64)
+    squeeze = values.ndim == 1
+    if squeeze:
+        values = values[:, None]
+    out = np.full((date_ids.shape[0], values.shape[1]), np.nan)
+    if source_date_ids.shape[0] == 0:
+        return out[:, 0] if squeeze else out
+
+    # last source row on or before each day
+    pos = np.searchsorted(source_date_ids, date_ids, side="right") - 1
+    if forward_fill:
+        # per column, index of the last non missing row so far (-1 before the first one)
+        rows = np.where(np.isnan(values), -1, np.arange(values.shape[0])[:, None])
+        last_valid = np.maximum.accumulate(rows, axis=0)
+        found = pos >= 0
+        src = last_valid[pos[found]]
+        out[found] = np.where(src >= 0, values[src, np.arange(values.shape[1])], np.nan)
+    else:
+        found = (pos >= 0) & (source_date_ids[np.maximum(pos, 0)] == date_ids)
+        out[found] = values[pos[found]]
+    return out[:, 0] if squeeze else out
+
+
+def load_pipe_with_bci(
+    pipe_name: str,
+    start_date_id: int,
+    end_date_id: int,
+    client: str,
+    zbxxs: str | None = None,
+    csdbs: str | None = None,
+    engine: Engine | None = None,
+    forward_fill: bool = True,
+) -> Tuple[np.ndarray, np.ndarray, List[str]]:
+    """
+    Load the ship cnt of a pipe next to the BCI indicators of the same days.
+
+    Args:
+        pipe_name: Name of the pipe
+        start_date_id / end_date_id: window, YYYYMMDD inclusive
+        client / zbxxs / csdbs: parameters of :func:`get_bci_metrics`
+        forward_fill: carry the last published indicator value over the days without one
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, List[str]]: date_ids, signal of shape ``(n_days, 1 + n_indicators)``
+        and its column names (``ship_cnt`` first). Days with a missing value are dropped (with ``forward_fill``,
+        only the days before the first value of an indicator), so the signal has no missing values.
+
+    Raises:
+        ValueError: if the BCI request fails
+    """
+    from mcp_conductor.resources.sisi.APIs import canal_traffic
+
+    df = load_pipe_window(pipe_name, start_date_id, end_date_id, engine=engine)
+    date_ids = df["date_id"].to_numpy(dtype=np.int64)
+    ship_cnts = df["ship_cnt"].to_numpy(dtype=np.float64)
+
+    response = canal_traffic.get_bci_metrics(
+        client, _iso_day(start_date_id), _iso_day(end_date_id), zbxxs=zbxxs, csdbs=csdbs
+    )
+    if not response.get("success"):
+        raise ValueError(f"BCI request failed: {response.get('message')}")
+    source_date_ids, indicators, values = pivot_indicators(response.get("data") or [])
+
+    aligned = align_by_date(date_ids, source_date_ids, values, forward_fill=forward_fill)
+    signal = np.column_stack([ship_cnts, aligned])
+    complete = ~np.isnan(signal).any(axis=1)
+    return date_ids[complete], signal[complete], ["ship_cnt", *indicators]
+
+
+def _iso_day(date_id: int) -> str:
+    date_id = int(date_id)
+    return f"{date_id // 10000:04d}-{date_id // 100 % 100:02d}-{date_id % 100:02d}"
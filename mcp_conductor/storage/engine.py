@@ -0,0 +1,112 @@
+"""
+Process-wide registry of pooled SQLAlchemy engines.
+
+Every MCP tool call and Dify request used to build its own engine for ``data/sisi.sqlite``.
+Engines are now created lazily, once per database url, and shared by every caller in the process.
+"""
+import logging
+import os
+import threading
+from functools import lru_cache
+from pathlib import Path
+
+from dotenv import load_dotenv
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import QueuePool
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DB_PATH = Path("./data/sisi.sqlite")
+
+_ENGINES: dict[str, Engine] = {}
+_ENGINES_LOCK = threading.Lock()
+
+
+def default_pool_size() -> int:
+    """Size of the default executor used by ``loop.run_in_executor(None, ...)`` in the servers."""
+    return min(32, (os.cpu_count() or 1) + 4)
+
+
+@lru_cache(maxsize=1)
+def get_db_url() -> str:
+    """Resolve the database url once per process.
+
+    ``SISI_DB_URL`` (env or .env) wins, otherwise fall back to ``./data/sisi.sqlite``.
+    """
+    load_dotenv()
+    db_url = os.getenv("SISI_DB_URL")
+    if db_url:
+        return db_url
+    return f"sqlite:///{DEFAULT_DB_PATH.absolute()}"
+
+
+def _is_memory_sqlite(db_url: str) -> bool:
+    return db_url in ("sqlite://", "sqlite:///:memory:") or "mode=memory" in db_url
+
+
+def _create_pooled_engine(db_url: str) -> Engine:
+    pool_size = int(os.getenv("SISI_DB_POOL_SIZE") or default_pool_size())
+    max_overflow = int(os.getenv("SISI_DB_MAX_OVERFLOW") or 4)
+    pool_timeout = float(os.getenv("SISI_DB_POOL_TIMEOUT") or 30)
+
+    if db_url.startswith("sqlite"):
+        if _is_memory_sqlite(db_url):
+            # keep sqlalchemy's default pool, every pooled connection would get its own empty db
+            return create_engine(db_url, connect_args={"check_same_thread": False})
+        # file based sqlite: the connections are handed across executor threads
+        return create_engine(
+            db_url,
+            poolclass=QueuePool,
+            pool_size=pool_size,
+            max_overflow=max_overflow,
+            pool_timeout=pool_timeout,
+            connect_args={"check_same_thread": False},
+        )
+
+    return create_engine(
+        db_url,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=pool_timeout,
+        pool_pre_ping=True,
+    )
+
+
+def get_engine(db_url: str | None = None) -> Engine:
+    """Return the shared engine for ``db_url`` (default: :func:`get_db_url`), creating it on first use.
+
+    Args:
+        db_url: SQLAlchemy database url.
+
+    Returns:
+        Engine: pooled engine shared by the whole process.
+    """
+    db_url = db_url or get_db_url()
+    engine = _ENGINES.get(db_url)
+    if engine is not None:
+        return engine
+
+    with _ENGINES_LOCK:
+        engine = _ENGINES.get(db_url)
+        if engine is None:
+            engine = _create_pooled_engine(db_url)
+            _ENGINES[db_url] = engine
+            logger.info(f"Created pooled engine for {engine.url!r} (pool={engine.pool.status()})")
+    return engine
+
+
+def warm_up(db_url: str | None = None) -> Engine:
+    """Create the engine and open one pooled connection, so the first request doesn't pay for it."""
+    engine = get_engine(db_url)
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+    return engine
+
+
+def dispose_engines() -> None:
+    """Close every pooled connection and forget the engines (server shutdown, tests)."""
+    with _ENGINES_LOCK:
+        for engine in _ENGINES.values():
+            engine.dispose()
+        _ENGINES.clear()
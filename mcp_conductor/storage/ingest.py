@@ -0,0 +1,301 @@
+"""
+Bulk ingestion of ship cnt files into ``ship_cnt_in_pipe``.
+
+CSV and Parquet files are streamed in chunks, validated with vectorized pandas checks and
+upserted on ``(pipe_name, date_id)`` with one batched ``executemany`` per chunk, each chunk in
+its own transaction. The sqlite file is switched to WAL so servers keep reading during a load.
+A chunk reaching back to or before the last stored day of a pipe bumps the pipe's revision
+(``pipe_revisions``) in the same transaction, caches of other processes reload the pipe on it.
+
+Usage:
+    python -m mcp_conductor.storage.ingest data/dummy/*.csv [--chunksize 100000] [--db_url ...]
+    python -m mcp_conductor.storage.ingest --dedup [--db_url ...]
+"""
+import argparse
+import logging
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Iterator
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+
+from mcp_conductor.storage.anomalies import ANOMALY_RUN_TABLE, invalidate_anomaly_runs
+from mcp_conductor.storage.baselines import load_baselines, refresh_baselines
+from mcp_conductor.storage.engine import get_engine
+from mcp_conductor.storage.migrations import run_migrations
+from mcp_conductor.storage.ship_cnt import MAX_DATE_ID, PIPE_REVISION_TABLE, SHIP_CNT_COLUMNS, SHIP_CNT_TABLE
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNKSIZE = 100_000
+
+INGEST_PRAGMAS = [
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-65536",  # 64 MiB
+    "PRAGMA busy_timeout=10000",
+]
+
+_CREATE_TABLE = (
+    f"CREATE TABLE IF NOT EXISTS {SHIP_CNT_TABLE} "
+    "(pipe_name TEXT NOT NULL, date_id INTEGER NOT NULL, ship_cnt INTEGER)"
+)
+_UPSERT = (
+    f"INSERT INTO {SHIP_CNT_TABLE} (pipe_name, date_id, ship_cnt) VALUES (?, ?, ?) "
+    "ON CONFLICT (pipe_name, date_id) DO UPDATE SET ship_cnt = excluded.ship_cnt"
+)
+_DEDUP = (
+    f"DELETE FROM {SHIP_CNT_TABLE} WHERE rowid NOT IN "
+    f"(SELECT MAX(rowid) FROM {SHIP_CNT_TABLE} GROUP BY pipe_name, date_id)"
+)
+_DUPLICATED_DAYS_QUERY = (
+    "SELECT pipe_name, MIN(date_id), MAX(date_id) FROM "
+    f"(SELECT pipe_name, date_id FROM {SHIP_CNT_TABLE} GROUP BY pipe_name, date_id HAVING COUNT(*) > 1) "
+    "GROUP BY pipe_name"
+)
+_MAX_DATE_QUERY = f"SELECT MAX(date_id) FROM {SHIP_CNT_TABLE} WHERE pipe_name = ?"
+_BUMP_REVISION = (
+    f"INSERT INTO {PIPE_REVISION_TABLE} (pipe_name, revision, updated_at) VALUES (?, 1, ?) "
+    "ON CONFLICT (pipe_name) DO UPDATE SET revision = revision + 1, updated_at = excluded.updated_at"
+)
+
+
+def iter_file_chunks(path: str | Path, chunksize: int = DEFAULT_CHUNKSIZE) -> Iterator[pd.DataFrame]:
+    """Stream a CSV or Parquet file as DataFrames of at most ``chunksize`` rows."""
+    path = Path(path)
+    if path.suffix.lower() == ".parquet":
+        try:
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError("Parquet ingestion needs pyarrow: pip install 'sisimcp[arrow]'") from e
+
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize, columns=SHIP_CNT_COLUMNS):
+            yield batch.to_pandas()
+    elif path.suffix.lower() == ".csv":
+        yield from pd.read_csv(path, chunksize=chunksize, usecols=SHIP_CNT_COLUMNS)
+    else:
+        raise ValueError(f"Unsupported file type {path.suffix}, expected .csv or .parquet")
+
+
+def validate_chunk(chunk: pd.DataFrame) -> tuple[pd.DataFrame, int]:
+    """Normalize and validate a chunk.
+
+    - pipe_name: non empty string
+    - date_id: YYYYMMDD integer (YYYY-MM-DD strings are converted)
+    - ship_cnt: non negative integer
+
+    Duplicated ``(pipe_name, date_id)`` keep the last row.
+
+    Returns:
+        tuple[pd.DataFrame, int]: valid rows and the number of rejected rows.
+    """
+    missing = set(SHIP_CNT_COLUMNS) - set(chunk.columns)
+    if missing:
+        raise ValueError(f"Missing columns {sorted(missing)}")
+
+    pipe_name = chunk["pipe_name"].astype("string").str.strip()
+    date_id = pd.to_numeric(chunk["date_id"], errors="coerce")
+    not_numeric = date_id.isna() & chunk["date_id"].notna()
+    if not_numeric.any():
+        parsed = pd.to_datetime(chunk.loc[not_numeric, "date_id"], format="%Y-%m-%d", errors="coerce")
+        date_id.loc[not_numeric] = pd.to_numeric(parsed.dt.strftime("%Y%m%d"), errors="coerce")
+    ship_cnt = pd.to_numeric(chunk["ship_cnt"], errors="coerce")
+
+    valid = (
+        pipe_name.notna().to_numpy(dtype=bool) & (pipe_name.str.len() > 0).fillna(False).to_numpy(dtype=bool)
+        & date_id.between(19000101, MAX_DATE_ID).to_numpy(dtype=bool)
+        & (date_id % 1 == 0).to_numpy(dtype=bool)
+        & (ship_cnt >= 0).to_numpy(dtype=bool)
+        & (ship_cnt % 1 == 0).to_numpy(dtype=bool)
+    )
+    df = pd.DataFrame({
+        "pipe_name": pipe_name[valid].astype(object),
+        "date_id": date_id[valid].astype(np.int64),
+        "ship_cnt": ship_cnt[valid].astype(np.int64),
+    })
+    df = df.drop_duplicates(subset=["pipe_name", "date_id"], keep="last")
+    return df, int((~valid).sum())
+
+
+def prepare_database(engine: Engine) -> None:
+    """Create ``ship_cnt_in_pipe`` if needed and apply the migrations (unique upsert key, covering index)."""
+    with engine.begin() as conn:
+        conn.exec_driver_sql(_CREATE_TABLE)
+    run_migrations(engine)
+
+
+def deduplicate_ship_cnt(engine: Engine | None = None) -> int:
+    """Keep only the latest row of every duplicated ``(pipe_name, date_id)``.
+
+    Migration 0002 (the unique upsert key) refuses to run while duplicates exist, this is the
+    explicit maintenance step that removes them. Like a rewrite by the upsert, the revisions of the
+    pipes are bumped and their materialized anomalies over the deduplicated days are dropped.
+
+    Returns:
+        int: number of removed rows.
+    """
+    engine = engine or get_engine()
+    with engine.begin() as conn:
+        conn.exec_driver_sql(_CREATE_TABLE)
+        date_ranges = {row[0]: (row[1], row[2]) for row in conn.execute(text(_DUPLICATED_DAYS_QUERY))}
+        removed = conn.execute(text(_DEDUP)).rowcount
+        tables = set(inspect(conn).get_table_names())
+        if removed and PIPE_REVISION_TABLE in tables:
+            updated_at = datetime.now().isoformat(timespec="seconds")
+            conn.exec_driver_sql(_BUMP_REVISION, [(pipe_name, updated_at) for pipe_name in date_ranges])
+    if removed:
+        logger.warning(f"Removed {removed} duplicated rows of {len(date_ranges)} pipes from {SHIP_CNT_TABLE}")
+        _invalidate_caches(set(date_ranges))
+        if ANOMALY_RUN_TABLE in tables:
+            invalidate_anomaly_runs(date_ranges, engine)
+    return removed
+
+
+def ingest_files(
+    paths: list[str | Path], engine: Engine | None = None, chunksize: int = DEFAULT_CHUNKSIZE
+) -> dict[str, float]:
+    """Upsert ship cnt files into ``ship_cnt_in_pipe``.
+
+    Args:
+        paths: CSV / Parquet files with columns pipe_name, date_id, ship_cnt.
+        engine: target sqlite database, default is the shared engine.
+        chunksize: rows per chunk (and per transaction).
+
+    Returns:
+        dict[str, float]: rows, rejected, pipes, seconds, rows_per_sec.
+    """
+    engine = engine or get_engine()
+    if engine.dialect.name != "sqlite":
+        raise ValueError(f"ingest_files only supports sqlite, got {engine.dialect.name}")
+    prepare_database(engine)
+
+    n_rows, n_rejected = 0, 0
+    # first ingested day per pipe, decides between an incremental and a full baseline refresh
+    first_date_ids: dict[str, int] = {}
+    last_date_ids: dict[str, int] = {}
+    started_at = time.perf_counter()
+    raw_conn = engine.raw_connection()
+    try:
+        cursor = raw_conn.cursor()
+        for pragma in INGEST_PRAGMAS:
+            cursor.execute(pragma)
+        raw_conn.commit()
+
+        for path in paths:
+            file_rows = 0
+            for chunk in iter_file_chunks(path, chunksize=chunksize):
+                df, rejected = validate_chunk(chunk)
+                n_rejected += rejected
+                if df.shape[0] == 0:
+                    continue
+                chunk_first_date_ids = df.groupby("pipe_name")["date_id"].min()
+                try:
+                    rewritten = _rewritten_pipes(cursor, chunk_first_date_ids)
+                    cursor.executemany(
+                        _UPSERT,
+                        zip(df["pipe_name"].tolist(), df["date_id"].tolist(), df["ship_cnt"].tolist()),
+                    )
+                    if rewritten:
+                        updated_at = datetime.now().isoformat(timespec="seconds")
+                        cursor.executemany(_BUMP_REVISION, [(pipe_name, updated_at) for pipe_name in rewritten])
+                    raw_conn.commit()
+                except Exception:
+                    raw_conn.rollback()
+                    raise
+                file_rows += df.shape[0]
+                for pipe_name, date_id in chunk_first_date_ids.items():
+                    first_date_ids[pipe_name] = min(first_date_ids.get(pipe_name, int(date_id)), int(date_id))
+                for pipe_name, date_id in df.groupby("pipe_name")["date_id"].max().items():
+                    last_date_ids[pipe_name] = max(last_date_ids.get(pipe_name, int(date_id)), int(date_id))
+            n_rows += file_rows
+            logger.info(f"Ingested {file_rows} rows from {path}")
+        cursor.close()
+    finally:
+        raw_conn.close()
+
+    seconds = time.perf_counter() - started_at
+    _invalidate_caches(set(first_date_ids))
+    # materialized anomalies of the ingested days are stale, their lookups fall back to the detection
+    invalidate_anomaly_runs(
+        {pipe_name: (first_date_ids[pipe_name], last_date_ids[pipe_name]) for pipe_name in first_date_ids}, engine
+    )
+    _refresh_baselines(first_date_ids, engine)
+    return {
+        "rows": n_rows,
+        "rejected": n_rejected,
+        "pipes": len(first_date_ids),
+        "seconds": seconds,
+        "rows_per_sec": n_rows / seconds if seconds > 0 else float(n_rows),
+    }
+
+
+def _rewritten_pipes(cursor, first_date_ids: pd.Series) -> list[str]:
+    # pipes whose chunk starts at or before their last stored day: the upsert rewrites (or fills in) past days
+    rewritten = []
+    for pipe_name, date_id in first_date_ids.items():
+        max_date_id = cursor.execute(_MAX_DATE_QUERY, (pipe_name,)).fetchone()[0]
+        if max_date_id is not None and int(date_id) <= max_date_id:
+            rewritten.append(pipe_name)
+    return rewritten
+
+
+def _invalidate_caches(pipe_names: set[str]) -> None:
+    # Only the current process' memory caches (and the shared persistent result tier) are reached here,
+    # other server processes pick up new days through their incremental refresh and rewritten days
+    # through the bumped pipe revision.
+    from mcp_conductor.detector.result_cache import get_result_cache
+    from mcp_conductor.storage.series_cache import get_series_cache
+
+    series_cache, result_cache = get_series_cache(), get_result_cache()
+    for pipe_name in pipe_names:
+        series_cache.invalidate(pipe_name)
+        result_cache.invalidate(pipe_name)
+
+
+def _refresh_baselines(first_date_ids: dict[str, int], engine: Engine) -> None:
+    # new days are folded into the seasonal baselines, a pipe whose past days were rewritten is rebuilt
+    if not first_date_ids:
+        return
+    stored = load_baselines(engine)
+    rebuild = [
+        pipe_name for pipe_name, date_id in first_date_ids.items()
+        if pipe_name in stored and date_id <= stored[pipe_name].last_date_id
+    ]
+    incremental = [pipe_name for pipe_name in first_date_ids if pipe_name not in rebuild]
+    if incremental:
+        refresh_baselines(incremental, engine=engine)
+    if rebuild:
+        refresh_baselines(rebuild, rebuild=True, engine=engine)
+
+
+def run_app():
+    parser = argparse.ArgumentParser(description='bulk upsert ship cnt csv/parquet files into ship_cnt_in_pipe')
+    parser.add_argument("paths", nargs="*", help='csv or parquet files with columns pipe_name, date_id, ship_cnt')
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE, help='rows per chunk / transaction')
+    parser.add_argument("--db_url", type=str, default=None, help='SQLAlchemy url, default: SISI_DB_URL or ./data/sisi.sqlite')
+    parser.add_argument("--dedup", action="store_true",
+                        help='first remove duplicated (pipe_name, date_id) rows, the latest row of every day is kept')
+    args = parser.parse_args()
+    if not args.paths and not args.dedup:
+        parser.error("expected files to ingest or --dedup")
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    engine = get_engine(args.db_url)
+    if args.dedup:
+        print(f"Removed {deduplicate_ship_cnt(engine)} duplicated rows")
+    if not args.paths:
+        return
+    stats = ingest_files(args.paths, engine=engine, chunksize=args.chunksize)
+    print(
+        f"Ingested {stats['rows']} rows ({stats['rejected']} rejected) for {stats['pipes']} pipes "
+        f"in {stats['seconds']:.2f}s, {stats['rows_per_sec']:.0f} rows/sec"
+    )
+
+
+if __name__ == "__main__":
+    run_app()
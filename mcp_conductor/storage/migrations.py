@@ -0,0 +1,184 @@
+"""
+Schema migrations for the sisi database.
+
+Every migration is applied and recorded in ``schema_migrations`` in its own transaction. A migration
+whose required table doesn't exist yet is skipped and retried on the next run. Migrations never
+delete data: a migration blocked by existing rows (see ``MIGRATION_CHECKS``) is skipped as well,
+the others are applied and the run then fails with the command that resolves the blocking rows.
+
+Usage:
+    python -m mcp_conductor.storage.migrations [--db_url sqlite:///data/sisi.sqlite]
+"""
+import argparse
+import logging
+from datetime import datetime
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+
+from mcp_conductor.storage.engine import get_engine
+
+logger = logging.getLogger(__name__)
+
+MIGRATION_TABLE = "schema_migrations"
+
+# (version, required table or None, statements)
+MIGRATIONS: list[tuple[str, str | None, list[str]]] = [
+    (
+        "0001_ship_cnt_in_pipe_pipe_date_index",
+        "ship_cnt_in_pipe",
+        [
+            # ship_cnt is part of the key so window reads are answered from the index only
+            "CREATE INDEX IF NOT EXISTS idx_ship_cnt_in_pipe_pipe_date "
+            "ON ship_cnt_in_pipe (pipe_name, date_id, ship_cnt)",
+        ],
+    ),
+    (
+        "0002_ship_cnt_in_pipe_unique_pipe_date",
+        "ship_cnt_in_pipe",
+        [
+            # one record per pipe and day (the upsert key of the ingestion)
+            "CREATE UNIQUE INDEX IF NOT EXISTS uq_ship_cnt_in_pipe_pipe_date "
+            "ON ship_cnt_in_pipe (pipe_name, date_id)",
+        ],
+    ),
+    (
+        "0003_pipe_anomalies",
+        None,
+        [
+            # materialized detection results, keyed for "anomalies of pipe X in [start, end] with config C"
+            "CREATE TABLE IF NOT EXISTS pipe_anomalies ("
+            "config_hash TEXT NOT NULL, pipe_name TEXT NOT NULL, date_id INTEGER NOT NULL, "
+            "ship_cnt REAL, method TEXT NOT NULL, "
+            "PRIMARY KEY (config_hash, pipe_name, date_id)) WITHOUT ROWID",
+            # date ranges covered by a backfill, a lookup is only answered inside them
+            "CREATE TABLE IF NOT EXISTS pipe_anomaly_runs ("
+            "config_hash TEXT NOT NULL, pipe_name TEXT NOT NULL, start_date_id INTEGER NOT NULL, "
+            "end_date_id INTEGER NOT NULL, method TEXT NOT NULL, created_at TEXT NOT NULL, "
+            "PRIMARY KEY (config_hash, pipe_name, start_date_id, end_date_id))",
+        ],
+    ),
+    (
+        "0004_pipe_thresholds",
+        None,
+        [
+            # per-pipe sisi thresholds, precomputed from the pipe's history (entry/main_precompute_thresholds.py)
+            "CREATE TABLE IF NOT EXISTS pipe_thresholds ("
+            "pipe_name TEXT PRIMARY KEY, min_alert_cnt REAL NOT NULL, max_alert_cnt REAL NOT NULL, "
+            "lookback_days INTEGER NOT NULL, lower_quantile REAL NOT NULL, upper_quantile REAL NOT NULL, "
+            "end_date_id INTEGER NOT NULL, updated_at TEXT NOT NULL)",
+        ],
+    ),
+    (
+        "0005_pipe_baselines",
+        None,
+        [
+            # count / sum / sum of squares per (month, day of week) cell, see storage/baselines.py
+            "CREATE TABLE IF NOT EXISTS pipe_baselines ("
+            "pipe_name TEXT NOT NULL, month INTEGER NOT NULL, dow INTEGER NOT NULL, n INTEGER NOT NULL, "
+            "total REAL NOT NULL, total_sq REAL NOT NULL, last_date_id INTEGER NOT NULL, "
+            "PRIMARY KEY (pipe_name, month, dow)) WITHOUT ROWID",
+        ],
+    ),
+    (
+        "0006_pipe_revisions",
+        None,
+        [
+            # bumped by the ingestion when it rewrites past days of a pipe, see storage/series_cache.py
+            "CREATE TABLE IF NOT EXISTS pipe_revisions ("
+            "pipe_name TEXT PRIMARY KEY, revision INTEGER NOT NULL, updated_at TEXT NOT NULL)",
+        ],
+    ),
+    (
+        "0007_pipe_anomaly_runs_freshness",
+        "pipe_anomaly_runs",
+        [
+            # days and pipe revision a backfill run detected on, runs recorded before (-1) are never served again
+            "ALTER TABLE pipe_anomaly_runs ADD COLUMN row_count INTEGER NOT NULL DEFAULT -1",
+            "ALTER TABLE pipe_anomaly_runs ADD COLUMN revision INTEGER NOT NULL DEFAULT -1",
+        ],
+    ),
+    (
+        "0008_pipe_anomaly_runs_detector_state",
+        "pipe_anomaly_runs",
+        [
+            # thresholds / baseline version the run detected with (ChangePointDetector.state_key)
+            "ALTER TABLE pipe_anomaly_runs ADD COLUMN detector_state TEXT NOT NULL DEFAULT ''",
+        ],
+    ),
+]
+
+# version -> (query counting the rows that block the migration, how to resolve them)
+MIGRATION_CHECKS: dict[str, tuple[str, str]] = {
+    "0002_ship_cnt_in_pipe_unique_pipe_date": (
+        "SELECT (SELECT COUNT(*) FROM ship_cnt_in_pipe) - "
+        "(SELECT COUNT(*) FROM (SELECT DISTINCT pipe_name, date_id FROM ship_cnt_in_pipe))",
+        "duplicated (pipe_name, date_id) rows in ship_cnt_in_pipe, review them and remove them with "
+        "`python -m mcp_conductor.storage.ingest --dedup` (keeps the latest row of every day)",
+    ),
+}
+
+
+def run_migrations(engine: Engine | None = None) -> list[str]:
+    """Apply the pending migrations.
+
+    Args:
+        engine: target database, default is the shared engine.
+
+    Returns:
+        list[str]: versions applied by this call.
+
+    Raises:
+        RuntimeError: a migration is blocked by existing rows, after every other pending migration was applied.
+    """
+    engine = engine or get_engine()
+    applied_now = []
+    blocked = []
+    with engine.begin() as conn:
+        conn.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {MIGRATION_TABLE} (version TEXT PRIMARY KEY, applied_at TEXT)"
+        ))
+        applied = {row[0] for row in conn.execute(text(f"SELECT version FROM {MIGRATION_TABLE}"))}
+
+    for version, required_table, statements in MIGRATIONS:
+        if version in applied:
+            continue
+        # one transaction per migration, a failing one doesn't roll back the ones applied before it
+        with engine.begin() as conn:
+            if required_table is not None and required_table not in inspect(conn).get_table_names():
+                logger.warning(f"Skip migration {version}: table {required_table} doesn't exist yet.")
+                continue
+            if version in MIGRATION_CHECKS:
+                query, resolution = MIGRATION_CHECKS[version]
+                blocking = conn.execute(text(query)).scalar()
+                if blocking:
+                    blocked.append(f"Migration {version} is blocked by {blocking} {resolution}")
+                    logger.error(blocked[-1])
+                    continue
+            for statement in statements:
+                conn.execute(text(statement))
+            conn.execute(
+                text(f"INSERT INTO {MIGRATION_TABLE} (version, applied_at) VALUES (:version, :applied_at)"),
+                {"version": version, "applied_at": datetime.now().isoformat(timespec="seconds")},
+            )
+        applied_now.append(version)
+        logger.info(f"Applied migration {version}")
+
+    if blocked:
+        raise RuntimeError("; ".join(blocked))
+    return applied_now
+
+
+def run_app():
+    parser = argparse.ArgumentParser(description='apply schema migrations on the sisi database')
+    parser.add_argument("--db_url", type=str, default=None, help='SQLAlchemy url, default: SISI_DB_URL or ./data/sisi.sqlite')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    engine = get_engine(args.db_url)
+    applied = run_migrations(engine)
+    print(f"Applied {len(applied)} migration(s): {applied}")
+
+
+if __name__ == "__main__":
+    run_app()
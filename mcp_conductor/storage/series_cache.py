@@ -0,0 +1,242 @@
+"""
+In-memory columnar cache of the ``ship_cnt_in_pipe`` series.
+
+Each pipe is held as two contiguous, date_id ordered NumPy arrays (``date_id`` and ``ship_cnt``).
+Window reads are two ``np.searchsorted`` calls returning views, no sqlite round trip.
+At most every ``refresh_interval`` seconds a read revalidates the pipe: the ingestion bumps the
+pipe's revision (``pipe_revisions``) when it rewrites past days, a changed revision reloads the
+whole series, otherwise only rows with ``date_id`` greater than the cached maximum are fetched.
+"""
+import asyncio
+import os
+import threading
+import time
+from typing import TYPE_CHECKING
+
+import numpy as np
+from sqlalchemy.engine import Engine
+
+from mcp_conductor.storage.ship_cnt import load_pipe_revision, load_pipe_series
+
+if TYPE_CHECKING:
+    from mcp_conductor.storage.arrow_series import ArrowSeriesCache
+    from mcp_conductor.storage.async_ship_cnt import AsyncShipCntRepository
+
+
+class PipeSeries:
+    """date_id ordered series of one pipe"""
+    __slots__ = ("date_ids", "ship_cnts", "revision", "refreshed_at")
+
+    def __init__(self, date_ids: np.ndarray, ship_cnts: np.ndarray, revision: int = 0) -> None:
+        self.date_ids = date_ids
+        self.ship_cnts = ship_cnts
+        self.revision = revision
+        self.refreshed_at = time.monotonic()
+
+    @property
+    def max_date_id(self) -> int | None:
+        return int(self.date_ids[-1]) if self.date_ids.shape[0] else None
+
+    def window(self, start_date_id: int, end_date_id: int) -> tuple[np.ndarray, np.ndarray]:
+        lo = np.searchsorted(self.date_ids, start_date_id, side="left")
+        hi = np.searchsorted(self.date_ids, end_date_id, side="right")
+        return self.date_ids[lo:hi], self.ship_cnts[lo:hi]
+
+
+class PipeSeriesCache:
+    def __init__(self, engine: Engine | None = None, refresh_interval: float | None = None) -> None:
+        """Cache the ship cnt series per pipe.
+
+        Args:
+            engine: database to read from, default is the shared engine.
+            refresh_interval: minimum seconds between two refreshes of a pipe,
+                default ``SISI_SERIES_CACHE_REFRESH_SECONDS`` or 60.
+        """
+        self.engine = engine
+        if refresh_interval is None:
+            refresh_interval = float(os.getenv("SISI_SERIES_CACHE_REFRESH_SECONDS") or 60)
+        self.refresh_interval = refresh_interval
+        self._series: dict[str, PipeSeries] = {}
+        self._lock = threading.Lock()
+        self._pipe_locks: dict[str, threading.Lock] = {}
+        self._async_pipe_locks: dict[str, asyncio.Lock] = {}
+        self.hits = 0
+        self.misses = 0
+        self.refreshes = 0
+
+    def _pipe_lock(self, pipe_name: str) -> threading.Lock:
+        with self._lock:
+            return self._pipe_locks.setdefault(pipe_name, threading.Lock())
+
+    def _load(self, pipe_name: str, revision: int | None = None) -> PipeSeries:
+        # the revision is read first, a rewrite racing with the load shows up as a newer revision next time
+        if revision is None:
+            revision = load_pipe_revision(pipe_name, engine=self.engine)
+        df = load_pipe_series(pipe_name, engine=self.engine)
+        return PipeSeries(df["date_id"].to_numpy(dtype=np.int64), df["ship_cnt"].to_numpy(), revision)
+
+    def refresh(self, pipe_name: str) -> int:
+        """Reload the pipe when its past days were rewritten, otherwise append the rows newer than the cached maximum date_id.
+
+        Returns:
+            int: number of loaded rows.
+        """
+        with self._pipe_lock(pipe_name):
+            series = self._series.get(pipe_name)
+            if series is None:
+                self._series[pipe_name] = self._load(pipe_name)
+                return self._series[pipe_name].date_ids.shape[0]
+
+            self.refreshes += 1
+            revision = load_pipe_revision(pipe_name, engine=self.engine)
+            if revision != series.revision:
+                self._series[pipe_name] = self._load(pipe_name, revision)
+                return self._series[pipe_name].date_ids.shape[0]
+
+            df = load_pipe_series(pipe_name, after_date_id=series.max_date_id, engine=self.engine)
+            self._series[pipe_name] = self._append(
+                series, df["date_id"].to_numpy(dtype=np.int64), df["ship_cnt"].to_numpy()
+            )
+            return df.shape[0]
+
+    @staticmethod
+    def _append(series: PipeSeries, date_ids: np.ndarray, ship_cnts: np.ndarray) -> PipeSeries:
+        if date_ids.shape[0] == 0:
+            series.refreshed_at = time.monotonic()
+            return series
+        # readers keep their views on the old arrays, the entry is swapped as a whole
+        return PipeSeries(
+            np.concatenate([series.date_ids, date_ids]),
+            np.concatenate([series.ship_cnts, ship_cnts]),
+            series.revision,
+        )
+
+    def get_series(self, pipe_name: str) -> PipeSeries:
+        """Return the cached series of ``pipe_name``, loading it on first use."""
+        series = self._series.get(pipe_name)
+        if series is not None:
+            return series
+        with self._pipe_lock(pipe_name):
+            series = self._series.get(pipe_name)
+            if series is None:
+                self.misses += 1
+                series = self._load(pipe_name)
+                self._series[pipe_name] = series
+        return series
+
+    def get_window(self, pipe_name: str, start_date_id: int, end_date_id: int) -> tuple[np.ndarray, np.ndarray]:
+        """Return ``(date_ids, ship_cnts)`` views of ``start_date_id <= date_id <= end_date_id``.
+
+        Args:
+            pipe_name: pipe name.
+            start_date_id: first day of the window (YYYYMMDD).
+            end_date_id: last day of the window (YYYYMMDD).
+        """
+        series = self._series.get(pipe_name)
+        if series is None:
+            series = self.get_series(pipe_name)
+        elif self._needs_refresh(series):
+            self.refresh(pipe_name)
+            series = self._series[pipe_name]
+        else:
+            self.hits += 1
+        return series.window(start_date_id, end_date_id)
+
+    async def get_window_async(
+        self,
+        pipe_name: str,
+        start_date_id: int,
+        end_date_id: int,
+        repository: "AsyncShipCntRepository | None" = None,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Async variant of :meth:`get_window`.
+
+        Cache hits return without any I/O, loads and refreshes are awaited on ``repository``.
+        Without a repository the blocking :meth:`get_window` runs in the default executor.
+        """
+        if repository is None:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(None, self.get_window, pipe_name, start_date_id, end_date_id)
+
+        series = self._series.get(pipe_name)
+        if series is not None and not self._needs_refresh(series):
+            self.hits += 1
+            return series.window(start_date_id, end_date_id)
+
+        # concurrent requests of the same pipe share one load
+        lock = self._async_pipe_locks.setdefault(pipe_name, asyncio.Lock())
+        async with lock:
+            series = self._series.get(pipe_name)
+            if series is None:
+                self.misses += 1
+                revision = await repository.load_pipe_revision(pipe_name)
+                series = PipeSeries(*await repository.load_pipe_series(pipe_name), revision)
+            elif self._needs_refresh(series):
+                self.refreshes += 1
+                revision = await repository.load_pipe_revision(pipe_name)
+                if revision != series.revision:
+                    series = PipeSeries(*await repository.load_pipe_series(pipe_name), revision)
+                else:
+                    series = self._append(
+                        series, *await repository.load_pipe_series(pipe_name, after_date_id=series.max_date_id)
+                    )
+            else:
+                self.hits += 1
+            self._series[pipe_name] = series
+        return series.window(start_date_id, end_date_id)
+
+    def _needs_refresh(self, series: PipeSeries) -> bool:
+        # a rewrite of past days can change any window, not only the ones reaching past the cached last day
+        return time.monotonic() - series.refreshed_at >= self.refresh_interval
+
+    def has_pipe(self, pipe_name: str) -> bool:
+        """Whether there is any ship cnt record for ``pipe_name``."""
+        return self.get_series(pipe_name).date_ids.shape[0] > 0
+
+    def data_version(self, pipe_name: str) -> str:
+        """Version of the cached series, changes whenever rows are appended or past days are rewritten."""
+        series = self.get_series(pipe_name)
+        return f"{series.revision}:{series.date_ids.shape[0]}:{series.max_date_id}"
+
+    def invalidate(self, pipe_name: str | None = None) -> None:
+        """Drop one pipe (or every pipe) from the cache."""
+        with self._lock:
+            if pipe_name is None:
+                self._series.clear()
+            else:
+                self._series.pop(pipe_name, None)
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "refreshes": self.refreshes,
+            "pipes": len(self._series),
+            "rows": sum(series.date_ids.shape[0] for series in list(self._series.values())),
+        }
+
+
+_SERIES_CACHE: "PipeSeriesCache | ArrowSeriesCache | None" = None
+_SERIES_CACHE_LOCK = threading.Lock()
+
+
+def get_series_cache() -> "PipeSeriesCache | ArrowSeriesCache":
+    """Return the process-wide series cache.
+
+    ``SISI_SERIES_BACKEND`` selects the storage: 'sqlite' (default, shared engine)
+    or 'arrow' (memory mapped Arrow IPC / Parquet dataset under ``SISI_ARROW_ROOT``).
+    """
+    global _SERIES_CACHE
+    if _SERIES_CACHE is None:
+        with _SERIES_CACHE_LOCK:
+            if _SERIES_CACHE is None:
+                backend = os.getenv("SISI_SERIES_BACKEND") or "sqlite"
+                if backend == "sqlite":
+                    _SERIES_CACHE = PipeSeriesCache()
+                elif backend == "arrow":
+                    # pyarrow is only needed for this backend
+                    from mcp_conductor.storage.arrow_series import ArrowSeriesCache
+                    _SERIES_CACHE = ArrowSeriesCache()
+                else:
+                    raise ValueError(f"SISI_SERIES_BACKEND must be one of ['sqlite', 'arrow'], got {backend}")
+    return _SERIES_CACHE
@@ -0,0 +1,119 @@
+"""
+Read access to the ``ship_cnt_in_pipe`` table.
+
+Only the requested pipe and date window is selected, the filtering is done by sqlite
+on the ``(pipe_name, date_id, ship_cnt)`` covering index (see ``storage/migrations.py``).
+"""
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import OperationalError
+
+from mcp_conductor.storage.engine import get_engine
+
+SHIP_CNT_TABLE = "ship_cnt_in_pipe"
+SHIP_CNT_COLUMNS = ["pipe_name", "date_id", "ship_cnt"]
+# per-pipe counter bumped by the ingestion whenever past days are rewritten (migration 0006)
+PIPE_REVISION_TABLE = "pipe_revisions"
+# upper bound of date_id (YYYYMMDD) used for open ended reads
+MAX_DATE_ID = 99991231
+
+_WINDOW_QUERY = text(
+    f"SELECT pipe_name, date_id, ship_cnt FROM {SHIP_CNT_TABLE} "
+    "WHERE pipe_name = :pipe_name AND date_id BETWEEN :start_date_id AND :end_date_id "
+    "ORDER BY date_id"
+)
+_PIPE_EXISTS_QUERY = text(
+    f"SELECT 1 FROM {SHIP_CNT_TABLE} WHERE pipe_name = :pipe_name LIMIT 1"
+)
+_REVISION_QUERY = text(
+    f"SELECT revision FROM {PIPE_REVISION_TABLE} WHERE pipe_name = :pipe_name"
+)
+
+
+def get_date_window(run_date: str, month: int = 1, day: int = 0) -> tuple[int, int]:
+    """Return the ``(start_date_id, run_date_id)`` monitor window ending at ``run_date``.
+
+    Args:
+        run_date: end of the window (YYYY-MM-DD).
+        month: number of months before run_date.
+        day: number of days before run_date.
+    """
+    run_date_obj = datetime.strptime(str(run_date), "%Y-%m-%d")
+    start_date_obj = run_date_obj - timedelta(days=day) - pd.DateOffset(months=month)
+    return int(start_date_obj.strftime("%Y%m%d")), int(run_date_obj.strftime("%Y%m%d"))
+
+
+def date_ids_to_datetime64(date_ids: np.ndarray) -> np.ndarray:
+    """Convert YYYYMMDD date_ids into ``datetime64[D]`` days, vectorized (no string round trip)."""
+    date_ids = np.asarray(date_ids, dtype=np.int64)
+    years, months, days = date_ids // 10000, date_ids // 100 % 100, date_ids % 100
+    return (
+        (years - 1970).astype("datetime64[Y]").astype("datetime64[M]") + (months - 1)
+    ).astype("datetime64[D]") + (days - 1)
+
+
+def load_pipe_window(
+    pipe_name: str, start_date_id: int, end_date_id: int, engine: Engine | None = None
+) -> pd.DataFrame:
+    """Load ``pipe_name, date_id, ship_cnt`` of one pipe for ``start_date_id <= date_id <= end_date_id``.
+
+    Returns:
+        pd.DataFrame: rows ordered by date_id.
+    """
+    engine = engine or get_engine()
+    return pd.read_sql(
+        _WINDOW_QUERY,
+        con=engine,
+        params={
+            "pipe_name": pipe_name,
+            "start_date_id": int(start_date_id),
+            "end_date_id": int(end_date_id),
+        },
+    )
+
+
+def load_pipe_series(
+    pipe_name: str, after_date_id: int | None = None, engine: Engine | None = None
+) -> pd.DataFrame:
+    """Load the full series of one pipe, or only the rows with ``date_id > after_date_id``.
+
+    Returns:
+        pd.DataFrame: rows ordered by date_id.
+    """
+    start_date_id = 0 if after_date_id is None else int(after_date_id) + 1
+    return load_pipe_window(pipe_name, start_date_id, MAX_DATE_ID, engine=engine)
+
+
+def load_pipe_revision(pipe_name: str, engine: Engine | None = None) -> int:
+    """Revision of the pipe's past days, 0 when they were never rewritten.
+
+    Appending days after the last one keeps the revision, so caches holding a prefix of the
+    series stay valid and only fetch the new rows.
+    """
+    engine = engine or get_engine()
+    try:
+        with engine.connect() as conn:
+            revision = conn.execute(_REVISION_QUERY, {"pipe_name": pipe_name}).scalar()
+    except OperationalError:
+        # database without migration 0006, nothing was rewritten through the ingestion
+        return 0
+    return int(revision or 0)
+
+
+def list_pipes(engine: Engine | None = None) -> list[str]:
+    """Every pipe name with ship cnt records."""
+    engine = engine or get_engine()
+    with engine.connect() as conn:
+        rows = conn.execute(text(f"SELECT DISTINCT pipe_name FROM {SHIP_CNT_TABLE} ORDER BY pipe_name"))
+        return [row[0] for row in rows]
+
+
+def pipe_exists(pipe_name: str, engine: Engine | None = None) -> bool:
+    """Whether there is any ship cnt record for ``pipe_name``."""
+    engine = engine or get_engine()
+    with engine.connect() as conn:
+        return conn.execute(_PIPE_EXISTS_QUERY, {"pipe_name": pipe_name}).first() is not None
@@ -0,0 +1,165 @@
+"""
+Per-pipe SISI alert thresholds (``pipe_thresholds``).
+
+The thresholds are quantiles of each pipe's own history over a trailing lookback window,
+computed by ``entry/main_precompute_thresholds.py`` and stored one row per pipe.
+Servers load the table once at startup into the process wide :class:`ThresholdLookup`,
+the detector only reads that dict, no quantile is computed per request.
+"""
+import logging
+import threading
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+
+from mcp_conductor.storage.engine import get_engine
+
+logger = logging.getLogger(__name__)
+
+THRESHOLD_TABLE = "pipe_thresholds"
+DEFAULT_LOOKBACK_DAYS = 365
+DEFAULT_LOWER_QUANTILE = 0.05
+DEFAULT_UPPER_QUANTILE = 0.95
+
+# hand tuned thresholds used before the table existed, a precomputed row of the pipe replaces them
+DEFAULT_THRESHOLDS: dict[str, tuple[float, float]] = {
+    "曼德海峡": (13.0, 41.0),
+}
+
+
+def compute_thresholds(
+    date_ids: np.ndarray,
+    ship_cnts: np.ndarray,
+    lookback_days: int = DEFAULT_LOOKBACK_DAYS,
+    lower_quantile: float = DEFAULT_LOWER_QUANTILE,
+    upper_quantile: float = DEFAULT_UPPER_QUANTILE,
+    end_date_id: int | None = None,
+) -> tuple[float, float] | None:
+    """Return the ``(min_alert_cnt, max_alert_cnt)`` quantiles of the ``lookback_days`` ending at ``end_date_id``.
+
+    Args:
+        date_ids: date_id (YYYYMMDD) ordered days of the pipe.
+        ship_cnts: ship cnt of every day, missing values (NaN) are ignored.
+        lookback_days: length of the trailing window.
+        lower_quantile: quantile of the min alert cnt.
+        upper_quantile: quantile of the max alert cnt.
+        end_date_id: last day of the window, default the last day of the series.
+
+    Returns:
+        tuple[float, float] | None: thresholds, None when the window holds no value.
+    """
+    if not 0 <= lower_quantile < upper_quantile <= 1:
+        raise ValueError("quantiles must satisfy 0 <= lower_quantile < upper_quantile <= 1")
+    date_ids = np.asarray(date_ids, dtype=np.int64)
+    if date_ids.shape[0] == 0:
+        return None
+    if end_date_id is None:
+        end_date_id = int(date_ids[-1])
+    end_date = datetime.strptime(str(end_date_id), "%Y%m%d")
+    start_date_id = int((end_date - pd.Timedelta(days=lookback_days - 1)).strftime("%Y%m%d"))
+
+    lo, hi = np.searchsorted(date_ids, [start_date_id, end_date_id + 1])
+    values = np.asarray(ship_cnts[lo:hi], dtype=np.float64)
+    values = values[~np.isnan(values)]
+    if values.shape[0] == 0:
+        return None
+    min_cnt, max_cnt = np.quantile(values, [lower_quantile, upper_quantile])
+    return float(min_cnt), float(max_cnt)
+
+
+def write_thresholds(thresholds: pd.DataFrame, engine: Engine | None = None) -> int:
+    """Upsert threshold rows in a single transaction.
+
+    Args:
+        thresholds: columns pipe_name, min_alert_cnt, max_alert_cnt, lookback_days,
+            lower_quantile, upper_quantile, end_date_id.
+
+    Returns:
+        int: number of written rows.
+    """
+    engine = engine or get_engine()
+    updated_at = datetime.now().isoformat(timespec="seconds")
+    rows = [{**row, "updated_at": updated_at} for row in thresholds.to_dict(orient="records")]
+    if rows:
+        with engine.begin() as conn:
+            conn.execute(text(
+                f"INSERT OR REPLACE INTO {THRESHOLD_TABLE} "
+                "(pipe_name, min_alert_cnt, max_alert_cnt, lookback_days, lower_quantile, upper_quantile, "
+                "end_date_id, updated_at) VALUES (:pipe_name, :min_alert_cnt, :max_alert_cnt, :lookback_days, "
+                ":lower_quantile, :upper_quantile, :end_date_id, :updated_at)"
+            ), rows)
+    return len(rows)
+
+
+def load_thresholds(engine: Engine | None = None) -> dict[str, tuple[float, float]]:
+    """Read every stored ``pipe_name -> (min_alert_cnt, max_alert_cnt)``, empty before the table is migrated."""
+    engine = engine or get_engine()
+    with engine.connect() as conn:
+        if THRESHOLD_TABLE not in inspect(conn).get_table_names():
+            return {}
+        rows = conn.execute(text(f"SELECT pipe_name, min_alert_cnt, max_alert_cnt FROM {THRESHOLD_TABLE}"))
+        return {row[0]: (float(row[1]), float(row[2])) for row in rows}
+
+
+class ThresholdLookup:
+    def __init__(self, thresholds: dict[str, tuple[float, float]] | None = None) -> None:
+        """In-memory ``pipe_name -> (min_alert_cnt, max_alert_cnt)``.
+
+        Args:
+            thresholds: initial thresholds, default :data:`DEFAULT_THRESHOLDS`.
+        """
+        self._thresholds = dict(DEFAULT_THRESHOLDS if thresholds is None else thresholds)
+        self._lock = threading.Lock()
+
+    def get(self, pipe_name: str) -> tuple[float, float] | None:
+        return self._thresholds.get(pipe_name)
+
+    def __contains__(self, pipe_name: str) -> bool:
+        return pipe_name in self._thresholds
+
+    def __len__(self) -> int:
+        return len(self._thresholds)
+
+    def snapshot(self) -> dict[str, tuple[float, float]]:
+        return dict(self._thresholds)
+
+    def update(self, thresholds: dict[str, tuple[float, float]]) -> None:
+        # readers keep the old dict, the lookup is swapped as a whole
+        with self._lock:
+            self._thresholds = {**self._thresholds, **thresholds}
+
+    def reload(self, engine: Engine | None = None) -> int:
+        """Replace the lookup by the defaults and the stored rows.
+
+        Returns:
+            int: number of pipes with thresholds.
+        """
+        thresholds = {**DEFAULT_THRESHOLDS, **load_thresholds(engine)}
+        with self._lock:
+            self._thresholds = thresholds
+        logger.info(f"Loaded the thresholds of {len(thresholds)} pipes")
+        return len(thresholds)
+
+
+_THRESHOLD_LOOKUP: ThresholdLookup | None = None
+_THRESHOLD_LOOKUP_LOCK = threading.Lock()
+
+
+def get_threshold_lookup() -> ThresholdLookup:
+    """Process wide threshold lookup, holds :data:`DEFAULT_THRESHOLDS` until :func:`load_threshold_lookup`."""
+    global _THRESHOLD_LOOKUP
+    if _THRESHOLD_LOOKUP is None:
+        with _THRESHOLD_LOOKUP_LOCK:
+            if _THRESHOLD_LOOKUP is None:
+                _THRESHOLD_LOOKUP = ThresholdLookup()
+    return _THRESHOLD_LOOKUP
+
+
+def load_threshold_lookup(engine: Engine | None = None) -> ThresholdLookup:
+    """Load the ``pipe_thresholds`` table into the process wide lookup (server startup)."""
+    lookup = get_threshold_lookup()
+    lookup.reload(engine)
+    return lookup
@@ -14,8 +14,12 @@ from fastmcp import FastMCP
 from pathlib import Path
 
 from mcp_conductor.entry.main_traffic_detect import trigger_traffic_detect
-from mcp_conductor.detector.pipe_detect_engine import pipe_detect_engine
+from mcp_conductor.detector.pipe_detect_engine import pipe_detect_engine_async
 from mcp_conductor.detector.plot_ship_congestion import plot_ship_congestion
+from mcp_conductor.storage.engine import warm_up
+from mcp_conductor.storage.migrations import run_migrations
+from mcp_conductor.storage.baselines import load_baseline_cache
+from mcp_conductor.storage.thresholds import load_threshold_lookup
 
 # Configure logging to output to both file and stderr
 logging.basicConfig(
@@ -117,17 +121,11 @@ async def detect_traffic_congestion(question: str) -> str:
             f"示例：'请问，2023年12月 曼德海峡 是否发生异常？'"
         )
 
-    # step 1: run changepoints detecting
-    loop = asyncio.get_event_loop()
-    changepoints_result = await loop.run_in_executor(
-        None,
-        pipe_detect_engine,
-        run_date,
-        pipe_name
-    )
+    # step 1: run changepoints detecting, the series read is awaited and detection runs in the detector pool
+    changepoints_result = await pipe_detect_engine_async(run_date, pipe_name)
 
     if len(changepoints_result) > 0:
-        return f"🚢 检测结果 / Detection Result\n 发生异常天数 {changepoints_result[pipe_name].shape[0]}"
+        return f"🚢 检测结果 / Detection Result\n 发生异常天数 {len(changepoints_result[pipe_name])}"
     else:
         return f"{run_date} {pipe_name} 无异常发生"
 
@@ -266,6 +264,15 @@ if __name__ == "__main__":
                                                 help="Transport to use for FastMCP (default: streamable-http)")
         args = parser.parse_args()
 
+        try:
+                warm_up()
+                run_migrations()
+                load_threshold_lookup()
+                load_baseline_cache()
+                logger.info("Database engine pool initialized.")
+        except Exception as e:
+                logger.warning(f"Database warm up failed, engine will connect on first request: {e}")
+
         logger.info(f"✅ MCP HTTP server starting on {args.host}:{args.port} (transport={args.transport})...")
         # Run with streamable-http transport for modern HTTP support
         # Available transports: "stdio", "sse", "streamable-http"
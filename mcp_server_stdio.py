@@ -14,8 +14,13 @@ from pathlib import Path
 import json
 
 from mcp_conductor.entry.main_traffic_detect import trigger_traffic_detect
-from mcp_conductor.detector.pipe_detect_engine import pipe_detect_engine
+from mcp_conductor.detector.pipe_detect_engine import pipe_detect_engine_async
 from mcp_conductor.detector.plot_ship_congestion import plot_ship_congestion
+from mcp_conductor.storage.async_ship_cnt import close_async_repository
+from mcp_conductor.storage.engine import warm_up, dispose_engines
+from mcp_conductor.storage.migrations import run_migrations
+from mcp_conductor.storage.baselines import load_baseline_cache
+from mcp_conductor.storage.thresholds import load_threshold_lookup
 
 # Configure logging to output to both file and stderr
 logging.basicConfig(
@@ -180,17 +185,11 @@ async def call_tool(name: str, arguments: dict) -> list[TextContent]:
                 )
             )]
 
-        # step 1: run changepoints detecting
-        loop = asyncio.get_event_loop()
-        changepoints_result = await loop.run_in_executor(
-            None,
-            pipe_detect_engine,
-            run_date,
-            pipe_name
-        )
+        # step 1: run changepoints detecting, the series read is awaited and detection runs in the detector pool
+        changepoints_result = await pipe_detect_engine_async(run_date, pipe_name)
 
         if len(changepoints_result) > 0:
-            changepoint_rsps = f"🚢 检测结果 / Detection Result\n 发生异常天数 {changepoints_result[pipe_name].shape[0]}"
+            changepoint_rsps = f"🚢 检测结果 / Detection Result\n 发生异常天数 {len(changepoints_result[pipe_name])}"
             return [TextContent(type="text", text=changepoint_rsps)]
         else:
             return [TextContent(type="text", text=f"{run_date} {pipe_name} 无异常发生")]
@@ -309,13 +308,26 @@ async def call_tool(name: str, arguments: dict) -> list[TextContent]:
 async def main():
     """Run the MCP server."""
     logger.info("✅ MCP server started successfully.")
-    async with stdio_server() as (read_stream, write_stream):
-        logger.info("MCP stdio server initialized.")
-        await app.run(
-            read_stream,
-            write_stream,
-            app.create_initialization_options()
-        )
+    try:
+        warm_up()
+        run_migrations()
+        load_threshold_lookup()
+        load_baseline_cache()
+        logger.info("Database engine pool initialized.")
+    except Exception as e:
+        logger.warning(f"Database warm up failed, engine will connect on first request: {e}")
+
+    try:
+        async with stdio_server() as (read_stream, write_stream):
+            logger.info("MCP stdio server initialized.")
+            await app.run(
+                read_stream,
+                write_stream,
+                app.create_initialization_options()
+            )
+    finally:
+        await close_async_repository()
+        dispose_engines()
 
 
 if __name__ == "__main__":
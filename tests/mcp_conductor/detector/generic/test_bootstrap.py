@@ -0,0 +1,121 @@
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+
+from mcp_conductor.detector.generic.bootstrap import bootstrap_scores, default_block_size, exceedance_scores
+
+
+class TestBootstrapScores(unittest.TestCase):
+    def setUp(self) -> None:
+        rng = np.random.default_rng(0)
+        # a lasting shift at 100, noise everywhere else
+        self.signal = np.concatenate([rng.poisson(25, 100), rng.poisson(40, 100)]).astype(np.float64)
+        self.noise = rng.poisson(30, 5000).astype(np.float64)
+        return super().setUp()
+
+    def test_shift_scores_high(self):
+        scores = bootstrap_scores(self.signal, [100, 30, 170], window=7, seed=1)
+        self.assertEqual(scores.shape, (3,))
+        self.assertGreater(scores[0], 0.99)
+        self.assertTrue(((scores >= 0) & (scores <= 1)).all())
+
+    def test_noise_scores_are_uniform(self):
+        # without a change the observed statistic is a draw of the null distribution
+        scores = bootstrap_scores(self.noise, np.arange(10, 4990, 10), window=7, n_resamples=200, seed=2)
+        self.assertAlmostEqual(scores.mean(), 0.5, delta=0.06)
+        self.assertLess((scores >= 0.95).mean(), 0.1)
+
+    def test_edges_and_missing_values(self):
+        signal = self.signal.copy()
+        signal[93:100] = np.nan
+        scores = bootstrap_scores(signal, [100, 0, 199], window=7, seed=1)
+        # no valid point before 100, and nothing before the first point
+        self.assertEqual(scores[0], 0.0)
+        self.assertEqual(scores[1], 0.0)
+        self.assertTrue(np.isfinite(scores).all())
+        self.assertEqual(bootstrap_scores(signal, [], window=7).shape, (0,))
+
+    def test_multivariate(self):
+        rng = np.random.default_rng(3)
+        signal = np.column_stack([self.signal, rng.normal(size=200)])
+        self.assertGreater(bootstrap_scores(signal, [100], window=7, seed=1)[0], 0.99)
+
+    def test_seed_and_chunks(self):
+        cps = np.arange(10, 4990, 10)
+        scores = bootstrap_scores(self.noise, cps, window=7, n_resamples=100, seed=4)
+        np.testing.assert_array_equal(scores, bootstrap_scores(self.noise, cps, window=7, n_resamples=100, seed=4))
+
+        # chunks get their own seeds, scoring them in a process pool gives the same scores
+        with patch("mcp_conductor.detector.generic.bootstrap.MAX_CHUNK_VALUES", 100 * 14 * 100):
+            serial = bootstrap_scores(self.noise, cps, window=7, n_resamples=100, seed=4)
+            parallel = bootstrap_scores(self.noise, cps, window=7, n_resamples=100, seed=4, workers=2)
+        np.testing.assert_array_equal(serial, parallel)
+
+    def test_default_block_size(self):
+        self.assertEqual(default_block_size(7), 2)
+        self.assertEqual(default_block_size(30), 4)
+        self.assertEqual(default_block_size(0), 1)
+
+
+class TestExceedanceScores(unittest.TestCase):
+    def setUp(self) -> None:
+        rng = np.random.default_rng(0)
+        self.signal = rng.poisson(27, 60).astype(np.float64)
+        self.noise = rng.poisson(30, 5000).astype(np.float64)
+        return super().setUp()
+
+    def test_single_spike(self):
+        signal = self.signal.copy()
+        signal[30] = 60
+        self.assertGreater(exceedance_scores(signal, [30], window=7, seed=1)[0], 0.95)
+
+    def test_event_at_the_end_of_the_window(self):
+        # an ongoing dip has no after side, every day of it is scored against the days before
+        signal = self.signal.copy()
+        signal[-7:] = [9, 6, 4, 3, 3, 5, 4]
+        scores = exceedance_scores(signal, np.arange(53, 60), window=7, seed=1)
+        self.assertTrue((scores > 0.95).all())
+
+    def test_first_day(self):
+        # nothing precedes the first day, its baseline is the days after it
+        signal = self.signal.copy()
+        signal[0] = 60
+        self.assertGreater(exceedance_scores(signal, [0], window=7, seed=1)[0], 0.95)
+
+    def test_noise_scores_are_uniform(self):
+        scores = exceedance_scores(self.noise, np.arange(10, 4990, 10), window=7, n_resamples=200, seed=2)
+        self.assertAlmostEqual(scores.mean(), 0.5, delta=0.06)
+        self.assertLess((scores >= 0.95).mean(), 0.1)
+
+    def test_edges_and_missing_values(self):
+        signal = self.signal.copy()
+        signal[[10, 20]] = np.nan
+        scores = exceedance_scores(signal, [10, 30], window=7, seed=1)
+        self.assertEqual(scores[0], 0.0)
+        self.assertTrue(np.isfinite(scores).all())
+        # a day equal to a constant baseline, and a pipe without enough baseline days
+        self.assertEqual(exceedance_scores(np.array([5.0, 5, 5, 5, 9, 5]), [4, 2], window=7).tolist(), [1.0, 0.0])
+        self.assertEqual(exceedance_scores(signal, [], window=7).shape, (0,))
+
+    def test_most_of_the_window_flagged(self):
+        # an event covering (almost) the whole window leaves no baseline: unknown, not unconfident
+        signal = self.signal[:31].copy()
+        signal[2:] = 5
+        self.assertTrue(np.isnan(exceedance_scores(signal, np.arange(31), window=7, seed=1)).all())
+        self.assertTrue(np.isnan(exceedance_scores(signal, np.arange(2, 31), window=7, seed=1)).all())
+        # a few baseline days are enough
+        signal[:4] = [27, 29, 26, 30]
+        scores = exceedance_scores(signal, np.arange(4, 31), window=7, seed=1)
+        self.assertTrue((scores > 0.95).all())
+
+    def test_seed_and_chunks(self):
+        points = np.arange(10, 4990, 10)
+        with patch("mcp_conductor.detector.generic.bootstrap.MAX_CHUNK_VALUES", 100 * 8 * 100):
+            serial = exceedance_scores(self.noise, points, window=7, n_resamples=100, seed=4)
+            parallel = exceedance_scores(self.noise, points, window=7, n_resamples=100, seed=4, workers=2)
+        np.testing.assert_array_equal(serial, parallel)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -189,6 +189,258 @@ class TestChangePointDetector(unittest.TestCase):
         detector.set_params(non_existent_param=100)
         self.assertFalse(hasattr(detector, 'non_existent_param'))
 
+    def test_detect_sisi_thresholds(self):
+        """Test sisi detection flags values outside the alert band."""
+        detector = ChangePointDetector({'method': 'sisi', 'min_alert_cnt': 5, 'max_alert_cnt': 10})
+        result = detector.detect([4, 5, 7, 10, 11, 6, 2], pipe_name='曼德海峡')
+
+        self.assertEqual(result['status'], 'success')
+        self.assertEqual(result['change_points'], [0, 4, 6])
+        self.assertTrue(all(type(idx) is int for idx in result['change_points']))
+
+    def test_detect_sisi_skips_missing_values(self):
+        """Test sisi detection ignores None and NaN entries."""
+        detector = ChangePointDetector({'method': 'sisi'})
+
+        result = detector.detect([None, 50, float('nan'), 20, 1, None], pipe_name='曼德海峡')
+        self.assertEqual(result['change_points'], [1, 4])
+
+        signal = np.array([np.nan, 12.0, 30.0, np.nan, 42.0])
+        result = detector.detect(signal, pipe_name='曼德海峡')
+        self.assertEqual(result['change_points'], [1, 4])
+
+    def test_detect_many_matches_detect(self):
+        """Test batch detection gives the same results as one detect call per pipe."""
+        rng = np.random.default_rng(0)
+        signals = {f'pipe_{i}': rng.poisson(27, size=30 + i).astype(float) for i in range(5)}
+        configs = {name: {'min_alert_cnt': 18 + i, 'max_alert_cnt': 36} for i, name in enumerate(signals)}
+
+        detector = ChangePointDetector({'method': 'sisi'})
+        results = detector.detect_many(signals, configs=configs)
+
+        self.assertEqual(list(results), list(signals))
+        for name, signal in signals.items():
+            expected = ChangePointDetector({'method': 'sisi', **configs[name]}).detect(signal, pipe_name=name)
+            self.assertEqual(results[name], expected)
+
+    def test_detect_many_padded_array(self):
+        """Test batch detection on a padded 2-D array, padding is never flagged."""
+        signals = np.array([
+            [1, 20, 50, 0, 0],
+            [20, 20, 99, 0, 0],
+        ])
+        detector = ChangePointDetector({'method': 'sisi', 'min_alert_cnt': 13, 'max_alert_cnt': 41})
+        results = detector.detect_many(signals, lengths=[3, 3], pipe_names=['a', 'b'])
+
+        self.assertEqual(results['a']['change_points'], [0, 2])
+        self.assertEqual(results['b']['change_points'], [2])
+
+        with self.assertRaises(ValueError):
+            detector.detect_many(signals, pipe_names=['a'])
+
+    def test_detect_many_errors(self):
+        """Test a pipe without thresholds raises, or gets an error result when asked to."""
+        detector = ChangePointDetector({'method': 'sisi'})
+        signals = {'曼德海峡': [12, 20, 42], '未知海峡': [1, 2, 3]}
+
+        with self.assertRaises(ValueError):
+            detector.detect_many(signals)
+
+        results = detector.detect_many(signals, raise_errors=False)
+        self.assertEqual(results['曼德海峡']['change_points'], [0, 2])
+        self.assertEqual(results['未知海峡']['status'], 'error')
+
+    def test_detect_series_input(self):
+        """Test arrays and Series are read in place, nullable columns keep their missing values as NaN."""
+        import pandas as pd
+        from mcp_conductor.detector.generic.changepoints import _as_input_array
+
+        df = pd.DataFrame({'ship_cnt': [12, 20, 42, 30]})
+        arr = _as_input_array(df['ship_cnt'])
+        self.assertEqual(arr.dtype, np.int64)
+        self.assertTrue(np.shares_memory(arr, df['ship_cnt'].to_numpy()))
+        view = np.arange(10.0)[2:8]
+        self.assertIs(_as_input_array(view), view)
+
+        detector = ChangePointDetector({'method': 'sisi', 'min_alert_cnt': 13, 'max_alert_cnt': 41})
+        self.assertEqual(detector.detect(df['ship_cnt'])['change_points'], [0, 2])
+        nullable = pd.Series([12, None, 42, 30], dtype='Int64')
+        self.assertEqual(detector.detect(nullable)['change_points'], [0, 2])
+        results = detector.detect_many({'a': df['ship_cnt'], 'b': nullable, 'c': [20, 99, 30]})
+        self.assertEqual([result['change_points'] for result in results.values()], [[0, 2], [0, 2], [1]])
+
+        pelt = ChangePointDetector({'method': 'pelt', 'model': 'l2', 'penalty': 20})
+        signal = pd.Series(np.repeat([20.0, 40.0], 30))
+        self.assertEqual(pelt.detect(signal)['change_points'], [30])
+
+    def test_detect_bootstrap_scores(self):
+        """Test bootstrap_samples attaches a confidence score to every change point, batch detection included."""
+        rng = np.random.default_rng(0)
+        signal = np.concatenate([rng.poisson(25, 60), rng.poisson(45, 60)]).astype(float)
+        signal[20] = 60
+        config = {'method': 'sisi', 'min_alert_cnt': 0, 'max_alert_cnt': 55, 'width': 7}
+
+        self.assertNotIn('scores', ChangePointDetector(config).detect(signal, pipe_name='a'))
+        detector = ChangePointDetector({**config, 'bootstrap_samples': 300})
+        result = detector.detect(signal, pipe_name='a')
+        self.assertEqual(len(result['scores']), len(result['change_points']))
+        self.assertEqual(detector.detect_many({'a': signal})['a'], result)
+        # the out of band days are scored as point anomalies, the lone spike included
+        self.assertEqual(result['change_points'][0], 20)
+        self.assertGreater(result['scores'][0], 0.95)
+
+        pelt = ChangePointDetector({'method': 'pelt', 'penalty': 200, 'bootstrap_samples': 300})
+        result = pelt.detect(signal)
+        self.assertEqual(result['change_points'], [60])
+        self.assertGreater(result['scores'][0], 0.99)
+
+    def test_detect_multivariate(self):
+        """Test 2-D signals run on the multivariate methods and are refused by the univariate ones."""
+        rng = np.random.default_rng(0)
+        # ship cnt and an indicator on another scale, both shifting at 40
+        signal = np.column_stack([
+            np.concatenate([rng.poisson(25, 40), rng.poisson(40, 40)]),
+            np.concatenate([rng.normal(1500, 20, 40), rng.normal(1400, 20, 40)]),
+        ])
+        for method in ('pelt', 'fast_pelt'):
+            for model in ('l2', 'normal'):
+                detector = ChangePointDetector({'method': method, 'model': model, 'penalty': 20})
+                self.assertEqual(detector.detect(signal)['change_points'], [40], (method, model))
+        self.assertEqual(
+            ChangePointDetector({'method': 'fast_binseg', 'n_bkps': 1}).detect(signal.tolist())['change_points'], [40]
+        )
+
+        # without scaling the indicator's unit dominates the l2 cost
+        unscaled = ChangePointDetector({'method': 'fast_pelt', 'penalty': 20, 'standardize': False})
+        self.assertNotEqual(unscaled.detect(signal)['change_points'], [40])
+
+        result = ChangePointDetector({'method': 'sisi'}).detect(signal, pipe_name='曼德海峡')
+        self.assertEqual(result['status'], 'error')
+        results = ChangePointDetector({'method': 'sisi'}).detect_many(
+            {'曼德海峡': signal, '马六甲海峡': [1, 2, 3]},
+            configs={'马六甲海峡': {'min_alert_cnt': 2, 'max_alert_cnt': 2}},
+        )
+        self.assertEqual(results['曼德海峡']['status'], 'error')
+        self.assertEqual(results['马六甲海峡']['change_points'], [0, 2])
+
+        with self.assertRaises(ValueError):
+            ChangePointDetector({'method': 'pelt'}).detect(np.where(signal > 1490, np.nan, signal))
+
+    def test_detect_coarse_to_fine(self):
+        """Test long signals are segmented on an aggregated series and refined to the daily breakpoints."""
+        rng = np.random.default_rng(0)
+        bkps = [400, 1111, 2000]
+        sizes = np.diff([0, *bkps, 3000])
+        signal = np.concatenate([rng.poisson(lam, size) for lam, size in zip((27, 40, 20, 33), sizes)])
+
+        for method in ('binseg', 'bottomup', 'bic', 'fast_binseg'):
+            detector = ChangePointDetector({'method': method, 'n_bkps': 3, 'max_points': 730})
+            result = detector.detect(signal)['change_points']
+            self.assertEqual(len(result), 3, method)
+            np.testing.assert_allclose(result, bkps, atol=2, err_msg=method)
+            # the coarse pass has as many candidates as a max_points long daily signal (jump 5)
+            (factor, coarse), = detector._coarse_detectors.items()
+            self.assertEqual(factor, 21)
+            self.assertLessEqual(coarse.algo.n_samples, 730 / 5)
+
+        # short signals run at full resolution
+        detector = ChangePointDetector({'method': 'binseg', 'n_bkps': 3, 'max_points': 730})
+        detector.detect(signal[:700])
+        self.assertEqual(detector._coarse_detectors, {})
+
+    def test_coarse_to_fine_matches_exact_path(self):
+        """Test the coarse-to-fine mode is opt-in, l2 only, and close to the exact segmentation."""
+        rng = np.random.default_rng(0)
+        sizes = np.diff([0, 400, 1111, 2000, 3000])
+        signal = np.concatenate([rng.poisson(lam, size) for lam, size in zip((27, 40, 20, 33), sizes)])
+
+        for method in ('pelt', 'fast_pelt', 'binseg', 'bottomup'):
+            config = {'method': method, 'penalty': 500, 'n_bkps': 3}
+            detector = ChangePointDetector(config)
+            exact = detector.detect(signal)['change_points']
+            # the default runs the exact path
+            self.assertEqual(detector._coarse_detectors, {}, method)
+            self.assertEqual(len(exact), 3, method)
+
+            coarse = ChangePointDetector({**config, 'max_points': 730}).detect(signal)['change_points']
+            self.assertEqual(len(coarse), len(exact), method)
+            np.testing.assert_allclose(coarse, exact, atol=2, err_msg=method)
+
+        # the block scaling doesn't keep the penalties of the other cost models, they stay exact
+        config = {'method': 'binseg', 'model': 'normal', 'n_bkps': 3}
+        detector = ChangePointDetector({**config, 'max_points': 730})
+        self.assertEqual(detector.detect(signal)['change_points'], ChangePointDetector(config).detect(signal)['change_points'])
+        self.assertEqual(detector._coarse_detectors, {})
+
+    def test_fitted_model_reuse(self):
+        """Test sweeping n_bkps on one signal fits once and matches fresh detectors."""
+        detector = ChangePointDetector({'method': 'binseg'})
+        results = []
+        for n_bkps in range(1, 4):
+            detector.set_params(n_bkps=n_bkps)
+            results.append(detector.detect(self.complex_series)['change_points'])
+        self.assertEqual(len(detector._fit_cache), 1)
+
+        for n_bkps, result in zip(range(1, 4), results):
+            fresh = ChangePointDetector({'method': 'binseg', 'n_bkps': n_bkps})
+            self.assertEqual(result, fresh.detect(self.complex_series)['change_points'])
+
+        # another signal or model is fitted separately, the LRU stays bounded
+        detector.set_params(fit_cache_size=2)
+        detector.detect(self.simple_series)
+        detector.set_model('l1')
+        detector.detect(self.simple_series)
+        self.assertEqual(len(detector._fit_cache), 2)
+
+    def test_penalty_path(self):
+        """Test the CROPS penalty path covers the range and matches PELT at each penalty."""
+        detector = ChangePointDetector({'method': 'pelt'})
+        path = detector.penalty_path(self.complex_series, 0.5, 500)
+
+        self.assertEqual(path[0]['pen_min'], 0.5)
+        self.assertEqual(path[-1]['pen_max'], 500)
+        for row, next_row in zip(path, path[1:]):
+            self.assertAlmostEqual(row['pen_max'], next_row['pen_min'])
+            self.assertGreater(row['n_bkps'], next_row['n_bkps'])
+
+        for row in path:
+            pen = (row['pen_min'] + row['pen_max']) / 2
+            expected = ChangePointDetector({'method': 'pelt', 'penalty': pen}).detect(self.complex_series)
+            self.assertEqual(row['change_points'], expected['change_points'])
+            self.assertEqual(row['n_bkps'], len(row['change_points']))
+
+        with self.assertRaises(ValueError):
+            detector.penalty_path(self.complex_series, 0, 10)
+
+    def test_penalty_path_matches_inexact_pelt(self):
+        """Test the path reports what PELT returns even where PELT misses the optimal segmentation."""
+        # with jump 1 ruptures' PELT returns a segmentation off the CROPS hull for some penalties of this series
+        series = np.random.default_rng(1).poisson(25, 80).astype(np.float64)
+        config = {'method': 'pelt', 'jump': 1, 'min_size': 2}
+        path = ChangePointDetector(config).penalty_path(series, 0.5, 500)
+        self.assertEqual(path[0]['pen_min'], 0.5)
+        self.assertEqual(path[-1]['pen_max'], 500)
+        for row in path:
+            pen = (row['pen_min'] + row['pen_max']) / 2
+            expected = ChangePointDetector({**config, 'penalty': pen}).detect(series)
+            self.assertEqual(row['change_points'], expected['change_points'])
+
+    @patch('ruptures.Binseg')
+    def test_fit_called_once_per_signal(self, mock_binseg):
+        """Test repeat predictions on the same signal don't refit."""
+        mock_algo = MagicMock()
+        mock_binseg.return_value = mock_algo
+        mock_algo.predict.return_value = [5]
+
+        detector = ChangePointDetector({'method': 'binseg'})
+        for n_bkps in (1, 2, 3):
+            detector.set_params(n_bkps=n_bkps)
+            detector.detect(self.complex_series)
+
+        mock_binseg.assert_called_once()
+        mock_algo.fit.assert_called_once()
+        self.assertEqual(mock_algo.predict.call_count, 3)
+
     @patch('ruptures.Dynp')
     def test_bic_algorithm_calls(self, mock_dynp):
         """Test that BIC algorithm is called correctly."""
@@ -202,7 +454,7 @@ class TestChangePointDetector(unittest.TestCase):
         result = detector.detect(self.complex_series)
         
         # Check the algorithm was created with correct parameters
-        mock_dynp.assert_called_once_with(model='l2', min_size=2)
+        mock_dynp.assert_called_once_with(model='l2', min_size=2, jump=5)
         
         # Check fit was called with signal
         mock_algo.fit.assert_called_once()
@@ -227,7 +479,7 @@ class TestChangePointDetector(unittest.TestCase):
         result = detector.detect(self.complex_series)
         
         # Check the algorithm was created with correct parameters
-        mock_pelt.assert_called_once_with(model='l2', min_size=3)
+        mock_pelt.assert_called_once_with(model='l2', min_size=3, jump=5)
         
         # Check predict was called with penalty
         mock_algo.predict.assert_called_once_with(pen=4)
@@ -0,0 +1,84 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from mcp_conductor.detector.generic.changepoints import ChangePointDetector
+from mcp_conductor.detector.generic.online import OnlineChangePointDetector
+
+
+class TestOnlineChangePointDetector(unittest.TestCase):
+    """Unit tests for the OnlineChangePointDetector class."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        rng = np.random.default_rng(0)
+        # level shifts at 200 and 300
+        self.series = np.concatenate([
+            rng.poisson(27, 200), rng.poisson(45, 100), rng.poisson(20, 150)
+        ]).astype(float)
+
+    def test_detect_level_shifts(self):
+        """Test both level shifts are found close to where they happen."""
+        result = OnlineChangePointDetector().detect(self.series)
+
+        self.assertEqual(result['status'], 'success')
+        self.assertEqual(result['method'], 'bocpd')
+        for expected in (200, 300):
+            self.assertTrue(any(abs(cp - expected) <= 5 for cp in result['change_points']))
+
+    def test_checkpoint_resume(self):
+        """Test a detector restored from a checkpoint continues exactly like an uninterrupted one."""
+        full = OnlineChangePointDetector()
+        for i, val in enumerate(self.series):
+            full.update('pipe', val, 20200000 + i)
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, 'pipe.npz')
+            first = OnlineChangePointDetector()
+            self.assertFalse(first.load_state('pipe', path))
+            for i, val in enumerate(self.series[:250]):
+                first.update('pipe', val, 20200000 + i)
+            first.save_state('pipe', path)
+
+            resumed = OnlineChangePointDetector()
+            self.assertTrue(resumed.load_state('pipe', path))
+            self.assertEqual(resumed.states['pipe'].last_date_id, 20200249)
+            for i, val in enumerate(self.series[250:], start=250):
+                resumed.update('pipe', val, 20200000 + i)
+
+        np.testing.assert_array_equal(resumed.states['pipe'].change_points, full.states['pipe'].change_points)
+        np.testing.assert_array_equal(resumed.states['pipe'].change_date_ids, full.states['pipe'].change_date_ids)
+        np.testing.assert_allclose(resumed.states['pipe'].log_probs, full.states['pipe'].log_probs)
+
+    def test_bounded_state(self):
+        """Test the run-length state never grows past max_run_length."""
+        detector = OnlineChangePointDetector({'max_run_length': 50})
+        for val in self.series:
+            detector.update('pipe', val)
+        self.assertLessEqual(detector.states['pipe'].log_probs.shape[0], 50)
+
+    def test_missing_values(self):
+        """Test missing values advance the position without changing the posterior."""
+        detector = OnlineChangePointDetector()
+        for val in self.series[:10]:
+            detector.update('pipe', val)
+        log_probs = detector.states['pipe'].log_probs.copy()
+
+        detector.update('pipe', None)
+        detector.update('pipe', float('nan'))
+        np.testing.assert_array_equal(detector.states['pipe'].log_probs, log_probs)
+        self.assertEqual(detector.states['pipe'].n_obs, 12)
+
+    def test_changepoint_detector_bocpd_method(self):
+        """Test the bocpd method of ChangePointDetector replays the online detector."""
+        detector = ChangePointDetector({'method': 'bocpd'})
+        result = detector.detect(self.series.tolist())
+
+        self.assertEqual(result['status'], 'success')
+        self.assertEqual(result['change_points'], OnlineChangePointDetector().detect(self.series)['change_points'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+import subprocess
+import sys
+import unittest
+from importlib.metadata import EntryPoint
+from unittest.mock import patch
+
+import numpy as np
+
+from mcp_conductor.detector.generic import registry
+from mcp_conductor.detector.generic.changepoints import ChangePointDetector
+from mcp_conductor.detector.generic.registry import (
+    available_methods,
+    get_method,
+    register_method,
+    supports_multivariate,
+)
+
+
+def detect_above_ten(detector, signal, pipe_name, date_ids):
+    """Plugin method used by the entry point test."""
+    return np.flatnonzero(np.asarray(signal) > 10).tolist()
+
+
+class TestRegistry(unittest.TestCase):
+    """Unit tests for the detection method registry."""
+
+    def setUp(self):
+        self.methods = patch.dict(registry._METHODS)
+        self.lazy_methods = patch.dict(registry._LAZY_METHODS)
+        self.multivariate_methods = patch.object(
+            registry, '_MULTIVARIATE_METHODS', set(registry._MULTIVARIATE_METHODS)
+        )
+        self.methods.start()
+        self.lazy_methods.start()
+        self.multivariate_methods.start()
+
+    def tearDown(self):
+        self.methods.stop()
+        self.lazy_methods.stop()
+        self.multivariate_methods.stop()
+        registry._entry_points_loaded = False
+
+    def test_builtin_methods(self):
+        """Test every built-in method is registered and set_method accepts sisi."""
+        for method in ('sisi', 'bic', 'pelt', 'binseg', 'bottomup', 'window', 'bocpd', 'seasonal'):
+            self.assertIn(method, available_methods())
+        detector = ChangePointDetector({'method': 'pelt'})
+        detector.set_method('sisi')
+        self.assertEqual(detector.method, 'sisi')
+        with self.assertRaises(ValueError):
+            detector.set_method('unknown')
+
+    def test_register_method_decorator(self):
+        """Test a method registered in-process is dispatched by detect."""
+        @register_method('first_point')
+        def detect_first_point(detector, signal, pipe_name, date_ids):
+            return [0]
+
+        result = ChangePointDetector({'method': 'first_point'}).detect([1, 2, 3, 4])
+        self.assertEqual(result['change_points'], [0])
+        self.assertEqual(result['method'], 'first_point')
+
+    def test_multivariate_methods(self):
+        """Test only methods registered as multivariate receive 2-D signals."""
+        self.assertTrue(supports_multivariate('fast_pelt'))
+        self.assertFalse(supports_multivariate('sisi'))
+
+        @register_method('column_sums', multivariate=True)
+        def detect_column_sums(detector, signal, pipe_name, date_ids):
+            return np.flatnonzero(np.asarray(signal).sum(axis=1) > 0).tolist()
+
+        register_method('first_column', lambda detector, signal, pipe_name, date_ids: [0])
+        signal = np.array([[1, 5], [2, 4], [3, 3], [4, 2]])
+        result = ChangePointDetector({'method': 'column_sums', 'standardize': False}).detect(signal)
+        self.assertEqual(result['change_points'], [0, 1, 2, 3])
+        self.assertEqual(ChangePointDetector({'method': 'first_column'}).detect(signal)['status'], 'error')
+
+    def test_entry_point_methods(self):
+        """Test third-party methods are found through the entry point group and imported on first use."""
+        entry_point = EntryPoint(
+            name='above_ten', value=f'{__name__}:detect_above_ten', group=registry.ENTRY_POINT_GROUP
+        )
+        registry._entry_points_loaded = False
+        with patch.object(registry, 'entry_points', return_value=[entry_point]) as mock_entry_points:
+            self.assertIn('above_ten', available_methods())
+            self.assertNotIn('above_ten', registry._METHODS)
+            result = ChangePointDetector({'method': 'above_ten'}).detect([1, 20, 3, 40])
+            self.assertEqual(result['change_points'], [1, 3])
+            self.assertIs(get_method('above_ten'), detect_above_ten)
+        mock_entry_points.assert_called_once_with(group=registry.ENTRY_POINT_GROUP)
+
+        with self.assertRaises(KeyError):
+            get_method('not_installed')
+
+    def test_ruptures_imported_on_first_use(self):
+        """Test the threshold method doesn't import ruptures, nor the storage (sqlalchemy)."""
+        code = (
+            "import sys\n"
+            "from mcp_conductor.detector.generic.changepoints import ChangePointDetector\n"
+            "ChangePointDetector({'method': 'sisi', 'min_alert_cnt': 1, 'max_alert_cnt': 5}).detect([1, 9, 3])\n"
+            "assert 'ruptures' not in sys.modules\n"
+            "assert 'sqlalchemy' not in sys.modules\n"
+            "ChangePointDetector({'method': 'pelt'}).detect([1, 1, 1, 9, 9, 9])\n"
+            "assert 'ruptures' in sys.modules\n"
+        )
+        subprocess.run([sys.executable, '-c', code], check=True)
+
+
+if __name__ == '__main__':
+    unittest.main()
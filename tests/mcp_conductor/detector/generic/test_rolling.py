@@ -0,0 +1,59 @@
+import unittest
+
+import numpy as np
+
+from mcp_conductor.detector.generic.changepoints import ChangePointDetector
+from mcp_conductor.detector.generic.rolling import rolling_mad, rolling_zscore
+
+
+def _brute_force(signal, width, min_periods, robust):
+    """Score every window from scratch."""
+    scores = np.full(len(signal), np.nan)
+    for i in range(len(signal)):
+        window = signal[max(0, i - width):i]
+        window = window[~np.isnan(window)]
+        if np.isnan(signal[i]) or len(window) < min_periods:
+            continue
+        if robust:
+            center = np.median(window)
+            scale = np.median(np.abs(window - center))
+            deviation = 0.6745 * (signal[i] - center)
+        else:
+            center, scale = window.mean(), window.std(ddof=1)
+            deviation = signal[i] - center
+        scores[i] = deviation / scale if scale > 0 else (0.0 if deviation == 0 else np.sign(deviation) * np.inf)
+    return scores
+
+
+class TestRolling(unittest.TestCase):
+    """Unit tests for the rolling anomaly scores."""
+
+    def test_scores_match_brute_force(self):
+        """Test the streaming scores equal per window recomputation, missing values included."""
+        rng = np.random.default_rng(0)
+        for _ in range(50):
+            signal = rng.poisson(rng.integers(1, 30), rng.integers(1, 120)).astype(float)
+            signal[rng.random(signal.shape[0]) < 0.1] = np.nan
+            width = int(rng.integers(1, 20))
+            np.testing.assert_allclose(rolling_mad(signal, width, 3), _brute_force(signal, width, 3, True), atol=1e-9)
+            np.testing.assert_allclose(
+                rolling_zscore(signal, width, 3), _brute_force(signal, width, 3, False), atol=1e-9
+            )
+
+    def test_detect_rolling_methods(self):
+        """Test the rolling methods flag spikes and skip missing values."""
+        signal = [20.0, 21, 19, 20, 22, 20, 60, 21, 19, None, 20, 0, 21]
+        for method in ('rolling_mad', 'rolling_zscore'):
+            detector = ChangePointDetector({'method': method, 'width': 5})
+            result = detector.detect(signal)
+            self.assertEqual(result['status'], 'success')
+            self.assertEqual(result['change_points'], [6, 11] if method == 'rolling_mad' else [6])
+
+        # the spike inflates the std of the windows after it, lower thresholds flag smaller deviations
+        detector = ChangePointDetector({'method': 'rolling_zscore', 'width': 5, 'z_threshold': 2})
+        self.assertEqual(detector.detect(signal)['change_points'], [4, 6])
+        self.assertEqual(ChangePointDetector({'method': 'rolling_mad'}).detect([5] * 50)['change_points'], [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+import unittest
+
+import numpy as np
+import ruptures as rpt
+
+from mcp_conductor.detector.generic import segmentation
+from mcp_conductor.detector.generic.changepoints import ChangePointDetector
+
+
+class TestSegmentation(unittest.TestCase):
+    """Unit tests for the prefix sum segmentation engine."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        rng = np.random.default_rng(0)
+        self.series = [
+            np.array([1, 1, 2, 10, 11, 10, 2, 1, 1] * 3, dtype=float),
+            np.array([1, 1, 1, 2, 2, 2, 10, 10, 11, 12, 10, 9, 20, 21, 22, 20, 20, 19, 5, 6, 5, 4, 5], dtype=float),
+            np.concatenate([rng.poisson(lam, 60) for lam in (27, 40, 20, 33)]).astype(float),
+            rng.normal(0, 1, 200),
+        ]
+
+    def test_pelt_matches_ruptures(self):
+        """Test PELT returns the ruptures breakpoints, integer ties included."""
+        for signal in self.series:
+            for model in ('l2', 'normal'):
+                for min_size in (1, 2, 3):
+                    for pen in (1, 3, 10, 50):
+                        expected = rpt.Pelt(model=model, min_size=min_size).fit(signal).predict(pen=pen)
+                        result = segmentation.Pelt(model=model, min_size=min_size).fit(signal).predict(pen)
+                        self.assertEqual(result, expected, (model, min_size, pen))
+
+    def test_binseg_matches_ruptures(self):
+        """Test binary segmentation returns the ruptures breakpoints for n_bkps and penalties."""
+        for signal in self.series:
+            for model in ('l2', 'normal'):
+                for min_size in (2, 3):
+                    expected_algo = rpt.Binseg(model=model, min_size=min_size, jump=1).fit(signal)
+                    algo = segmentation.Binseg(model=model, min_size=min_size, jump=1).fit(signal)
+                    for n_bkps in (1, 2, 3):
+                        self.assertEqual(algo.predict(n_bkps=n_bkps), expected_algo.predict(n_bkps=n_bkps))
+                    for pen in (3, 30):
+                        self.assertEqual(algo.predict(pen=pen), expected_algo.predict(pen=pen))
+
+    def test_multivariate_matches_ruptures(self):
+        """Test the multivariate l2 / normal (full covariance) costs return the ruptures breakpoints."""
+        rng = np.random.default_rng(1)
+        signal = rng.normal(0, 1, (150, 3))
+        signal[50:100] += [2.0, 0.0, -1.0]
+        signal[100:, 1] *= 4
+        for model in ('l2', 'normal'):
+            for pen in (3, 20):
+                expected = rpt.Pelt(model=model, min_size=3).fit(signal).predict(pen=pen)
+                self.assertEqual(segmentation.Pelt(model=model, min_size=3).fit(signal).predict(pen), expected)
+            expected = rpt.Binseg(model=model, min_size=3).fit(signal).predict(n_bkps=2)
+            self.assertEqual(segmentation.Binseg(model=model, min_size=3).fit(signal).predict(n_bkps=2), expected)
+            bkps = [50, 100, 150]
+            self.assertAlmostEqual(
+                segmentation.PrefixSumCost(model).fit(signal).sum_of_costs(bkps),
+                rpt.costs.cost_factory(model).fit(signal).sum_of_costs(bkps),
+            )
+
+    def test_sum_of_costs(self):
+        """Test the prefix sum cost equals the ruptures cost."""
+        signal = self.series[2]
+        for model in ('l2', 'normal'):
+            bkps = [60, 120, 180, 240]
+            expected = rpt.costs.cost_factory(model).fit(signal).sum_of_costs(bkps)
+            self.assertAlmostEqual(segmentation.PrefixSumCost(model).fit(signal).sum_of_costs(bkps), expected)
+
+    def test_invalid_parameters(self):
+        """Test unsupported models and impossible segmentations raise ValueError."""
+        with self.assertRaises(ValueError):
+            segmentation.Pelt(model='l1')
+        with self.assertRaises(ValueError):
+            segmentation.Binseg().fit(self.series[0]).predict()
+        with self.assertRaises(ValueError):
+            segmentation.Binseg(min_size=5).fit(self.series[0]).predict(n_bkps=10)
+
+    def test_detector_fast_methods(self):
+        """Test fast_pelt / fast_binseg give the same change points as pelt / binseg."""
+        for signal in self.series:
+            for method in ('pelt', 'binseg'):
+                config = {'method': method, 'min_size': 2, 'penalty': 5, 'n_bkps': 3}
+                expected = ChangePointDetector(config).detect(signal)
+                result = ChangePointDetector({**config, 'method': f'fast_{method}'}).detect(signal)
+                self.assertEqual(result['status'], 'success')
+                self.assertEqual(result['change_points'], expected['change_points'])
+
+
+if __name__ == '__main__':
+    unittest.main()
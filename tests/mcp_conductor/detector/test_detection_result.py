@@ -0,0 +1,77 @@
+import json
+import pickle
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from mcp_conductor.detector.detection_result import DetectionResult
+
+
+class TestDetectionResult(unittest.TestCase):
+    def setUp(self) -> None:
+        self.date_ids = np.arange(20231201, 20231211, dtype=np.int64)
+        self.ship_cnts = np.array([20, 21, 5, 22, 23, 60, 24, 25, 26, 27], dtype=np.float64)
+        self.result = DetectionResult.from_change_points(
+            "曼德海峡", self.date_ids, self.ship_cnts, [2, 5], "sisi", 20231201, 20231210
+        )
+        return super().setUp()
+
+    def test_from_change_points(self):
+        self.assertEqual(len(self.result), 2)
+        self.assertEqual(self.result.last_date_id, 20231206)
+        self.assertEqual(self.result.date_ids.tolist(), [20231203, 20231206])
+        # the gathered arrays don't keep the window alive
+        self.assertFalse(np.shares_memory(self.result.date_ids, self.date_ids))
+
+        empty = DetectionResult.from_change_points("曼德海峡", self.date_ids, self.ship_cnts, [])
+        self.assertEqual(len(empty), 0)
+        self.assertIsNone(empty.last_date_id)
+        with self.assertRaises(AttributeError):
+            empty.extra = 1
+
+    def test_to_frame(self):
+        df = pd.DataFrame({"pipe_name": "曼德海峡", "date_id": self.date_ids, "ship_cnt": self.ship_cnts})
+        pd.testing.assert_frame_equal(self.result.to_frame(), df.iloc[[2, 5]])
+
+        anomalies = df.iloc[[2, 5]].reset_index(drop=True)
+        materialized = DetectionResult.from_frame("曼德海峡", anomalies, "sisi")
+        self.assertIsNone(materialized.index)
+        pd.testing.assert_frame_equal(materialized.to_frame(), anomalies)
+
+    def test_confident(self):
+        self.assertIs(self.result.confident(0.95), self.result)
+
+        scored = DetectionResult.from_change_points(
+            "曼德海峡", self.date_ids, self.ship_cnts, [2, 5], "sisi", scores=[0.4, 0.99]
+        )
+        confident = scored.confident(0.95)
+        self.assertEqual(confident.date_ids.tolist(), [20231206])
+        self.assertEqual(confident.index.tolist(), [5])
+        self.assertEqual(confident.to_frame()["score"].tolist(), [0.99])
+        self.assertEqual(len(scored.confident(1.0)), 0)
+
+        # days without a baseline to score them against are kept
+        unknown = DetectionResult.from_change_points(
+            "曼德海峡", self.date_ids, self.ship_cnts, [2, 5], "sisi", scores=[np.nan, 0.4]
+        )
+        self.assertEqual(unknown.confident(0.95).date_ids.tolist(), [20231203])
+        self.assertEqual(json.loads(json.dumps(unknown.to_dict()))["scores"], [None, 0.4])
+        restored = DetectionResult.from_dict(json.loads(json.dumps(unknown.to_dict())))
+        np.testing.assert_array_equal(restored.scores, unknown.scores)
+
+    def test_serialization(self):
+        restored = pickle.loads(pickle.dumps(self.result, protocol=pickle.HIGHEST_PROTOCOL))
+        self.assertEqual(restored.to_dict(), self.result.to_dict())
+
+        payload = json.loads(json.dumps(self.result.to_dict()))
+        self.assertEqual(payload["index"], [2, 5])
+        self.assertEqual(payload["ship_cnts"], [5.0, 60.0])
+        self.assertEqual(payload["end_date_id"], 20231210)
+        restored = DetectionResult.from_dict(payload)
+        self.assertEqual(restored.to_dict(), self.result.to_dict())
+        pd.testing.assert_frame_equal(restored.to_frame(), self.result.to_frame())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,121 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+
+from mcp_conductor.detector.detection_result import DetectionResult
+from mcp_conductor.detector.result_cache import RESULT_CACHE_TABLE, DetectionResultCache, config_hash
+from mcp_conductor.storage.engine import dispose_engines
+
+
+class TestDetectionResultCache(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.config = {'method': 'sisi', 'penalty': 2, 'width': 7}
+        self.result = {"曼德海峡": DetectionResult.from_frame(
+            "曼德海峡", pd.DataFrame({"date_id": [20231215], "ship_cnt": [43]}), "sisi", 20231201, 20231231
+        )}
+        return super().setUp()
+
+    def tearDown(self) -> None:
+        dispose_engines()
+        self.tmp_dir.cleanup()
+        return super().tearDown()
+
+    def test_config_hash(self):
+        self.assertEqual(config_hash(self.config), config_hash({'width': 7, 'penalty': 2, 'method': 'sisi'}))
+        self.assertNotEqual(config_hash(self.config), config_hash({**self.config, 'penalty': 3}))
+
+    def test_lru_eviction(self):
+        cache = DetectionResultCache(max_entries=2, ttl=60, db_path="")
+        keys = [cache.make_key("曼德海峡", 20231101 + i, 20231231, self.config, "1:20231231") for i in range(3)]
+        for key in keys:
+            cache.put(key, self.result)
+        self.assertIsNone(cache.get(keys[0]))
+        self.assertIs(cache.get(keys[2]), self.result)
+
+    def test_ttl_expiry(self):
+        cache = DetectionResultCache(max_entries=2, ttl=-1, db_path="")
+        key = cache.make_key("曼德海峡", 20231201, 20231231, self.config, "1:20231231")
+        cache.put(key, self.result)
+        self.assertIsNone(cache.get(key))
+
+    def test_new_data_version_drops_stale_results(self):
+        cache = DetectionResultCache(max_entries=10, ttl=60, db_path="")
+        old_key = cache.make_key("曼德海峡", 20231201, 20231231, self.config, "31:20231231")
+        other_pipe_key = cache.make_key("马六甲海峡", 20231201, 20231231, self.config, "31:20231231")
+        cache.put(old_key, self.result)
+        cache.put(other_pipe_key, self.result)
+
+        new_key = cache.make_key("曼德海峡", 20231201, 20231231, self.config, "32:20240101")
+        self.assertIsNone(cache.get(new_key))
+        cache.put(new_key, self.result)
+        self.assertEqual(cache.stats()["entries"], 2)
+        self.assertIsNotNone(cache.get(other_pipe_key))
+
+    def test_configs_of_one_pipe_dont_evict_each_other(self):
+        db_path = os.path.join(self.tmp_dir.name, "result_cache.sqlite")
+        cache = DetectionResultCache(max_entries=10, ttl=60, db_path=db_path)
+        sisi_key = cache.make_key("曼德海峡", 20231201, 20231231, self.config, "31:20231231", "thresholds:10,50")
+        pelt_key = cache.make_key("曼德海峡", 20231201, 20231231, {'method': 'pelt'}, "31:20231231")
+        cache.put(sisi_key, self.result)
+        cache.put(pelt_key, self.result)
+
+        self.assertIsNotNone(cache.get(sisi_key))
+        self.assertIsNotNone(DetectionResultCache(max_entries=10, ttl=60, db_path=db_path).get(sisi_key))
+        # recomputed thresholds miss, without evicting the results of the pipe's series version
+        new_state_key = cache.make_key("曼德海峡", 20231201, 20231231, self.config, "31:20231231", "thresholds:12,48")
+        self.assertIsNone(cache.get(new_state_key))
+        cache.put(new_state_key, self.result)
+        self.assertIsNotNone(cache.get(pelt_key))
+
+    def test_persistent_tier(self):
+        db_path = os.path.join(self.tmp_dir.name, "result_cache.sqlite")
+        key = DetectionResultCache.make_key("曼德海峡", 20231201, 20231231, self.config, "31:20231231")
+        DetectionResultCache(max_entries=10, ttl=60, db_path=db_path).put(key, self.result)
+
+        # a fresh process only has the sqlite tier
+        cache = DetectionResultCache(max_entries=10, ttl=60, db_path=db_path)
+        pd.testing.assert_frame_equal(cache.get(key)["曼德海峡"].to_frame(), self.result["曼德海峡"].to_frame())
+
+        cache.invalidate("曼德海峡")
+        self.assertIsNone(DetectionResultCache(max_entries=10, ttl=60, db_path=db_path).get(key))
+
+    def test_persistent_tier_stores_json(self):
+        db_path = os.path.join(self.tmp_dir.name, "result_cache.sqlite")
+        key = DetectionResultCache.make_key("曼德海峡", 20231201, 20231231, self.config, "31:20231231")
+        cache = DetectionResultCache(max_entries=10, ttl=60, db_path=db_path)
+        cache.put(key, self.result)
+        with cache.engine.connect() as conn:
+            payload = conn.execute(text(f"SELECT payload FROM {RESULT_CACHE_TABLE}")).scalar_one()
+        self.assertEqual(json.loads(payload)["曼德海峡"]["date_ids"], [20231215])
+
+        # anything else only lives in the memory tier
+        frame_key = DetectionResultCache.make_key("曼德海峡", 20231101, 20231130, self.config, "31:20231231")
+        frame_result = {"曼德海峡": self.result["曼德海峡"].to_frame()}
+        cache.put(frame_key, frame_result)
+        self.assertIs(cache.get(frame_key), frame_result)
+        self.assertIsNone(DetectionResultCache(max_entries=10, ttl=60, db_path=db_path).get(frame_key))
+
+    def test_persistent_tier_schema_version(self):
+        db_path = os.path.join(self.tmp_dir.name, "result_cache.sqlite")
+        key = DetectionResultCache.make_key("曼德海峡", 20231201, 20231231, self.config, "31:20231231")
+        result = {"曼德海峡": DetectionResult.from_change_points(
+            "曼德海峡", np.arange(20231201, 20231232), np.arange(31.0), [14], "sisi", 20231201, 20231231, [0.99]
+        )}
+        DetectionResultCache(max_entries=10, ttl=60, db_path=db_path).put(key, result)
+        restored = DetectionResultCache(max_entries=10, ttl=60, db_path=db_path).get(key)
+        self.assertEqual(restored["曼德海峡"].to_dict(), result["曼德海峡"].to_dict())
+
+        # results stored with another DetectionResult layout are never read back
+        with patch("mcp_conductor.detector.result_cache.RESULT_CACHE_TABLE", "detection_result_cache_v999"):
+            self.assertIsNone(DetectionResultCache(max_entries=10, ttl=60, db_path=db_path).get(key))
+
+
+if __name__ == '__main__':
+    unittest.main()
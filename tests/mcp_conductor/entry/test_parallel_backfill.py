@@ -0,0 +1,63 @@
+import os
+import tempfile
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+from unittest.mock import patch
+
+import pandas as pd
+
+from mcp_conductor.detector.pipe_detect_engine import SCORED_DETECTOR_CONFIG
+from mcp_conductor.entry.main_parallel_backfill import parallel_backfill
+from mcp_conductor.storage.engine import get_engine, dispose_engines
+
+
+class TestParallelBackfill(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.engine = get_engine(f"sqlite:///{os.path.join(self.tmp_dir.name, 'sisi.sqlite')}")
+        date_ids = [int(d.strftime("%Y%m%d")) for d in pd.date_range("2023-10-01", "2023-12-31")]
+        ship_cnts = [50 if date_id in (20231015, 20231115, 20231210) else 20 for date_id in date_ids]
+        pd.DataFrame({
+            "pipe_name": "曼德海峡", "date_id": date_ids, "ship_cnt": ship_cnts
+        }).to_sql("ship_cnt_in_pipe", self.engine, index=False)
+        pd.DataFrame({
+            "pipe_name": "未知海峡", "date_id": date_ids, "ship_cnt": 10
+        }).to_sql("ship_cnt_in_pipe", self.engine, index=False, if_exists="append")
+        return super().setUp()
+
+    def tearDown(self) -> None:
+        dispose_engines()
+        self.tmp_dir.cleanup()
+        return super().tearDown()
+
+    def test_windows_per_run_date(self):
+        result = parallel_backfill("2023-11-20", "2023-12-16", workers=1, chunk_size=7, engine=self.engine)
+
+        # pipes without thresholds are skipped
+        self.assertEqual(result["pipe_name"].unique().tolist(), ["曼德海峡"])
+        self.assertEqual(result["run_date_id"].nunique(), 27)
+        # one month window ending on each run date
+        by_run_date = result.groupby("run_date_id")["date_id"].apply(list)
+        self.assertEqual(by_run_date[20231120], [20231115])
+        self.assertEqual(by_run_date[20231210], [20231115, 20231210])
+        self.assertEqual(by_run_date[20231216], [20231210])
+
+    def test_process_pool_matches_in_process(self):
+        in_process = parallel_backfill("2023-11-01", "2023-12-31", workers=1, engine=self.engine)
+        pooled = parallel_backfill("2023-11-01", "2023-12-31", workers=2, chunk_size=10, engine=self.engine)
+        pd.testing.assert_frame_equal(in_process, pooled)
+
+    def test_pool_workers_dont_nest_bootstrap_pools(self):
+        config = {**SCORED_DETECTOR_CONFIG, 'bootstrap_workers': 4}
+        with patch(
+            "mcp_conductor.entry.main_parallel_backfill.ProcessPoolExecutor", wraps=ProcessPoolExecutor
+        ) as pool_executor:
+            pooled = parallel_backfill("2023-12-01", "2023-12-31", config=config, workers=2, engine=self.engine)
+        self.assertEqual(pool_executor.call_args.kwargs["initargs"][1]["bootstrap_workers"], 1)
+        self.assertEqual(config['bootstrap_workers'], 4)
+        in_process = parallel_backfill("2023-12-01", "2023-12-31", config=config, workers=1, engine=self.engine)
+        pd.testing.assert_frame_equal(in_process, pooled)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,126 @@
+import asyncio
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import pandas as pd
+
+from mcp_conductor.detector.generic.changepoints import ChangePointDetector
+from mcp_conductor.detector.pipe_detect_engine import DEFAULT_CONFIG_HASH, DEFAULT_DETECTOR_CONFIG
+from mcp_conductor.entry.main_anomaly_backfill import backfill_anomalies
+from mcp_conductor.storage.anomalies import lookup_anomalies, lookup_anomalies_async
+from mcp_conductor.storage.async_ship_cnt import AsyncShipCntRepository
+from mcp_conductor.storage.engine import get_engine, dispose_engines
+from mcp_conductor.storage.ingest import ingest_files
+from mcp_conductor.storage.thresholds import ThresholdLookup, load_threshold_lookup, write_thresholds
+
+
+class TestPipeAnomalies(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp_dir.name, "sisi.sqlite")
+        self.engine = get_engine(f"sqlite:///{self.db_path}")
+        date_ids = [int(d.strftime("%Y%m%d")) for d in pd.date_range("2023-11-01", "2023-12-31")]
+        ship_cnts = [50 if date_id in (20231115, 20231210) else 20 for date_id in date_ids]
+        pd.DataFrame({
+            "pipe_name": "曼德海峡", "date_id": date_ids, "ship_cnt": ship_cnts
+        }).to_sql("ship_cnt_in_pipe", self.engine, index=False)
+        self.lookup_patch = patch("mcp_conductor.storage.thresholds._THRESHOLD_LOOKUP", ThresholdLookup())
+        self.lookup_patch.start()
+        return super().setUp()
+
+    def tearDown(self) -> None:
+        self.lookup_patch.stop()
+        dispose_engines()
+        self.tmp_dir.cleanup()
+        return super().tearDown()
+
+    def _lookup(self, pipe_name: str, start_date_id: int, end_date_id: int, chash: str = DEFAULT_CONFIG_HASH):
+        state = ChangePointDetector(DEFAULT_DETECTOR_CONFIG).state_key(pipe_name)
+        return lookup_anomalies(pipe_name, start_date_id, end_date_id, chash, state, engine=self.engine)
+
+    def test_backfill_and_lookup(self):
+        written = backfill_anomalies("2023-11-01", "2023-12-31", engine=self.engine)
+        self.assertEqual(written, {"曼德海峡": 2})
+
+        anomalies = self._lookup("曼德海峡", 20231201, 20231231)
+        self.assertEqual(anomalies["date_id"].tolist(), [20231210])
+        # covered window without anomalies
+        anomalies = self._lookup("曼德海峡", 20231201, 20231205)
+        self.assertEqual(anomalies.shape[0], 0)
+        # not covered by the backfill
+        self.assertIsNone(self._lookup("曼德海峡", 20231001, 20231031))
+        self.assertIsNone(self._lookup("曼德海峡", 20231201, 20231231, "other-config"))
+
+        # backfilling again replaces the rows
+        backfill_anomalies("2023-11-01", "2023-12-31", engine=self.engine)
+        anomalies = self._lookup("曼德海峡", 20231101, 20231231)
+        self.assertEqual(anomalies["date_id"].tolist(), [20231115, 20231210])
+
+    def test_stale_runs_are_not_served(self):
+        backfill_anomalies("2023-11-01", "2024-01-31", engine=self.engine)
+        self.assertEqual(
+            self._lookup("曼德海峡", 20231201, 20231231)["date_id"].tolist(),
+            [20231210],
+        )
+
+        # a rewrite of a backfilled day and a new day inside the run
+        path = os.path.join(self.tmp_dir.name, "fix.csv")
+        pd.DataFrame({
+            "pipe_name": "曼德海峡", "date_id": [20231210, 20240101], "ship_cnt": [20, 60]
+        }).to_csv(path, index=False)
+        ingest_files([path], engine=self.engine)
+        self.assertIsNone(self._lookup("曼德海峡", 20231201, 20231231))
+
+        backfill_anomalies("2023-11-01", "2024-01-31", engine=self.engine)
+        anomalies = self._lookup("曼德海峡", 20231101, 20240131)
+        self.assertEqual(anomalies["date_id"].tolist(), [20231115, 20240101])
+
+        # rows written around the ingestion don't drop the run, the day count of its range no longer matches
+        pd.DataFrame({
+            "pipe_name": "曼德海峡", "date_id": [20240102], "ship_cnt": [20]
+        }).to_sql("ship_cnt_in_pipe", self.engine, index=False, if_exists="append")
+        self.assertIsNone(self._lookup("曼德海峡", 20231101, 20231130))
+
+    def test_recomputed_thresholds_are_not_served_old_runs(self):
+        backfill_anomalies("2023-11-01", "2023-12-31", engine=self.engine)
+        self.assertIsNotNone(self._lookup("曼德海峡", 20231201, 20231231))
+
+        # thresholds recomputed (main_precompute_thresholds) and reloaded
+        write_thresholds(pd.DataFrame([{
+            "pipe_name": "曼德海峡", "min_alert_cnt": 0.0, "max_alert_cnt": 100.0, "lookback_days": 365,
+            "lower_quantile": 0.05, "upper_quantile": 0.95, "end_date_id": 20231231,
+        }]), engine=self.engine)
+        load_threshold_lookup(self.engine)
+        self.assertIsNone(self._lookup("曼德海峡", 20231201, 20231231))
+
+        backfill_anomalies("2023-11-01", "2023-12-31", engine=self.engine)
+        self.assertEqual(self._lookup("曼德海峡", 20231101, 20231231).shape[0], 0)
+
+    def test_backfill_skips_pipes_without_thresholds(self):
+        pd.DataFrame({
+            "pipe_name": "未知海峡", "date_id": [20231201, 20231202, 20231203, 20231204], "ship_cnt": 10
+        }).to_sql("ship_cnt_in_pipe", self.engine, index=False, if_exists="append")
+        written = backfill_anomalies("2023-11-01", "2023-12-31", engine=self.engine)
+        self.assertEqual(written, {"曼德海峡": 2})
+        self.assertIsNone(self._lookup("未知海峡", 20231201, 20231231))
+
+    def test_lookup_async(self):
+        backfill_anomalies("2023-11-01", "2023-12-31", engine=self.engine)
+
+        async def run():
+            repository = AsyncShipCntRepository(self.db_path)
+            try:
+                return await lookup_anomalies_async(
+                    repository, "曼德海峡", 20231101, 20231130, DEFAULT_CONFIG_HASH,
+                    ChangePointDetector(DEFAULT_DETECTOR_CONFIG).state_key("曼德海峡"),
+                )
+            finally:
+                await repository.close()
+
+        self.assertEqual(asyncio.run(run())["date_id"].tolist(), [20231115])
+
+
+if __name__ == '__main__':
+    unittest.main()
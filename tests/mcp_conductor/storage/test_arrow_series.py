@@ -0,0 +1,78 @@
+import asyncio
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from mcp_conductor.storage.arrow_series import ArrowSeriesCache, export_sqlite_to_arrow, write_pipe_series
+from mcp_conductor.storage.engine import get_engine, dispose_engines
+
+
+class TestArrowSeriesCache(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.root = os.path.join(self.tmp_dir.name, "ship_cnt_in_pipe")
+        self.date_ids = np.array([int(d.strftime("%Y%m%d")) for d in pd.date_range("2022-11-01", "2023-02-28")])
+        self.ship_cnts = np.arange(self.date_ids.shape[0])
+        return super().setUp()
+
+    def tearDown(self) -> None:
+        dispose_engines()
+        self.tmp_dir.cleanup()
+        return super().tearDown()
+
+    def test_year_partitions(self):
+        paths = write_pipe_series(self.root, "曼德海峡", self.date_ids, self.ship_cnts)
+        self.assertEqual([path.name for path in paths], ["year=2022.arrow", "year=2023.arrow"])
+
+    def test_window_zero_copy_in_one_year(self):
+        write_pipe_series(self.root, "曼德海峡", self.date_ids, self.ship_cnts)
+        cache = ArrowSeriesCache(self.root)
+        date_ids, ship_cnts = cache.get_window("曼德海峡", 20230101, 20230131)
+        np.testing.assert_array_equal(date_ids, self.date_ids[61:92])
+        np.testing.assert_array_equal(ship_cnts, self.ship_cnts[61:92])
+        # backed by the memory mapped file, not owned by numpy
+        self.assertFalse(date_ids.flags.owndata)
+        self.assertFalse(date_ids.flags.writeable)
+
+    def test_window_across_years(self):
+        write_pipe_series(self.root, "曼德海峡", self.date_ids, self.ship_cnts, file_format="parquet")
+        cache = ArrowSeriesCache(self.root)
+        date_ids, ship_cnts = cache.get_window("曼德海峡", 20221215, 20230115)
+        self.assertEqual(date_ids.shape[0], 32)
+        np.testing.assert_array_equal(ship_cnts, self.ship_cnts[44:76])
+        self.assertEqual(cache.stats()["misses"], 2)
+
+        cache.get_window("曼德海峡", 20221215, 20230115)
+        self.assertEqual(cache.stats()["hits"], 2)
+
+    def test_unknown_pipe(self):
+        cache = ArrowSeriesCache(self.root)
+        self.assertFalse(cache.has_pipe("曼德海峡"))
+        date_ids, _ = cache.get_window("曼德海峡", 20230101, 20230131)
+        self.assertEqual(date_ids.shape[0], 0)
+
+    def test_window_async(self):
+        write_pipe_series(self.root, "曼德海峡", self.date_ids, self.ship_cnts)
+        cache = ArrowSeriesCache(self.root)
+        date_ids, ship_cnts = asyncio.run(cache.get_window_async("曼德海峡", 20221230, 20230102))
+        self.assertEqual(date_ids.tolist(), [20221230, 20221231, 20230101, 20230102])
+        np.testing.assert_array_equal(ship_cnts, self.ship_cnts[59:63])
+
+    def test_export_sqlite(self):
+        engine = get_engine(f"sqlite:///{os.path.join(self.tmp_dir.name, 'sisi.sqlite')}")
+        pd.DataFrame({
+            "pipe_name": "马六甲海峡", "date_id": self.date_ids, "ship_cnt": self.ship_cnts
+        }).to_sql("ship_cnt_in_pipe", engine, index=False)
+
+        self.assertEqual(export_sqlite_to_arrow(self.root, engine=engine), self.date_ids.shape[0])
+        cache = ArrowSeriesCache(self.root)
+        self.assertTrue(cache.has_pipe("马六甲海峡"))
+        date_ids, _ = cache.get_window("马六甲海峡", 20221101, 20230228)
+        np.testing.assert_array_equal(date_ids, self.date_ids)
+
+
+if __name__ == '__main__':
+    unittest.main()
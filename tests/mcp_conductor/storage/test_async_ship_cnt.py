@@ -0,0 +1,85 @@
+import asyncio
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from mcp_conductor.storage.async_ship_cnt import AsyncShipCntRepository
+from mcp_conductor.storage.engine import get_engine, dispose_engines
+from mcp_conductor.storage.series_cache import PipeSeriesCache
+
+
+class TestAsyncShipCntRepository(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp_dir.name, "sisi.sqlite")
+        self.engine = get_engine(f"sqlite:///{self.db_path}")
+        date_ids = [int(d.strftime("%Y%m%d")) for d in pd.date_range("2023-11-01", "2023-12-31")]
+        pd.DataFrame({
+            "pipe_name": "曼德海峡", "date_id": date_ids, "ship_cnt": range(len(date_ids))
+        }).to_sql("ship_cnt_in_pipe", self.engine, index=False)
+        return super().setUp()
+
+    def tearDown(self) -> None:
+        dispose_engines()
+        self.tmp_dir.cleanup()
+        return super().tearDown()
+
+    def test_load_pipe_window(self):
+        async def run():
+            repository = AsyncShipCntRepository.from_url(f"sqlite:///{self.db_path}")
+            try:
+                date_ids, ship_cnts = await repository.load_pipe_window("曼德海峡", 20231201, 20231231)
+                exists = await repository.pipe_exists("曼德海峡"), await repository.pipe_exists("霍尔木兹海峡")
+            finally:
+                await repository.close()
+            return date_ids, ship_cnts, exists
+
+        date_ids, ship_cnts, exists = asyncio.run(run())
+        self.assertEqual(date_ids.shape[0], 31)
+        np.testing.assert_array_equal(ship_cnts, np.arange(30, 61))
+        self.assertEqual(exists, (True, False))
+
+    def test_concurrent_reads_share_the_pool(self):
+        async def run():
+            repository = AsyncShipCntRepository(self.db_path, pool_size=2)
+            try:
+                results = await asyncio.gather(*[
+                    repository.load_pipe_window("曼德海峡", 20231101, 20231130) for _ in range(10)
+                ])
+            finally:
+                n_connections = len(repository._connections)
+                await repository.close()
+            return results, n_connections
+
+        results, n_connections = asyncio.run(run())
+        self.assertTrue(all(date_ids.shape[0] == 30 for date_ids, _ in results))
+        self.assertLessEqual(n_connections, 2)
+
+    def test_series_cache_async_window(self):
+        cache = PipeSeriesCache(engine=self.engine)
+
+        async def run():
+            repository = AsyncShipCntRepository(self.db_path)
+            try:
+                first = await cache.get_window_async("曼德海峡", 20231201, 20231231, repository)
+                second = await cache.get_window_async("曼德海峡", 20231101, 20231130, repository)
+            finally:
+                await repository.close()
+            return first, second
+
+        (date_ids, _), (date_ids_nov, _) = asyncio.run(run())
+        self.assertEqual(date_ids.shape[0], 31)
+        self.assertEqual(date_ids_nov.shape[0], 30)
+        self.assertEqual(cache.stats()["misses"], 1)
+        self.assertEqual(cache.stats()["hits"], 1)
+
+    def test_memory_database_not_supported(self):
+        with self.assertRaises(ValueError):
+            AsyncShipCntRepository.from_url("sqlite://")
+
+
+if __name__ == '__main__':
+    unittest.main()
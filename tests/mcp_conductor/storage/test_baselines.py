@@ -0,0 +1,124 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+
+from mcp_conductor.detector.generic.changepoints import ChangePointDetector
+from mcp_conductor.storage.baselines import (
+    BaselineCache,
+    SeasonalBaseline,
+    get_baseline_cache,
+    load_baseline_cache,
+    load_baselines,
+    refresh_baselines,
+    seasonal_cells,
+)
+from mcp_conductor.storage.engine import get_engine, dispose_engines
+from mcp_conductor.storage.ingest import ingest_files
+
+
+def _date_ids(start: str, end: str) -> np.ndarray:
+    return np.array([int(d.strftime("%Y%m%d")) for d in pd.date_range(start, end)])
+
+
+class TestSeasonalBaselines(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.engine = get_engine(f"sqlite:///{os.path.join(self.tmp_dir.name, 'sisi.sqlite')}")
+        # weekends are quiet, 30 ships on weekdays and 10 on weekends, +-1 noise
+        self.date_ids = _date_ids("2022-01-01", "2023-12-31")
+        _, dows = seasonal_cells(self.date_ids)
+        ship_cnts = np.where(dows >= 5, 10, 30) + np.arange(self.date_ids.shape[0]) % 3 - 1
+        pd.DataFrame({
+            "pipe_name": "曼德海峡", "date_id": self.date_ids, "ship_cnt": ship_cnts
+        }).to_sql("ship_cnt_in_pipe", self.engine, index=False)
+        self.cache_patch = patch("mcp_conductor.storage.baselines._BASELINE_CACHE", BaselineCache())
+        self.cache_patch.start()
+        return super().setUp()
+
+    def tearDown(self) -> None:
+        self.cache_patch.stop()
+        dispose_engines()
+        self.tmp_dir.cleanup()
+        return super().tearDown()
+
+    def test_seasonal_cells(self):
+        dates = pd.date_range("1999-12-25", "2031-01-05")
+        months, dows = seasonal_cells([int(d.strftime("%Y%m%d")) for d in dates])
+        np.testing.assert_array_equal(months, dates.month - 1)
+        np.testing.assert_array_equal(dows, dates.dayofweek)
+
+    def test_incremental_update_matches_full(self):
+        rng = np.random.default_rng(0)
+        ship_cnts = rng.poisson(25, self.date_ids.shape[0]).astype(float)
+        ship_cnts[::17] = np.nan
+
+        full = SeasonalBaseline()
+        full.update(self.date_ids, ship_cnts)
+        incremental = SeasonalBaseline()
+        for lo in range(0, self.date_ids.shape[0], 100):
+            incremental.update(self.date_ids[lo:lo + 100], ship_cnts[lo:lo + 100])
+        # days already folded in are not counted twice
+        self.assertEqual(incremental.update(self.date_ids[:50], ship_cnts[:50]), 0)
+
+        np.testing.assert_array_equal(incremental.counts, full.counts)
+        np.testing.assert_allclose(incremental.mean, full.mean)
+        np.testing.assert_allclose(incremental.std, full.std)
+        self.assertEqual(full.counts.sum(), np.count_nonzero(~np.isnan(ship_cnts)))
+        self.assertEqual(full.last_date_id, 20231231)
+
+    def test_refresh_and_detect(self):
+        detector = ChangePointDetector({'method': 'seasonal'})
+        window = _date_ids("2024-01-01", "2024-01-14")  # Monday to Sunday, twice
+        ship_cnts = [30, 30, 30, 30, 30, 10, 10, 30, 10, 30, 30, 30, 30, 10]
+        with self.assertRaises(ValueError):
+            detector.detect(ship_cnts, pipe_name="曼德海峡", date_ids=window)
+
+        self.assertEqual(refresh_baselines(engine=self.engine), {"曼德海峡": self.date_ids.shape[0]})
+        # the quiet Tuesday (index 8) and the busy Saturday (index 12) stand out
+        self.assertEqual(detector.detect(ship_cnts, pipe_name="曼德海峡", date_ids=window)["change_points"], [8, 12])
+        self.assertEqual(
+            detector.detect_many({"曼德海峡": ship_cnts}, date_ids={"曼德海峡": window})["曼德海峡"]["change_points"],
+            [8, 12],
+        )
+        with self.assertRaises(ValueError):
+            detector.detect(ship_cnts, pipe_name="曼德海峡")
+
+        # a new process loads the stored baselines
+        with patch("mcp_conductor.storage.baselines._BASELINE_CACHE", BaselineCache()):
+            load_baseline_cache(self.engine)
+            np.testing.assert_allclose(
+                get_baseline_cache().get("曼德海峡").mean, load_baselines(self.engine)["曼德海峡"].mean
+            )
+
+    def test_ingest_refreshes_incrementally(self):
+        detector = ChangePointDetector({'method': 'seasonal'})
+        self.assertEqual(detector.state_key("曼德海峡"), "")
+        refresh_baselines(engine=self.engine)
+        state = detector.state_key("曼德海峡")
+        path = os.path.join(self.tmp_dir.name, "jan.csv")
+        new_date_ids = _date_ids("2024-01-01", "2024-01-31")
+        pd.DataFrame({"pipe_name": "曼德海峡", "date_id": new_date_ids, "ship_cnt": 20}).to_csv(path, index=False)
+        ingest_files([path], engine=self.engine)
+
+        baseline = get_baseline_cache().get("曼德海峡")
+        self.assertEqual(baseline.last_date_id, 20240131)
+        self.assertEqual(baseline.counts.sum(), self.date_ids.shape[0] + new_date_ids.shape[0])
+        # results cached with the former baseline are keyed apart
+        self.assertNotEqual(detector.state_key("曼德海峡"), state)
+        state = detector.state_key("曼德海峡")
+
+        # rewriting past days rebuilds the pipe's baseline
+        pd.DataFrame({"pipe_name": "曼德海峡", "date_id": [20220101], "ship_cnt": 1000}).to_csv(path, index=False)
+        ingest_files([path], engine=self.engine)
+        rebuilt = load_baselines(self.engine)["曼德海峡"]
+        self.assertEqual(rebuilt.counts.sum(), self.date_ids.shape[0] + new_date_ids.shape[0])
+        self.assertGreater(rebuilt.mean[0, 5], 40)
+        self.assertNotEqual(detector.state_key("曼德海峡"), state)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+
+from mcp_conductor.detector.generic.changepoints import ChangePointDetector
+from mcp_conductor.storage.bci_series import align_by_date, load_pipe_with_bci, pivot_indicators, to_date_ids
+from mcp_conductor.storage.engine import get_engine, dispose_engines
+
+
+class TestBciSeries(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.engine = get_engine(f"sqlite:///{os.path.join(self.tmp_dir.name, 'sisi.sqlite')}")
+        self.days = pd.date_range("2024-01-01", "2024-03-31")
+        self.date_ids = np.array([int(d.strftime("%Y%m%d")) for d in self.days])
+        rng = np.random.default_rng(0)
+        # traffic drops on 2024-02-17, day 47
+        ship_cnts = np.concatenate([rng.poisson(30, 47), rng.poisson(15, self.date_ids.shape[0] - 47)])
+        pd.DataFrame({
+            "pipe_name": "曼德海峡", "date_id": self.date_ids, "ship_cnt": ship_cnts
+        }).to_sql("ship_cnt_in_pipe", self.engine, index=False)
+        return super().setUp()
+
+    def tearDown(self) -> None:
+        dispose_engines()
+        self.tmp_dir.cleanup()
+        return super().tearDown()
+
+    def test_to_date_ids(self):
+        np.testing.assert_array_equal(
+            to_date_ids(["2024-01-31", "2024-02-01 00:00:00", "20240202"]), [20240131, 20240201, 20240202]
+        )
+        np.testing.assert_array_equal(to_date_ids(np.array([20240131])), [20240131])
+
+    def test_pivot_indicators(self):
+        records = [
+            {"day": "2024-01-02", "zbxx": "b", "value": "2.5"},
+            {"day": "2024-01-01", "zbxx": "a", "value": 1},
+            {"day": "2024-01-02", "zbxx": "a", "value": None},
+            {"day": "2024-01-02", "zbxx": "b", "value": 3},
+        ]
+        date_ids, indicators, values = pivot_indicators(records)
+        np.testing.assert_array_equal(date_ids, [20240101, 20240102])
+        self.assertEqual(indicators, ["a", "b"])
+        np.testing.assert_array_equal(values, [[1.0, np.nan], [np.nan, 3.0]])
+
+        date_ids, indicators, values = pivot_indicators([])
+        self.assertEqual((date_ids.shape, indicators, values.shape), ((0,), [], (0, 0)))
+
+    def test_align_by_date(self):
+        source = np.array([20240102, 20240104, 20240105])
+        values = np.array([[1.0, 10.0], [2.0, np.nan], [np.nan, 30.0]])
+        target = np.array([20240101, 20240102, 20240103, 20240104, 20240105, 20240106])
+
+        np.testing.assert_array_equal(
+            align_by_date(target, source, values),
+            [[np.nan, np.nan], [1, 10], [1, 10], [2, 10], [2, 30], [2, 30]],
+        )
+        np.testing.assert_array_equal(
+            align_by_date(target, source, values, forward_fill=False),
+            [[np.nan, np.nan], [1, 10], [np.nan, np.nan], [2, np.nan], [np.nan, 30], [np.nan, np.nan]],
+        )
+        np.testing.assert_array_equal(align_by_date(target[:2], source, values[:, 0]), [np.nan, 1])
+        self.assertTrue(np.isnan(align_by_date(target, source[:0], values[:0])).all())
+
+    @patch("mcp_conductor.resources.sisi.APIs.canal_traffic.get_bci_metrics")
+    def test_load_pipe_with_bci(self, mock_get_bci_metrics):
+        # a weekday indicator that falls with the traffic, published from 2024-01-03 on
+        records = [
+            {"day": d.strftime("%Y-%m-%d"), "zbxx": "101-0003", "value": 1500.0 if i < 47 else 1200.0}
+            for i, d in enumerate(self.days) if i >= 2 and d.dayofweek < 5
+        ]
+        mock_get_bci_metrics.return_value = {"success": True, "data": records}
+
+        date_ids, signal, columns = load_pipe_with_bci(
+            "曼德海峡", 20240101, 20240331, client="qiu", zbxxs="101-0003", engine=self.engine
+        )
+        mock_get_bci_metrics.assert_called_once_with(
+            "qiu", "2024-01-01", "2024-03-31", zbxxs="101-0003", csdbs=None
+        )
+        self.assertEqual(columns, ["ship_cnt", "101-0003"])
+        # the first two days have no indicator yet, weekends carry Friday's value
+        np.testing.assert_array_equal(date_ids, self.date_ids[2:])
+        self.assertEqual(signal.shape, (self.date_ids.shape[0] - 2, 2))
+        self.assertFalse(np.isnan(signal).any())
+        self.assertEqual(signal[date_ids == 20240106, 1], 1500.0)
+
+        result = ChangePointDetector({'method': 'fast_pelt', 'penalty': 20}).detect(signal)
+        self.assertEqual([int(date_ids[i]) for i in result['change_points']], [20240217])
+
+        mock_get_bci_metrics.return_value = {"success": False, "message": "请求失败"}
+        with self.assertRaises(ValueError):
+            load_pipe_with_bci("曼德海峡", 20240101, 20240331, client="qiu", engine=self.engine)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from sqlalchemy import text
+from sqlalchemy.pool import QueuePool
+
+from mcp_conductor.storage.engine import default_pool_size, get_engine, dispose_engines, warm_up
+
+
+class TestEngineRegistry(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.db_url = f"sqlite:///{os.path.join(self.tmp_dir.name, 'sisi.sqlite')}"
+        return super().setUp()
+
+    def tearDown(self) -> None:
+        dispose_engines()
+        self.tmp_dir.cleanup()
+        return super().tearDown()
+
+    def test_engine_is_shared_per_url(self):
+        engine = get_engine(self.db_url)
+        self.assertIs(engine, get_engine(self.db_url))
+        self.assertIsInstance(engine.pool, QueuePool)
+
+        other_url = f"sqlite:///{os.path.join(self.tmp_dir.name, 'other.sqlite')}"
+        self.assertIsNot(engine, get_engine(other_url))
+
+    def test_pool_size_from_env(self):
+        with patch.dict(os.environ, {"SISI_DB_POOL_SIZE": "3", "SISI_DB_MAX_OVERFLOW": "1"}):
+            engine = get_engine(self.db_url)
+        self.assertEqual(engine.pool.size(), 3)
+
+    def test_empty_env_entries_fall_back_to_defaults(self):
+        # the entries of .env.template are exported as empty strings
+        with patch.dict(os.environ, {"SISI_DB_POOL_SIZE": "", "SISI_DB_MAX_OVERFLOW": "", "SISI_DB_POOL_TIMEOUT": ""}):
+            engine = get_engine(self.db_url)
+        self.assertEqual(engine.pool.size(), default_pool_size())
+
+    def test_warm_up_and_dispose(self):
+        engine = warm_up(self.db_url)
+        with engine.connect() as conn:
+            self.assertEqual(conn.execute(text("SELECT 1")).scalar(), 1)
+
+        dispose_engines()
+        self.assertIsNot(engine, get_engine(self.db_url))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+import os
+import tempfile
+import unittest
+
+import pandas as pd
+from sqlalchemy import inspect, text
+
+from mcp_conductor.storage.anomalies import lookup_anomalies, write_anomalies
+from mcp_conductor.storage.engine import get_engine, dispose_engines
+from mcp_conductor.storage.ingest import deduplicate_ship_cnt, ingest_files, validate_chunk
+from mcp_conductor.storage.migrations import run_migrations
+from mcp_conductor.storage.ship_cnt import load_pipe_revision, load_pipe_series
+
+
+class TestIngest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.engine = get_engine(f"sqlite:///{os.path.join(self.tmp_dir.name, 'sisi.sqlite')}")
+        return super().setUp()
+
+    def tearDown(self) -> None:
+        dispose_engines()
+        self.tmp_dir.cleanup()
+        return super().tearDown()
+
+    def _write(self, name: str, df: pd.DataFrame) -> str:
+        path = os.path.join(self.tmp_dir.name, name)
+        if name.endswith(".csv"):
+            df.to_csv(path, index=False)
+        else:
+            df.to_parquet(path, index=False)
+        return path
+
+    def test_validate_chunk(self):
+        chunk = pd.DataFrame({
+            "pipe_name": ["曼德海峡", "曼德海峡", " ", "曼德海峡", "曼德海峡", "曼德海峡"],
+            "date_id": [20231201, "2023-12-02", 20231203, "bad", 20231205, 20231201],
+            "ship_cnt": [10, 11, 12, 13, -1, 20],
+        })
+        df, rejected = validate_chunk(chunk)
+        self.assertEqual(rejected, 3)
+        self.assertEqual(df["date_id"].tolist(), [20231202, 20231201])
+        self.assertEqual(df["ship_cnt"].tolist(), [11, 20])
+
+    def test_ingest_csv_and_parquet_upsert(self):
+        date_ids = [int(d.strftime("%Y%m%d")) for d in pd.date_range("2023-12-01", "2023-12-31")]
+        csv_path = self._write("dec.csv", pd.DataFrame({
+            "pipe_name": "曼德海峡", "date_id": date_ids, "ship_cnt": 10
+        }))
+        parquet_path = self._write("fix.parquet", pd.DataFrame({
+            "pipe_name": ["曼德海峡", "马六甲海峡"], "date_id": [20231231, 20231231], "ship_cnt": [99, 5]
+        }))
+
+        stats = ingest_files([csv_path, parquet_path], engine=self.engine, chunksize=7)
+        self.assertEqual(stats["rows"], 33)
+        self.assertEqual(stats["pipes"], 2)
+        self.assertGreater(stats["rows_per_sec"], 0)
+
+        df = load_pipe_series("曼德海峡", engine=self.engine)
+        self.assertEqual(df.shape[0], 31)
+        self.assertEqual(df["ship_cnt"].iloc[-1], 99)
+
+        # loading the same file again doesn't duplicate rows
+        ingest_files([csv_path], engine=self.engine)
+        self.assertEqual(load_pipe_series("曼德海峡", engine=self.engine).shape[0], 31)
+
+        with self.engine.connect() as conn:
+            self.assertEqual(conn.execute(text("PRAGMA journal_mode")).scalar(), "wal")
+
+    def test_duplicates_block_the_migration(self):
+        pd.DataFrame({
+            "pipe_name": "曼德海峡", "date_id": [20231201, 20231202, 20231201], "ship_cnt": [10, 11, 12]
+        }).to_sql("ship_cnt_in_pipe", self.engine, index=False)
+
+        # the migration doesn't delete rows on its own
+        with self.assertRaisesRegex(RuntimeError, "blocked by 1 duplicated"):
+            run_migrations(self.engine)
+        self.assertEqual(load_pipe_series("曼德海峡", engine=self.engine).shape[0], 3)
+        # the migrations after the blocked one are applied anyway
+        tables = inspect(self.engine).get_table_names()
+        self.assertIn("pipe_anomalies", tables)
+        self.assertIn("pipe_revisions", tables)
+
+        anomalies = pd.DataFrame({"date_id": [20231201], "ship_cnt": [12]})
+        write_anomalies("曼德海峡", 20231201, 20231202, anomalies, "sisi", "hash", 2, 0, engine=self.engine)
+
+        self.assertEqual(deduplicate_ship_cnt(self.engine), 1)
+        # like a rewrite by the upsert: the revision is bumped and the runs over the deduplicated days dropped
+        self.assertEqual(load_pipe_revision("曼德海峡", self.engine), 1)
+        self.assertIsNone(lookup_anomalies("曼德海峡", 20231201, 20231202, "hash", engine=self.engine))
+        self.assertEqual(deduplicate_ship_cnt(self.engine), 0)
+        self.assertEqual(load_pipe_revision("曼德海峡", self.engine), 1)
+        self.assertIn("0002_ship_cnt_in_pipe_unique_pipe_date", run_migrations(self.engine))
+        df = load_pipe_series("曼德海峡", engine=self.engine)
+        self.assertEqual(df["ship_cnt"].tolist(), [12, 11])
+
+    def test_unsupported_file(self):
+        with self.assertRaises(ValueError):
+            ingest_files([os.path.join(self.tmp_dir.name, "data.json")], engine=self.engine)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from mcp_conductor.storage.engine import get_engine, dispose_engines
+from mcp_conductor.storage.ingest import ingest_files
+from mcp_conductor.storage.series_cache import PipeSeriesCache
+
+
+class TestPipeSeriesCache(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.engine = get_engine(f"sqlite:///{os.path.join(self.tmp_dir.name, 'sisi.sqlite')}")
+        self._insert("2023-10-01", "2023-12-31")
+        return super().setUp()
+
+    def tearDown(self) -> None:
+        dispose_engines()
+        self.tmp_dir.cleanup()
+        return super().tearDown()
+
+    def _insert(self, start: str, end: str) -> None:
+        date_ids = [int(d.strftime("%Y%m%d")) for d in pd.date_range(start, end)]
+        pd.DataFrame({
+            "pipe_name": "曼德海峡", "date_id": date_ids, "ship_cnt": [d % 100 for d in date_ids]
+        }).to_sql("ship_cnt_in_pipe", self.engine, index=False, if_exists="append")
+
+    def test_window_hit_and_miss(self):
+        cache = PipeSeriesCache(engine=self.engine)
+        date_ids, ship_cnts = cache.get_window("曼德海峡", 20231201, 20231231)
+        self.assertEqual(date_ids.shape[0], 31)
+        self.assertEqual(date_ids[0], 20231201)
+        self.assertEqual(date_ids[-1], 20231231)
+        np.testing.assert_array_equal(ship_cnts, date_ids % 100)
+
+        cache.get_window("曼德海峡", 20231101, 20231130)
+        self.assertEqual(cache.stats()["misses"], 1)
+        self.assertEqual(cache.stats()["hits"], 1)
+
+        # windows are views of the cached arrays
+        self.assertTrue(np.shares_memory(date_ids, cache.get_series("曼德海峡").date_ids))
+
+    def test_incremental_refresh(self):
+        cache = PipeSeriesCache(engine=self.engine, refresh_interval=0)
+        cache.get_window("曼德海峡", 20231201, 20231231)
+        version = cache.data_version("曼德海峡")
+        self._insert("2024-01-01", "2024-01-31")
+
+        date_ids, _ = cache.get_window("曼德海峡", 20240101, 20240131)
+        self.assertEqual(date_ids.shape[0], 31)
+        self.assertEqual(cache.stats()["refreshes"], 1)
+        self.assertEqual(cache.stats()["rows"], 92 + 31)
+        self.assertNotEqual(cache.data_version("曼德海峡"), version)
+
+    def test_rewritten_days_reload_the_pipe(self):
+        cache = PipeSeriesCache(engine=self.engine, refresh_interval=0)
+        cache.get_window("曼德海峡", 20231201, 20231231)
+        version = cache.data_version("曼德海峡")
+
+        # another process rewrites a past day, the row count and the last day don't change
+        path = os.path.join(self.tmp_dir.name, "fix.csv")
+        pd.DataFrame({"pipe_name": ["曼德海峡"], "date_id": [20231210], "ship_cnt": [999]}).to_csv(path, index=False)
+        ingest_files([path], engine=self.engine)
+
+        date_ids, ship_cnts = cache.get_window("曼德海峡", 20231201, 20231231)
+        self.assertEqual(ship_cnts[date_ids == 20231210].tolist(), [999])
+        self.assertEqual(cache.stats()["rows"], 92)
+        self.assertNotEqual(cache.data_version("曼德海峡"), version)
+
+        # appending new days keeps the revision, the refresh stays incremental
+        pd.DataFrame({"pipe_name": ["曼德海峡"], "date_id": [20240101], "ship_cnt": [1]}).to_csv(path, index=False)
+        ingest_files([path], engine=self.engine)
+        revision = cache.get_series("曼德海峡").revision
+        cache.get_window("曼德海峡", 20240101, 20240101)
+        self.assertEqual(cache.get_series("曼德海峡").revision, revision)
+        self.assertEqual(cache.stats()["rows"], 93)
+
+    def test_refresh_interval(self):
+        cache = PipeSeriesCache(engine=self.engine, refresh_interval=3600)
+        cache.get_window("曼德海峡", 20231201, 20231231)
+        self._insert("2024-01-01", "2024-01-31")
+
+        # refreshed recently, new rows are not visible yet
+        date_ids, _ = cache.get_window("曼德海峡", 20240101, 20240131)
+        self.assertEqual(date_ids.shape[0], 0)
+        self.assertEqual(cache.stats()["refreshes"], 0)
+
+    def test_unknown_pipe(self):
+        cache = PipeSeriesCache(engine=self.engine)
+        self.assertFalse(cache.has_pipe("霍尔木兹海峡"))
+        self.assertTrue(cache.has_pipe("曼德海峡"))
+
+
+if __name__ == '__main__':
+    unittest.main()
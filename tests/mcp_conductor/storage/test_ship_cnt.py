@@ -0,0 +1,72 @@
+import os
+import tempfile
+import unittest
+
+import pandas as pd
+from sqlalchemy import inspect, text
+
+from mcp_conductor.storage.engine import get_engine, dispose_engines
+from mcp_conductor.storage.migrations import run_migrations
+from mcp_conductor.storage.ship_cnt import date_ids_to_datetime64, get_date_window, load_pipe_window, pipe_exists
+
+
+class TestShipCntStorage(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.engine = get_engine(f"sqlite:///{os.path.join(self.tmp_dir.name, 'sisi.sqlite')}")
+        date_ids = [int(d.strftime("%Y%m%d")) for d in pd.date_range("2023-09-01", "2023-12-31")]
+        df = pd.concat([
+            pd.DataFrame({"pipe_name": "曼德海峡", "date_id": date_ids, "ship_cnt": range(len(date_ids))}),
+            pd.DataFrame({"pipe_name": "马六甲海峡", "date_id": date_ids, "ship_cnt": 10}),
+        ])
+        # shuffle the rows, the loader has to return them ordered by date_id
+        df.sample(frac=1, random_state=0).to_sql("ship_cnt_in_pipe", self.engine, index=False)
+        return super().setUp()
+
+    def tearDown(self) -> None:
+        dispose_engines()
+        self.tmp_dir.cleanup()
+        return super().tearDown()
+
+    def test_get_date_window(self):
+        self.assertEqual(get_date_window("2023-12-31"), (20231130, 20231231))
+        self.assertEqual(get_date_window("2023-12-31", month=3, day=1), (20230930, 20231231))
+
+    def test_date_ids_to_datetime64(self):
+        dates = pd.date_range("2023-12-30", "2024-03-02", freq="D")
+        date_ids = dates.strftime("%Y%m%d").astype(int).to_numpy()
+        self.assertTrue((date_ids_to_datetime64(date_ids) == dates.to_numpy().astype("datetime64[D]")).all())
+
+    def test_load_pipe_window(self):
+        df = load_pipe_window("曼德海峡", 20231201, 20231231, engine=self.engine)
+        self.assertEqual(list(df.columns), ["pipe_name", "date_id", "ship_cnt"])
+        self.assertEqual(df.shape[0], 31)
+        self.assertTrue((df["pipe_name"] == "曼德海峡").all())
+        self.assertTrue(df["date_id"].is_monotonic_increasing)
+
+        empty_df = load_pipe_window("曼德海峡", 20240101, 20240131, engine=self.engine)
+        self.assertEqual(empty_df.shape[0], 0)
+
+    def test_pipe_exists(self):
+        self.assertTrue(pipe_exists("马六甲海峡", engine=self.engine))
+        self.assertFalse(pipe_exists("霍尔木兹海峡", engine=self.engine))
+
+    def test_run_migrations_creates_covering_index(self):
+        applied = run_migrations(self.engine)
+        self.assertEqual(applied[:2], ["0001_ship_cnt_in_pipe_pipe_date_index", "0002_ship_cnt_in_pipe_unique_pipe_date"])
+        # applied only once
+        self.assertEqual(run_migrations(self.engine), [])
+
+        indexes = inspect(self.engine).get_indexes("ship_cnt_in_pipe")
+        self.assertIn(["pipe_name", "date_id", "ship_cnt"], [index["column_names"] for index in indexes])
+
+        with self.engine.connect() as conn:
+            plan = conn.execute(text(
+                "EXPLAIN QUERY PLAN SELECT pipe_name, date_id, ship_cnt FROM ship_cnt_in_pipe "
+                "WHERE pipe_name = '曼德海峡' AND date_id BETWEEN 20231201 AND 20231231"
+            )).fetchall()
+        self.assertIn("COVERING INDEX", " ".join(str(row[-1]) for row in plan))
+
+
+if __name__ == '__main__':
+    unittest.main()
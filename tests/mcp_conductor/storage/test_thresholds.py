@@ -0,0 +1,91 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+
+from mcp_conductor.detector.generic.changepoints import ChangePointDetector
+from mcp_conductor.entry.main_precompute_thresholds import precompute_thresholds
+from mcp_conductor.storage.engine import get_engine, dispose_engines
+from mcp_conductor.storage.thresholds import (
+    ThresholdLookup,
+    compute_thresholds,
+    get_threshold_lookup,
+    load_threshold_lookup,
+    load_thresholds,
+)
+
+
+class TestPipeThresholds(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.engine = get_engine(f"sqlite:///{os.path.join(self.tmp_dir.name, 'sisi.sqlite')}")
+        self.date_ids = [int(d.strftime("%Y%m%d")) for d in pd.date_range("2023-01-01", "2023-12-31")]
+        # 1..100 repeated, the last 100 days are 101..200
+        ship_cnts = [float(i % 100 + 1) for i in range(len(self.date_ids) - 100)] + [float(i) for i in range(101, 201)]
+        pd.DataFrame({
+            "pipe_name": "未知海峡", "date_id": self.date_ids, "ship_cnt": ship_cnts
+        }).to_sql("ship_cnt_in_pipe", self.engine, index=False)
+        # every test starts from a fresh process wide lookup
+        self.lookup_patch = patch("mcp_conductor.storage.thresholds._THRESHOLD_LOOKUP", ThresholdLookup())
+        self.lookup_patch.start()
+        return super().setUp()
+
+    def tearDown(self) -> None:
+        self.lookup_patch.stop()
+        dispose_engines()
+        self.tmp_dir.cleanup()
+        return super().tearDown()
+
+    def test_compute_thresholds_lookback(self):
+        date_ids = np.array(self.date_ids)
+        ship_cnts = np.arange(1, date_ids.shape[0] + 1, dtype=np.float64)
+        ship_cnts[-1] = np.nan
+        self.assertEqual(compute_thresholds(date_ids, ship_cnts, lookback_days=11, lower_quantile=0, upper_quantile=1),
+                         (355.0, 364.0))
+        self.assertEqual(
+            compute_thresholds(date_ids, ship_cnts, lookback_days=10, lower_quantile=0, upper_quantile=1,
+                               end_date_id=20230110),
+            (1.0, 10.0),
+        )
+        self.assertIsNone(compute_thresholds(date_ids, ship_cnts, end_date_id=20221231))
+        with self.assertRaises(ValueError):
+            compute_thresholds(date_ids, ship_cnts, lower_quantile=0.9, upper_quantile=0.1)
+
+    def test_precompute_and_detect(self):
+        detector = ChangePointDetector({'method': 'sisi'})
+        with self.assertRaises(ValueError):
+            detector.detect([1, 2, 3], pipe_name="未知海峡")
+
+        result = precompute_thresholds(lookback_days=100, lower_quantile=0.1, upper_quantile=0.9, engine=self.engine)
+        self.assertEqual(result["pipe_name"].tolist(), ["未知海峡"])
+        self.assertEqual(result["end_date_id"].tolist(), [20231231])
+        self.assertAlmostEqual(result["min_alert_cnt"][0], 110.9)
+        self.assertAlmostEqual(result["max_alert_cnt"][0], 190.1)
+        stored = load_thresholds(self.engine)
+        self.assertEqual(list(stored), ["未知海峡"])
+        np.testing.assert_allclose(stored["未知海峡"], (110.9, 190.1))
+
+        # the lookup of the job's process is updated, no reload needed
+        self.assertEqual(detector.detect([100, 150, 200], pipe_name="未知海峡")["change_points"], [0, 2])
+        # the hand tuned default of 曼德海峡 is kept
+        self.assertEqual(get_threshold_lookup().get("曼德海峡"), (13.0, 41.0))
+
+        # a new process loads the table at startup
+        with patch("mcp_conductor.storage.thresholds._THRESHOLD_LOOKUP", ThresholdLookup()):
+            self.assertNotIn("未知海峡", get_threshold_lookup())
+            load_threshold_lookup(self.engine)
+            np.testing.assert_allclose(get_threshold_lookup().get("未知海峡"), (110.9, 190.1))
+
+    def test_precompute_end_date(self):
+        result = precompute_thresholds(
+            lookback_days=30, lower_quantile=0, upper_quantile=1, end_date="2023-01-31", engine=self.engine
+        )
+        self.assertEqual(result["end_date_id"].tolist(), [20230131])
+        self.assertEqual((result["min_alert_cnt"][0], result["max_alert_cnt"][0]), (2.0, 31.0))
+
+
+if __name__ == '__main__':
+    unittest.main()